@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Canvas paint throughput, raster against OpenGL viewports
+# Copyright (C) 2010-2020 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# Usage:
+#   benchmarks/canvas_paint.py                              raster viewport
+#   benchmarks/canvas_paint.py --opengl [--samples N]       QOpenGLWidget viewport, as Canvas/UseOpenGL does
+#   benchmarks/canvas_paint.py --opengl --software-gl       same, forced to Mesa llvmpipe
+#   benchmarks/canvas_paint.py --pan-zoom [--steps N]       wheel zoom and pan steps, with and without managed pan/zoom
+#
+# The OpenGL runs need a display or EGL, the raster one also runs with QT_QPA_PLATFORM=offscreen.
+# Icons come from the generated resources, run 'make' first so they get painted too.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+import sys
+
+from argparse import ArgumentParser
+from time import monotonic
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtGui import QPainter
+from PyQt5.QtWidgets import QApplication, QGraphicsView
+
+# ------------------------------------------------------------------------------------------------------------
+# Static Variables
+
+# Benchmark scene, a grid of clients with 4 audio outputs and inputs each.
+# Every client is connected to the next one and to the one below it, 779 connections for the default 400 clients.
+SCENE_COLUMNS    = 20
+SCENE_SPACING    = 260
+SCENE_PORTS      = 4
+SCENE_ROW_OFFSET = SCENE_COLUMNS
+
+GL_RENDERER = 0x1F01
+
+# ------------------------------------------------------------------------------------------------------------
+
+def parseArgs():
+    parser = ArgumentParser(description="Measure canvas paint throughput on a generated scene.")
+    parser.add_argument("--groups", type=int, default=400, help="number of clients in the scene (default: 400)")
+    parser.add_argument("--frames", type=int, default=30, help="full repaints timed per zoom level (default: 30)")
+    parser.add_argument("--size", default="1200x800", help="viewport size (default: 1200x800)")
+    parser.add_argument("--antialiasing", type=int, default=1, choices=(0, 1, 2),
+                        help="canvas antialiasing, none/small/full (default: 1)")
+    parser.add_argument("--opengl", action="store_true", help="paint through a QOpenGLWidget viewport")
+    parser.add_argument("--samples", type=int, default=4, help="OpenGL multisample count (default: 4)")
+    parser.add_argument("--software-gl", action="store_true", help="use the Mesa software rasterizer (llvmpipe)")
+    parser.add_argument("--pan-zoom", action="store_true",
+                        help="time wheel zoom and pan steps instead of full repaints, managed pan/zoom on and off")
+    parser.add_argument("--steps", type=int, default=20, help="wheel or pan steps per gesture (default: 20)")
+    return parser.parse_args()
+
+def createScene(patchcanvas, groups):
+    portId = 1
+    groupPorts = {}
+
+    for groupId in range(1, groups + 1):
+        patchcanvas.addGroup(groupId, "client_%i" % groupId, patchcanvas.SPLIT_NO, patchcanvas.ICON_APPLICATION)
+        patchcanvas.setGroupPos(groupId,
+                                ((groupId - 1) % SCENE_COLUMNS) * SCENE_SPACING,
+                                ((groupId - 1) // SCENE_COLUMNS) * SCENE_SPACING)
+
+        outPorts = []
+        inPorts  = []
+
+        for i in range(SCENE_PORTS):
+            patchcanvas.addPort(groupId, portId, "out_%i" % (i + 1), patchcanvas.PORT_MODE_OUTPUT,
+                                patchcanvas.PORT_TYPE_AUDIO_JACK)
+            outPorts.append(portId)
+            portId += 1
+
+            patchcanvas.addPort(groupId, portId, "in_%i" % (i + 1), patchcanvas.PORT_MODE_INPUT,
+                                patchcanvas.PORT_TYPE_AUDIO_JACK)
+            inPorts.append(portId)
+            portId += 1
+
+        groupPorts[groupId] = (outPorts, inPorts)
+
+    connectionId = 1
+
+    for groupId in range(1, groups + 1):
+        for targetId, portIndex in ((groupId + 1, 0), (groupId + SCENE_ROW_OFFSET, 1)):
+            if targetId > groups:
+                continue
+            patchcanvas.connectPorts(connectionId,
+                                     groupId, groupPorts[groupId][0][portIndex],
+                                     targetId, groupPorts[targetId][1][portIndex])
+            connectionId += 1
+
+    return connectionId - 1
+
+def createOpenGLViewport(parent, samples):
+    from PyQt5.QtGui import QSurfaceFormat
+    from PyQt5.QtWidgets import QOpenGLWidget
+
+    surfaceFormat = QSurfaceFormat.defaultFormat()
+    surfaceFormat.setSamples(samples)
+
+    viewport = QOpenGLWidget(parent)
+    viewport.setFormat(surfaceFormat)
+    return viewport
+
+# OpenGL 2.0 functions of the viewport context, None if not available
+def getOpenGLFunctions(viewport):
+    from PyQt5.QtGui import QOpenGLVersionProfile
+
+    context = viewport.context()
+
+    if context is None or not context.isValid():
+        return None
+
+    profile = QOpenGLVersionProfile()
+    profile.setVersion(2, 0)
+
+    viewport.makeCurrent()
+    glFunctions = context.versionFunctions(profile)
+
+    if glFunctions is not None:
+        glFunctions.initializeOpenGLFunctions()
+
+    viewport.doneCurrent()
+    return glFunctions
+
+# full repaints, for OpenGL waiting on each frame to be really done
+def timeFrames(app, view, frames, glFunctions):
+    viewport = view.viewport()
+
+    for i in range(3):
+        viewport.repaint()
+        app.processEvents()
+
+    startTime = monotonic()
+
+    for i in range(frames):
+        viewport.repaint()
+        if glFunctions is not None:
+            viewport.makeCurrent()
+            glFunctions.glFinish()
+            viewport.doneCurrent()
+
+    return (monotonic() - startTime) * 1000 / frames
+
+# every step gets painted before the next one, for OpenGL waiting on it to be really done
+def timeStep(app, view, glFunctions, step):
+    startTime = monotonic()
+
+    step()
+    app.processEvents()
+
+    if glFunctions is not None:
+        view.viewport().makeCurrent()
+        glFunctions.glFinish()
+        view.viewport().doneCurrent()
+
+    return (monotonic() - startTime) * 1000
+
+# a wheel zoom in and out and a middle button pan, returns the step times and the time to paint the refined view
+def timePanZoom(app, scene, steps, glFunctions):
+    view = scene.getView()
+    center = QPointF(view.viewport().rect().center())
+    results = []
+
+    scene.zoom_reset()
+    view.centerOn(scene.itemsBoundingRect().center())
+    app.processEvents()
+
+    stepTimes = []
+    for i in range(steps):
+        delta = 120 if i < steps // 2 else -120
+        stepTimes.append(timeStep(app, view, glFunctions, lambda: scene.zoom_wheel(delta)))
+
+    # the same as the settle timer firing, without waiting for it
+    results.append(("Wheel zoom", stepTimes, timeStep(app, view, glFunctions, scene.slot_applySnapshot)))
+
+    scene.startPan(center)
+    app.processEvents()
+
+    stepTimes = []
+    for i in range(steps):
+        offset = 20 * (i + 1) if i < steps // 2 else 20 * (steps - i - 1)
+        stepTimes.append(timeStep(app, view, glFunctions, lambda: scene.movePan(center + QPointF(offset, offset / 2))))
+
+    results.append(("Pan", stepTimes, timeStep(app, view, glFunctions, scene.stopPan)))
+    return results
+
+# ------------------------------------------------------------------------------------------------------------
+# Main
+
+if __name__ == '__main__':
+    args = parseArgs()
+    width, height = tuple(int(v) for v in args.size.split("x", 1))
+
+    if args.software_gl:
+        os.environ["LIBGL_ALWAYS_SOFTWARE"] = "1"
+        QApplication.setAttribute(Qt.AA_UseSoftwareOpenGL)
+
+    app = QApplication(sys.argv)
+    app.setApplicationName("CatiaBenchmark")
+    app.setOrganizationName("Cadence")
+
+    try:
+        import resources_rc
+    except ImportError:
+        print("Resources not built, icons are not painted")
+
+    from patchcanvas import patchcanvas
+
+    view = QGraphicsView()
+    view.resize(width, height)
+    view.setRenderHint(QPainter.Antialiasing, bool(args.antialiasing == patchcanvas.ANTIALIASING_FULL))
+
+    if args.opengl:
+        view.setViewport(createOpenGLViewport(view, args.samples))
+        view.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+
+    scene = patchcanvas.PatchScene(view, view)
+    view.setScene(scene)
+
+    # fixed quality and no animations, only the painting itself is measured
+    pOptions = patchcanvas.options_t()
+    pOptions.theme_name        = patchcanvas.getDefaultThemeName()
+    pOptions.auto_hide_groups  = False
+    pOptions.auto_select_items = False
+    pOptions.use_bezier_lines  = True
+    pOptions.antialiasing      = args.antialiasing
+    pOptions.eyecandy          = patchcanvas.EYECANDY_NONE
+    pOptions.eyecandy_max_items = 0
+    pOptions.inline_displays   = False
+    pOptions.adaptive_quality  = False
+    pOptions.frame_budget      = 0
+    pOptions.managed_pan_zoom  = False
+    pOptions.lightweight_ports = False
+
+    pFeatures = patchcanvas.features_t()
+    pFeatures.group_info   = False
+    pFeatures.group_rename = False
+    pFeatures.port_info    = False
+    pFeatures.port_rename  = False
+    pFeatures.handle_group_pos = False
+
+    patchcanvas.setOptions(pOptions)
+    patchcanvas.setFeatures(pFeatures)
+    patchcanvas.init("CatiaBenchmark", scene, lambda action, value1, value2, value_str: None)
+
+    patchcanvas.beginBulkUpdate()
+    connections = createScene(patchcanvas, args.groups)
+    patchcanvas.endBulkUpdate()
+
+    view.show()
+    app.processEvents()
+
+    if args.opengl:
+        context = view.viewport().context()
+
+        if context is None or not context.isValid():
+            print("OpenGL context could not be created")
+            sys.exit(1)
+
+        glFunctions = getOpenGLFunctions(view.viewport())
+
+        if glFunctions is not None:
+            view.viewport().makeCurrent()
+            renderer = glFunctions.glGetString(GL_RENDERER)
+            view.viewport().doneCurrent()
+        else:
+            # frames are then only timed until handed over to the driver
+            renderer = "unknown renderer, no OpenGL 2.0 functions"
+
+        mode = "OpenGL, %ix MSAA, %s" % (view.viewport().format().samples(), renderer)
+    else:
+        glFunctions = None
+        mode = "raster"
+
+    print("Viewport: %s" % mode)
+    print("Scene: %i groups, %i connections, %ix%i" % (args.groups, connections, width, height))
+
+    if args.pan_zoom:
+        for managed in (False, True):
+            patchcanvas.options.managed_pan_zoom = managed
+            print("Managed pan/zoom %s:" % ("on" if managed else "off"))
+
+            for name, stepTimes, refineTime in timePanZoom(app, scene, args.steps, glFunctions):
+                print("  %-10s %6.1f ms per step, %6.1f ms slowest, refined in %6.1f ms" % (
+                      name, sum(stepTimes) / len(stepTimes), max(stepTimes), refineTime))
+
+        sys.exit(0)
+
+    scene.zoom_fit()
+    frameTime = timeFrames(app, view, args.frames, glFunctions)
+    print("Fit to view: %6.1f ms per frame, %6.1f fps" % (frameTime, 1000 / frameTime))
+
+    scene.zoom_reset()
+    view.centerOn(0, 0)
+    frameTime = timeFrames(app, view, args.frames, glFunctions)
+    print("Zoom 1:1:    %6.1f ms per frame, %6.1f fps" % (frameTime, 1000 / frameTime))
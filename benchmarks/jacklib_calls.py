@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# jacklib import time and call overhead of the functions called without a Python wrapper
+# Copyright (C) 2010-2020 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# Usage:
+#   benchmarks/jacklib_calls.py                      starts 'jackd -d dummy' for the run
+#   benchmarks/jacklib_calls.py --no-server          uses the JACK server already running
+#
+# Each fast path is timed against the wrapper it replaced, rebuilt here with its own ctypes function and the
+# old argtypes, so both go to the same libjack symbol.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import os
+import subprocess
+import sys
+
+from argparse import ArgumentParser
+from statistics import median
+from time import monotonic, sleep
+from timeit import Timer
+
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src")
+sys.path.insert(0, SOURCE_DIR)
+
+from jacklib import jacklib
+
+# before anything else gets looked up
+RESOLVED_AT_IMPORT = sorted(name for name in vars(jacklib.jlib) if not name.startswith("_"))
+
+from ctypes import POINTER, c_char_p, c_float, c_int, pointer
+from types import SimpleNamespace
+
+# ------------------------------------------------------------------------------------------------------------
+# Static Variables
+
+CLIENT_NAME = "jacklib_calls"
+
+# the dummy server needs a moment before clients can connect
+SERVER_START_TIMEOUT = 5.0
+
+# ------------------------------------------------------------------------------------------------------------
+
+def parseArgs():
+    parser = ArgumentParser(description="Measure jacklib import time and fast path call overhead.")
+    parser.add_argument("--calls", type=int, default=20000, help="calls timed per function (default: 20000)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing runs per function, best is kept (default: 5)")
+    parser.add_argument("--import-runs", type=int, default=20,
+                        help="fresh interpreters timing the import (default: 20)")
+    parser.add_argument("--no-server", action="store_true", help="do not start 'jackd -d dummy', use a running server")
+    return parser.parse_args()
+
+# self time of the jacklib.jacklib module in microseconds, as reported by -X importtime
+def timeImport():
+    env = dict(os.environ)
+    env["PYTHONPATH"] = SOURCE_DIR
+
+    output = subprocess.run([sys.executable, "-X", "importtime", "-c", "import jacklib.jacklib"],
+                            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                            universal_newlines=True, check=True).stderr
+
+    for line in output.splitlines():
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == "jacklib.jacklib":
+            return int(fields[0].split(":", 1)[1])
+
+    return None
+
+def openClient(timeout):
+    endTime = monotonic() + timeout
+
+    while True:
+        client = jacklib.client_open(CLIENT_NAME, jacklib.JackNoStartServer, None)
+
+        if client or monotonic() >= endTime:
+            return client
+
+        sleep(0.1)
+
+# the wrappers as they were, each calling its own copy of the symbol declared like before
+def createOldWrappers():
+    lib = jacklib.jlib._lib
+    oldlib = SimpleNamespace()
+
+    def declare(name, argtypes, restype):
+        func = lib[name]
+        func.argtypes = argtypes
+        func.restype = restype
+        setattr(oldlib, name, func)
+
+    declare("jack_port_by_name", [POINTER(jacklib.jack_client_t), c_char_p], POINTER(jacklib.jack_port_t))
+    declare("jack_port_flags", [POINTER(jacklib.jack_port_t)], c_int)
+    declare("jack_port_type", [POINTER(jacklib.jack_port_t)], c_char_p)
+    declare("jack_port_name", [POINTER(jacklib.jack_port_t)], c_char_p)
+    declare("jack_connect", [POINTER(jacklib.jack_client_t), c_char_p, c_char_p], c_int)
+    declare("jack_disconnect", [POINTER(jacklib.jack_client_t), c_char_p, c_char_p], c_int)
+    declare("jack_cpu_load", [POINTER(jacklib.jack_client_t)], c_float)
+    declare("jack_transport_query", [POINTER(jacklib.jack_client_t), POINTER(jacklib.jack_position_t)],
+            jacklib.jack_transport_state_t)
+
+    _e, _d = jacklib._e, jacklib._d
+
+    def port_by_name(client, port_name):
+        return oldlib.jack_port_by_name(client, _e(port_name))
+
+    def port_flags(port):
+        return oldlib.jack_port_flags(port)
+
+    def port_type(port):
+        return _d(oldlib.jack_port_type(port))
+
+    def port_name(port):
+        return _d(oldlib.jack_port_name(port))
+
+    def connect(client, source_port, destination_port):
+        return oldlib.jack_connect(client, _e(source_port), _e(destination_port))
+
+    def disconnect(client, source_port, destination_port):
+        return oldlib.jack_disconnect(client, _e(source_port), _e(destination_port))
+
+    def cpu_load(client):
+        return oldlib.jack_cpu_load(client)
+
+    def transport_query(client, pos):
+        return oldlib.jack_transport_query(client, pos)
+
+    return {
+        "port_by_name": port_by_name,
+        "port_flags": port_flags,
+        "port_type": port_type,
+        "port_name": port_name,
+        "connect": connect,
+        "disconnect": disconnect,
+        "cpu_load": cpu_load,
+        "transport_query": transport_query,
+    }
+
+# best time per call in microseconds
+def timeCalls(func, args, calls, repeat):
+    timer = Timer("func(*args)", globals={"func": func, "args": args})
+    return min(timer.repeat(repeat, calls)) * 1000000 / calls
+
+# ------------------------------------------------------------------------------------------------------------
+# Main
+
+if __name__ == '__main__':
+    args = parseArgs()
+
+    importTimes = [timeImport() for i in range(args.import_runs)]
+
+    print("Import: %i us self time median, %i us best, over %i runs" % (median(importTimes), min(importTimes),
+                                                                       args.import_runs))
+    print("Symbols resolved at import: %i (%s)" % (len(RESOLVED_AT_IMPORT), ", ".join(RESOLVED_AT_IMPORT)))
+
+    server = None
+
+    if not args.no_server:
+        try:
+            server = subprocess.Popen(["jackd", "--no-realtime", "-d", "dummy"],
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            print("Could not start jackd: %s" % e)
+            sys.exit(1)
+
+    try:
+        client = openClient(SERVER_START_TIMEOUT if server is not None else 0.0)
+
+        if not client:
+            print("Could not connect to the JACK server")
+            sys.exit(1)
+
+        outPort = jacklib.port_register(client, "out", jacklib.JACK_DEFAULT_AUDIO_TYPE, jacklib.JackPortIsOutput, 0)
+        inPort = jacklib.port_register(client, "in", jacklib.JACK_DEFAULT_AUDIO_TYPE, jacklib.JackPortIsInput, 0)
+        freePort = jacklib.port_register(client, "free", jacklib.JACK_DEFAULT_AUDIO_TYPE, jacklib.JackPortIsInput, 0)
+        outPortName = jacklib.port_name(outPort)
+        inPortName = jacklib.port_name(inPort)
+        freePortName = jacklib.port_name(freePort)
+
+        jacklib.activate(client)
+        jacklib.connect(client, outPortName, inPortName)
+
+        position = pointer(jacklib.jack_position_t())
+
+        # connect on a connection that exists and disconnect on one that does not, so the graph stays the same
+        callArgs = {
+            "port_by_name": (client, outPortName),
+            "port_flags": (outPort,),
+            "port_type": (outPort,),
+            "port_name": (outPort,),
+            "connect": (client, outPortName, inPortName),
+            "disconnect": (client, outPortName, freePortName),
+            "cpu_load": (client,),
+            "transport_query": (client, position),
+        }
+
+        oldWrappers = createOldWrappers()
+
+        print("%-16s %10s %10s" % ("", "wrapper", "fast path"))
+
+        for name, funcArgs in callArgs.items():
+            oldTime = timeCalls(oldWrappers[name], funcArgs, args.calls, args.repeat)
+            newTime = timeCalls(getattr(jacklib, name), funcArgs, args.calls, args.repeat)
+            print("%-16s %7.2f us %7.2f us" % (name, oldTime, newTime))
+
+        jacklib.deactivate(client)
+        jacklib.client_close(client)
+
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
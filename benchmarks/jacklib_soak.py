@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# jacklib memory soak, RSS growth over many calls returning JACK string lists
+# Copyright (C) 2010-2020 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# Usage:
+#   benchmarks/jacklib_soak.py                       starts 'jackd -d dummy' for the run
+#   benchmarks/jacklib_soak.py --no-server           uses the JACK server already running
+#
+# Every iteration does what Catia does on a graph refresh: get_ports, then port_get_all_connections and
+# port_get_aliases for each port. Memory not given back with jack_free() shows up as steady RSS growth.
+# Linux only, RSS is read from /proc.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import gc
+import os
+import subprocess
+import sys
+
+from argparse import ArgumentParser
+from time import monotonic, sleep
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from jacklib import jacklib
+from jacklib.jacklib_helpers import c_char_p_p_to_list
+
+# ------------------------------------------------------------------------------------------------------------
+# Static Variables
+
+CLIENT_NAME = "jacklib_soak"
+
+# the dummy server needs a moment before clients can connect
+SERVER_START_TIMEOUT = 5.0
+
+# ------------------------------------------------------------------------------------------------------------
+
+def parseArgs():
+    parser = ArgumentParser(description="Measure RSS growth of the jacklib string list calls.")
+    parser.add_argument("--iterations", type=int, default=20000, help="graph reads to do (default: 20000)")
+    parser.add_argument("--ports", type=int, default=32, help="output and input port pairs to register (default: 32)")
+    parser.add_argument("--report", type=int, default=2000, help="print RSS every this many iterations (default: 2000)")
+    parser.add_argument("--no-server", action="store_true", help="do not start 'jackd -d dummy', use a running server")
+    return parser.parse_args()
+
+def getRSS():
+    with open("/proc/self/statm", "r") as fd:
+        return int(fd.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+def openClient(timeout):
+    endTime = monotonic() + timeout
+
+    while True:
+        client = jacklib.client_open(CLIENT_NAME, jacklib.JackNoStartServer, None)
+
+        if client or monotonic() >= endTime:
+            return client
+
+        sleep(0.1)
+
+# ports with an alias each, every output connected to its input and to the next one
+def createPorts(client, ports):
+    outPorts = []
+    inPorts  = []
+
+    for i in range(ports):
+        outPort = jacklib.port_register(client, "out_%i" % (i + 1), jacklib.JACK_DEFAULT_AUDIO_TYPE,
+                                        jacklib.JackPortIsOutput, 0)
+        inPort = jacklib.port_register(client, "in_%i" % (i + 1), jacklib.JACK_DEFAULT_AUDIO_TYPE,
+                                       jacklib.JackPortIsInput, 0)
+        jacklib.port_set_alias(outPort, "soak:output_%i" % (i + 1))
+        jacklib.port_set_alias(inPort, "soak:input_%i" % (i + 1))
+        outPorts.append(jacklib.port_name(outPort))
+        inPorts.append(jacklib.port_name(inPort))
+
+    for i in range(ports):
+        jacklib.connect(client, outPorts[i], inPorts[i])
+        jacklib.connect(client, outPorts[i], inPorts[(i + 1) % ports])
+
+# a graph read like Catia's, returns the number of strings taken from JACK
+def readGraph(client):
+    count = 0
+
+    for portName in c_char_p_p_to_list(jacklib.get_ports(client, "", "", 0)):
+        port = jacklib.port_by_name(client, portName)
+
+        if not port:
+            continue
+
+        count += 1 + len(jacklib.port_get_all_connections(client, port))
+        count += jacklib.port_get_aliases(port)[0]
+
+    return count
+
+# ------------------------------------------------------------------------------------------------------------
+# Main
+
+if __name__ == '__main__':
+    args = parseArgs()
+    server = None
+
+    if not args.no_server:
+        try:
+            server = subprocess.Popen(["jackd", "--no-realtime", "-d", "dummy"],
+                                      stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError as e:
+            print("Could not start jackd: %s" % e)
+            sys.exit(1)
+
+    try:
+        client = openClient(SERVER_START_TIMEOUT if server is not None else 0.0)
+
+        if not client:
+            print("Could not connect to the JACK server")
+            sys.exit(1)
+
+        createPorts(client, args.ports)
+        jacklib.activate(client)
+
+        # the first reads allocate the alias buffers and warm up the caches
+        for i in range(10):
+            readGraph(client)
+
+        strings = readGraph(client)
+        gc.collect()
+        startRSS = getRSS()
+
+        print("Start: %.1f KiB RSS, %i strings per graph read" % (startRSS / 1024, strings))
+
+        startTime = monotonic()
+        strings = 0
+
+        for i in range(1, args.iterations + 1):
+            strings += readGraph(client)
+
+            if i % args.report == 0:
+                gc.collect()
+                rss = getRSS()
+                print("%8i reads: %10.1f KiB RSS, %+8.1f KiB" % (i, rss / 1024, (rss - startRSS) / 1024))
+
+        elapsed = monotonic() - startTime
+        gc.collect()
+        growth = getRSS() - startRSS
+
+        print("Done: %i strings in %.1f s, %.1f us per graph read" % (strings, elapsed,
+                                                                   elapsed * 1000000 / args.iterations))
+        print("RSS growth: %+.1f KiB, %+.3f bytes per graph read" % (growth / 1024, growth / args.iterations))
+
+        jacklib.deactivate(client)
+        jacklib.client_close(client)
+
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
@@ -16,23 +16,53 @@
 #
 # For a full copy of the GNU General Public License see the COPYING file
 
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import json
+import re
+from fnmatch import translate
+from time import monotonic
+
+# time to first frame is measured from here
+gStartTime = monotonic()
+
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Custom Stuff)
 
 import ui_catia
 from shared_canvasjack import *
+from shared_matrix import ConnectionMatrixW
+from shared_palette import CommandPaletteW
 from shared_settings import *
 
-from PyQt5.QtWidgets import QInputDialog, QLineEdit
+from PyQt5.QtCore import QEvent
+from PyQt5.QtWidgets import QGraphicsView, QInputDialog, QLineEdit
 
 # ------------------------------------------------------------------------------------------------------------
-# Try Import OpenGL
-
-try:
-    from PyQt5.QtOpenGL import QGLWidget
-    hasGL = True
-except:
-    hasGL = False
+# OpenGL, only loaded once the canvas is set to use it
+
+def isOpenGLAvailable():
+    try:
+        from PyQt5.QtWidgets import QOpenGLWidget
+    except ImportError:
+        return False
+    return True
+
+def createOpenGLViewport(parent, samples):
+    try:
+        from PyQt5.QtGui import QSurfaceFormat
+        from PyQt5.QtWidgets import QOpenGLWidget
+    except ImportError:
+        qWarning("OpenGL is not available, using raster rendering for the canvas")
+        return None
+
+    surfaceFormat = QSurfaceFormat.defaultFormat()
+    surfaceFormat.setSamples(samples)
+
+    viewport = QOpenGLWidget(parent)
+    viewport.setFormat(surfaceFormat)
+    return viewport
 
 # ------------------------------------------------------------------------------------------------------------
 # Static Variables
@@ -46,6 +76,18 @@ iPortNameR     = 2
 iPortGroupId   = 3
 iPortGroupName = 4
 
+iPortAttrFlags     = 0
+iPortAttrType      = 1
+iPortAttrAliases   = 2
+iPortAttrShortName = 3
+iPortAttrUuid      = 4
+iPortAttrLatency   = 5
+
+iPortLatency      = 0
+iPortLatencyTotal = 1
+iPortLatencyMin   = 2
+iPortLatencyMax   = 3
+
 iConnId       = 0
 iConnOutGroup = 1
 iConnOutPort  = 2
@@ -57,9 +99,56 @@ URI_POSITION         = "https://kx.studio/ns/carla/position"
 URI_PLUGIN_ICON      = "https://kx.studio/ns/carla/plugin-icon"
 URI_PLUGIN_ID        = "https://kx.studio/ns/carla/plugin-id"
 
+# client properties used for groups, clients with any of these get their uuid resolved up front
+GROUP_PROPERTY_KEYS = (URI_POSITION, URI_PLUGIN_ICON, URI_PLUGIN_ID)
+
+# group positions are written to jack metadata this long after the last move, unless the canvas settles first
+POSITION_WRITE_DELAY = 1000
+
+# position changes made by other clients are collected for this long and then applied in a single pass
+POSITION_APPLY_DELAY = 50
+
+# Ports and connections of the last session, shown on start until the live graph is read
+GRAPH_CACHE_VERSION = 1
+
+# With the cached graph shown, JACK is read once that got painted, or after this long at most
+WARM_START_TIMEOUT = 500
+
 URI_TYPE_INTEGER = "http://www.w3.org/2001/XMLSchema#integer"
 URI_TYPE_STRING  = "text/plain"
 
+# ------------------------------------------------------------------------------------------------------------
+# Client filters
+
+# One filter per line, wildcard patterns by default or regular expressions when prefixed with "re:".
+# All filters are joined into a single regex, returns None if there are none (or all of them are invalid).
+def compileClientFilters(text):
+    patterns = []
+
+    for line in text.splitlines():
+        line = line.strip()
+
+        if not line:
+            continue
+
+        if line.startswith("re:"):
+            pattern = line[3:]
+        else:
+            pattern = translate(line)
+
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            qWarning("Catia - invalid client filter \"%s\": %s" % (line, e))
+            continue
+
+        patterns.append("(?:%s)" % pattern)
+
+    if len(patterns) == 0:
+        return None
+
+    return re.compile("|".join(patterns))
+
 # ------------------------------------------------------------------------------------------------------------
 # Catia Main Window
 
@@ -72,10 +161,50 @@ class CatiaMainW(AbstractCanvasJackClass):
         self.fPortList       = []
         self.fConnectionList = []
 
+        # ports of filtered clients, kept out of the canvas
+        self.fHiddenPorts   = {} # portNameR -> groupName
+        self.fHiddenClients = {} # groupName -> number of ports
+
+        # jack port attributes, read once at registration
+        self.fPortAttributes = {} # portNameR -> [flags, type, aliases, short name, uuid, latency]
+        self.fPortUuids      = {} # port uuid -> portNameR
+        self.fPortsNoUuid    = set() # portNameR, no valid uuid from jack (jack_port_uuid missing or failed)
+
+        # jack metadata, read all at once on connect and kept current by the property change callback
+        self.fProperties  = {} # uuid -> {key: value}
+        self.fClientUuids = {} # client name -> client uuid
+        self.fClientNames = {} # client uuid -> client name
+
+        # group positions waiting to be written, only the last one of each group is kept
+        self.fPendingPositions = {} # group name -> "x1:y1:x2:y2"
+
+        self.fPositionTimer = QTimer(self)
+        self.fPositionTimer.setInterval(POSITION_WRITE_DELAY)
+        self.fPositionTimer.setSingleShot(True)
+
+        # positions written by us, the property change echo of each is ignored
+        self.fWrittenPositions = {} # client uuid -> "x1:y1:x2:y2"
+
+        # positions changed by other clients, waiting to be applied
+        self.fIncomingPositions = {} # client uuid -> "x1:y1:x2:y2"
+
+        self.fIncomingTimer = QTimer(self)
+        self.fIncomingTimer.setInterval(POSITION_APPLY_DELAY)
+        self.fIncomingTimer.setSingleShot(True)
+
+        # cached graph on the canvas, not checked against the live one yet
+        self.fStaleGraph = False
+        self.fWarmStartPending = False
+
+        # watched for the first paint, None once that is done
+        self.fFirstFrameViewport = None
+
         self.fLastGroupId = 1
         self.fLastPortId  = 1
         self.fLastConnectionId = 1
 
+        self.fMatrixWindow = None
+
         self.loadSettings(True)
 
         # -------------------------------------------------------------
@@ -112,15 +241,24 @@ class CatiaMainW(AbstractCanvasJackClass):
         for bufferSize in BUFFER_SIZE_LIST:
             self.ui.cb_buffer_size.addItem(str(bufferSize))
 
+        self.ui_setHiddenClients()
+
         # -------------------------------------------------------------
         # Set-up Canvas
 
         self.scene = patchcanvas.PatchScene(self, self.ui.graphicsView)
         self.ui.graphicsView.setScene(self.scene)
+
+        self.fMinimap = patchcanvas.CanvasMinimap(self.scene, self.ui.dock_minimap_contents)
+        self.ui.layout_minimap.addWidget(self.fMinimap)
         self.ui.graphicsView.setRenderHint(QPainter.Antialiasing, bool(self.fSavedSettings["Canvas/Antialiasing"] == patchcanvas.ANTIALIASING_FULL))
-        if self.fSavedSettings["Canvas/UseOpenGL"] and hasGL:
-            self.ui.graphicsView.setViewport(QGLWidget(self.ui.graphicsView))
-            self.ui.graphicsView.setRenderHint(QPainter.HighQualityAntialiasing, self.fSavedSettings["Canvas/HighQualityAntialiasing"])
+        if self.fSavedSettings["Canvas/UseOpenGL"]:
+            viewport = createOpenGLViewport(self.ui.graphicsView, self.fSavedSettings["Canvas/OpenGLSamples"])
+            if viewport is not None:
+                self.ui.graphicsView.setViewport(viewport)
+                # the framebuffer is not kept between frames, every paint has to cover all of it
+                self.ui.graphicsView.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+                self.ui.graphicsView.setRenderHint(QPainter.HighQualityAntialiasing, self.fSavedSettings["Canvas/HighQualityAntialiasing"])
 
         pOptions = patchcanvas.options_t()
         pOptions.theme_name        = self.fSavedSettings["Canvas/Theme"]
@@ -128,8 +266,13 @@ class CatiaMainW(AbstractCanvasJackClass):
         pOptions.use_bezier_lines  = self.fSavedSettings["Canvas/UseBezierLines"]
         pOptions.antialiasing      = self.fSavedSettings["Canvas/Antialiasing"]
         pOptions.eyecandy          = self.fSavedSettings["Canvas/EyeCandy"]
+        pOptions.eyecandy_max_items = self.fSavedSettings["Canvas/EyeCandyMaxItems"]
         pOptions.auto_select_items = False # TODO
         pOptions.inline_displays   = False
+        pOptions.adaptive_quality  = self.fSavedSettings["Canvas/AdaptiveQuality"]
+        pOptions.frame_budget      = self.fSavedSettings["Canvas/FrameBudget"]
+        pOptions.managed_pan_zoom  = self.fSavedSettings["Canvas/ManagedPanZoom"]
+        pOptions.lightweight_ports = self.fSavedSettings["Canvas/LightweightPorts"]
 
         pFeatures = patchcanvas.features_t()
         pFeatures.group_info   = False
@@ -141,11 +284,22 @@ class CatiaMainW(AbstractCanvasJackClass):
         patchcanvas.setOptions(pOptions)
         patchcanvas.setFeatures(pFeatures)
         patchcanvas.init("Catia", self.scene, self.canvasCallback, DEBUG)
+        patchcanvas.setPortTypeVisible(patchcanvas.PORT_TYPE_AUDIO_JACK, self.ui.act_canvas_show_audio.isChecked())
+        patchcanvas.setPortTypeVisible(patchcanvas.PORT_TYPE_MIDI_JACK, self.ui.act_canvas_show_midi.isChecked())
 
         # -------------------------------------------------------------
         # Try to connect to jack
 
-        self.jackStarted()
+        # the cached graph is painted first, reading the live one has to wait for that
+        if self.loadCachedGraph():
+            self.fWarmStartPending = True
+            QTimer.singleShot(WARM_START_TIMEOUT, self.slot_warmStart)
+        else:
+            self.jackStarted()
+
+        if self.fWarmStartPending or DEBUG:
+            self.fFirstFrameViewport = self.ui.graphicsView.viewport()
+            self.fFirstFrameViewport.installEventFilter(self)
 
         # -------------------------------------------------------------
         # Set-up Timers
@@ -164,6 +318,12 @@ class CatiaMainW(AbstractCanvasJackClass):
         self.ui.act_canvas_zoom_out.triggered.connect(self.slot_canvasZoomOut)
         self.ui.act_canvas_zoom_100.triggered.connect(self.slot_canvasZoomReset)
         self.ui.act_canvas_save_image.triggered.connect(self.slot_canvasSaveImage)
+        self.ui.act_canvas_find.triggered.connect(self.slot_canvasFind)
+        self.ui.act_canvas_matrix.triggered.connect(self.slot_canvasMatrix)
+        self.ui.act_canvas_show_audio.triggered.connect(self.slot_canvasShowAudio)
+        self.ui.act_canvas_show_midi.triggered.connect(self.slot_canvasShowMidi)
+        self.ui.b_canvas_show_audio.clicked.connect(self.slot_canvasShowAudio)
+        self.ui.b_canvas_show_midi.clicked.connect(self.slot_canvasShowMidi)
         self.ui.b_canvas_zoom_fit.clicked.connect(self.slot_canvasZoomFit)
         self.ui.b_canvas_zoom_in.clicked.connect(self.slot_canvasZoomIn)
         self.ui.b_canvas_zoom_out.clicked.connect(self.slot_canvasZoomOut)
@@ -188,14 +348,20 @@ class CatiaMainW(AbstractCanvasJackClass):
         self.ui.act_help_about.triggered.connect(self.slot_aboutCatia)
         self.ui.act_help_about_qt.triggered.connect(app.aboutQt)
 
+        self.scene.interactionFinished.connect(self.slot_flushGroupPositions)
+        self.fPositionTimer.timeout.connect(self.slot_flushGroupPositions)
+        self.fIncomingTimer.timeout.connect(self.slot_applyGroupPositions)
+
         self.XRunCallback.connect(self.slot_XRunCallback)
         self.BufferSizeCallback.connect(self.slot_BufferSizeCallback)
         self.SampleRateCallback.connect(self.slot_SampleRateCallback)
+        self.ClientRegistrationCallback.connect(self.slot_ClientRegistrationCallback)
         self.ClientRenameCallback.connect(self.slot_ClientRenameCallback)
         self.PortRegistrationCallback.connect(self.slot_PortRegistrationCallback)
         self.PortConnectCallback.connect(self.slot_PortConnectCallback)
         self.PortRenameCallback.connect(self.slot_PortRenameCallback)
         self.PropertyChangeCallback.connect(self.slot_PropertyChangeCallback)
+        self.LatencyCallback.connect(self.slot_LatencyCallback)
         self.ShutdownCallback.connect(self.slot_ShutdownCallback)
 
         # -------------------------------------------------------------
@@ -221,11 +387,8 @@ class CatiaMainW(AbstractCanvasJackClass):
             groupName = self.canvas_getGroupName(groupId)
             if not groupName:
                 return
-            uuidstr = jacklib.get_uuid_for_client_name(gJack.client, groupName)
-            if uuidstr is None:
-                return
-            value = "%i:%i:%i:%i" % (x1, y1, x2, y2)
-            jacklib.set_property(gJack.client, jacklib.uuid_parse(uuidstr), URI_POSITION, value, "text/plain")
+            self.fPendingPositions[groupName] = "%i:%i:%i:%i" % (x1, y1, x2, y2)
+            self.fPositionTimer.start()
 
         elif action == patchcanvas.ACTION_PORT_INFO:
             groupId = value1
@@ -239,21 +402,14 @@ class CatiaMainW(AbstractCanvasJackClass):
             else:
                 return
 
-            portPtr   = jacklib.port_by_name(gJack.client, portNameR)
-            portFlags = jacklib.port_flags(portPtr)
+            portAttrs = self.canvas_getPortAttributes(portNameR)
+            portFlags = portAttrs[iPortAttrFlags]
             groupName = portNameR.split(":", 1)[0]
-            portShortName = jacklib.port_short_name(portPtr)
-
-            aliases = jacklib.port_get_aliases(portPtr)
-            if aliases[0] == 1:
-                alias1text = aliases[1]
-                alias2text = "(none)"
-            elif aliases[0] == 2:
-                alias1text = aliases[1]
-                alias2text = aliases[2]
-            else:
-                alias1text = "(none)"
-                alias2text = "(none)"
+            portShortName = portAttrs[iPortAttrShortName]
+
+            aliases = portAttrs[iPortAttrAliases]
+            alias1text = aliases[0] if len(aliases) >= 1 else "(none)"
+            alias2text = aliases[1] if len(aliases) >= 2 else "(none)"
 
             flags = []
             if portFlags & jacklib.JackPortIsInput:
@@ -269,7 +425,7 @@ class CatiaMainW(AbstractCanvasJackClass):
 
             flagsText = " | ".join(flags)
 
-            portTypeStr = jacklib.port_type(portPtr)
+            portTypeStr = portAttrs[iPortAttrType]
             if portTypeStr == jacklib.JACK_DEFAULT_AUDIO_TYPE:
                 typeText = self.tr("JACK Audio")
             elif portTypeStr == jacklib.JACK_DEFAULT_MIDI_TYPE:
@@ -277,10 +433,12 @@ class CatiaMainW(AbstractCanvasJackClass):
             else:
                 typeText = self.tr("Unknown")
 
-            portLatency      = jacklib.port_get_latency(portPtr)
-            portTotalLatency = jacklib.port_get_total_latency(gJack.client, portPtr)
+            latency = self.canvas_getPortLatency(portNameR)
+            portLatency      = latency[iPortLatency]
+            portTotalLatency = latency[iPortLatencyTotal]
             latencyText      = self.tr("%.1f ms (%i frames)" % (portLatency * 1000 / int(self.fSampleRate), portLatency))
             latencyTotalText = self.tr("%.1f ms (%i frames)" % (portTotalLatency * 1000 / int(self.fSampleRate), portTotalLatency))
+            latencyRangeText = self.tr("%i - %i frames" % (latency[iPortLatencyMin], latency[iPortLatencyMax]))
 
             info = self.tr(""
                            "<table>"
@@ -295,7 +453,8 @@ class CatiaMainW(AbstractCanvasJackClass):
                            "<tr><td colspan='2'>&nbsp;</td></tr>"
                            "<tr><td align='right'><b>Port Latency:</b></td><td>&nbsp;%s</td></tr>"
                            "<tr><td align='right'><b>Total Port Latency:</b></td><td>&nbsp;%s</td></tr>"
-                           "</table>" % (groupName, portShortName, portNameR, alias1text, alias2text, flagsText, typeText, latencyText, latencyTotalText))
+                           "<tr><td align='right'><b>Latency Range:</b></td><td>&nbsp;%s</td></tr>"
+                           "</table>" % (groupName, portShortName, portNameR, alias1text, alias2text, flagsText, typeText, latencyText, latencyTotalText, latencyRangeText))
 
             QMessageBox.information(self, self.tr("Port Information"), info)
 
@@ -325,26 +484,9 @@ class CatiaMainW(AbstractCanvasJackClass):
             else:
                 return
 
-            portPtr = jacklib.port_by_name(gJack.client, portNameR)
-            aliases = jacklib.port_get_aliases(portPtr)
-
-            if aliases[0] == 2:
-                # JACK only allows 2 aliases, remove 2nd
-                jacklib.port_unset_alias(portPtr, aliases[2])
-
-                # If we're going for 1st alias, unset it too
-                if self.fSavedSettings["Main/JackPortAlias"] == 1:
-                    jacklib.port_unset_alias(portPtr, aliases[1])
-
-            elif aliases[0] == 1 and self.fSavedSettings["Main/JackPortAlias"] == 1:
-                jacklib.port_unset_alias(portPtr, aliases[1])
-
-            if aliases[0] == 0 and self.fSavedSettings["Main/JackPortAlias"] == 2:
-                # If 2nd alias is enabled and port had no previous aliases, set the 1st alias now
-                jacklib.port_set_alias(portPtr, portName)
-
-            if jacklib.port_set_alias(portPtr, portName) == 0:
-                patchcanvas.renamePort(groupId, portId, newName)
+            # the canvas is updated once the alias is set, see slot_jackCommandFinished
+            self.fJackWorker.addCommand(JACK_COMMAND_PORT_ALIAS, portNameR, portName,
+                                        self.fSavedSettings["Main/JackPortAlias"])
 
         elif action == patchcanvas.ACTION_PORTS_CONNECT:
             gOut, pOut, gIn, pIn = tuple(int(i) for i in valueStr.split(":"))
@@ -359,7 +501,7 @@ class CatiaMainW(AbstractCanvasJackClass):
                     portRealNameIn = port[iPortNameR]
 
             if portRealNameOut and portRealNameIn:
-                jacklib.connect(gJack.client, portRealNameOut, portRealNameIn)
+                self.fJackWorker.addCommand(JACK_COMMAND_CONNECT, portRealNameOut, portRealNameIn)
 
         elif action == patchcanvas.ACTION_PORTS_DISCONNECT:
             connectionId = value1
@@ -381,14 +523,28 @@ class CatiaMainW(AbstractCanvasJackClass):
                     portRealNameIn = port[iPortNameR]
 
             if portRealNameOut and portRealNameIn:
-                jacklib.disconnect(gJack.client, portRealNameOut, portRealNameIn)
+                self.fJackWorker.addCommand(JACK_COMMAND_DISCONNECT, portRealNameOut, portRealNameIn)
 
     def initPorts(self):
+        # positions of the groups about to be removed are still valid, unless jack is gone already
+        self.slot_flushGroupPositions()
+
+        self.fStaleGraph = False
+        patchcanvas.setStale(False)
+
         self.fGroupList      = []
         self.fGroupSplitList = []
         self.fPortList       = []
         self.fConnectionList = []
 
+        self.fHiddenPorts   = {}
+        self.fHiddenClients = {}
+        self.ui_setHiddenClients()
+
+        self.fPortAttributes = {}
+        self.fPortUuids      = {}
+        self.fPortsNoUuid    = set()
+
         self.fLastGroupId = 1
         self.fLastPortId  = 1
         self.fLastConnectionId = 1
@@ -417,6 +573,10 @@ class CatiaMainW(AbstractCanvasJackClass):
         self.initJackCallbacks()
         self.initJackPorts()
 
+        # positions from JACK metadata take precedence over any saved layout
+        patchcanvas.restoreLayout({name for name, uuid in self.fClientUuids.items()
+                                   if URI_POSITION in self.fProperties.get(uuid, {})})
+
         self.scene.zoom_fit()
         self.scene.zoom_reset()
 
@@ -429,36 +589,268 @@ class CatiaMainW(AbstractCanvasJackClass):
         jacklib.set_port_registration_callback(gJack.client, self.JackPortRegistrationCallback, None)
         jacklib.set_port_connect_callback(gJack.client, self.JackPortConnectCallback, None)
         jacklib.set_property_change_callback(gJack.client, self.JackPropertyChangeCallback, None)
+        jacklib.set_latency_callback(gJack.client, self.JackLatencyCallback, None)
         jacklib.on_shutdown(gJack.client, self.JackShutdownCallback, None)
 
+        jacklib.set_client_registration_callback(gJack.client, self.JackClientRegistrationCallback, None)
         jacklib.set_client_rename_callback(gJack.client, self.JackClientRenameCallback, None)
         jacklib.set_port_rename_callback(gJack.client, self.JackPortRenameCallback, None)
 
+    def initJackProperties(self):
+        self.fProperties  = {}
+        self.fClientUuids = {}
+        self.fClientNames = {}
+
+        self.fWrittenPositions  = {}
+        self.fIncomingPositions = {}
+
+        for subject, props in jacklib.get_all_properties().items():
+            self.fProperties[subject] = dict((prop.key, prop.value) for prop in props)
+
+        for subject, props in self.fProperties.items():
+            for key in GROUP_PROPERTY_KEYS:
+                if key in props:
+                    self.canvas_getClientName(subject)
+                    break
+
     def initJackPorts(self):
         if not gJack.client:
             return
 
+        self.initJackProperties()
+
         # Get all jack ports
         portNameList = c_char_p_p_to_list(jacklib.get_ports(gJack.client, "", "", 0))
 
+        patchcanvas.beginBulkUpdate()
+
+        if self.fStaleGraph:
+            self.updateCachedGraph(portNameList)
+            patchcanvas.endBulkUpdate()
+            return
+
         # Add jack ports
         for portName in portNameList:
             portPtr = jacklib.port_by_name(gJack.client, portName)
             self.canvas_addJackPort(portPtr, portName)
 
         # Add jack connections
+        for portName, portConName in self.getJackConnections(portNameList):
+            self.canvas_connectPortsByName(portName, portConName)
+
+        patchcanvas.endBulkUpdate()
+
+    def getJackConnections(self, portNameList):
+        connections = []
+
         for portName in portNameList:
             portPtr = jacklib.port_by_name(gJack.client, portName)
 
             # Only make connections from an output port
-            if jacklib.port_flags(portPtr) & jacklib.JackPortIsInput:
+            if self.canvas_getPortAttributes(portName, portPtr)[iPortAttrFlags] & jacklib.JackPortIsInput:
                 continue
 
-            portConnectionNames = tuple(jacklib.port_get_all_connections(gJack.client, portPtr))
+            for portConName in jacklib.port_get_all_connections(gJack.client, portPtr):
+                connections.append((portName, portConName))
+
+        return connections
+
+    def getCachedGraphFilename(self):
+        return os.path.splitext(QSettings().fileName())[0] + "-graph.json"
+
+    # group positions are not part of it, the canvas keeps those already
+    def saveCachedGraph(self):
+        portNames = dict(((port[iPortGroupId], port[iPortId]), port[iPortNameR]) for port in self.fPortList)
+        ports = []
+
+        # not every port has its attributes cached, the ones dropped on metadata changes are read again now
+        for portNameR in list(portNames.values()) + list(self.fHiddenPorts):
+            portAttrs = self.fPortAttributes.get(portNameR, None)
+
+            if portAttrs is None:
+                portPtr = jacklib.port_by_name(gJack.client, portNameR)
+                if not portPtr:
+                    continue
+                portAttrs = self.canvas_getPortAttributes(portNameR, portPtr)
+
+            ports.append([portNameR,
+                          portAttrs[iPortAttrFlags],
+                          portAttrs[iPortAttrType],
+                          portAttrs[iPortAttrShortName],
+                          list(portAttrs[iPortAttrAliases])])
+
+        data = {
+            "version": GRAPH_CACHE_VERSION,
+            "ports": ports,
+            "connections": [[portNames[(connection[iConnOutGroup], connection[iConnOutPort])],
+                             portNames[(connection[iConnInGroup], connection[iConnInPort])]]
+                            for connection in self.fConnectionList],
+        }
+
+        filename = self.getCachedGraphFilename()
+
+        try:
+            dirname = os.path.dirname(filename)
+            if dirname and not os.path.exists(dirname):
+                os.makedirs(dirname)
+            with open(filename + ".tmp", "w", encoding="utf-8") as fh:
+                json.dump(data, fh, separators=(",", ":"))
+            os.replace(filename + ".tmp", filename)
+        except (IOError, OSError) as e:
+            print("Catia - failed to save cached graph:", e)
+
+    def loadCachedGraph(self):
+        try:
+            with open(self.getCachedGraphFilename(), "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+
+            if data["version"] != GRAPH_CACHE_VERSION:
+                return False
+
+            ports = [(str(portNameR), int(flags), str(typeStr), str(shortName), tuple(str(a) for a in aliases))
+                     for portNameR, flags, typeStr, shortName, aliases in data["ports"]]
+            connections = [(str(portOutName), str(portInName)) for portOutName, portInName in data["connections"]]
+
+        except (IOError, KeyError, TypeError, ValueError):
+            return False
+
+        if len(ports) == 0:
+            return False
+
+        # not worth showing when there is no live graph to replace it
+        if not gJack.client:
+            gJack.client = jacklib.client_open("catia", jacklib.JackNoStartServer, None)
+            if not gJack.client:
+                return False
+
+        patchcanvas.beginBulkUpdate()
+
+        # the attributes are taken as they were, the live ones replace them once jack is read
+        for portNameR, flags, typeStr, shortName, aliases in ports:
+            portAttrs = [None, None, None, None, None, None]
+            portAttrs[iPortAttrFlags]     = flags
+            portAttrs[iPortAttrType]      = typeStr
+            portAttrs[iPortAttrAliases]   = aliases
+            portAttrs[iPortAttrShortName] = shortName
+            portAttrs[iPortAttrUuid]      = 0
+            portAttrs[iPortAttrLatency]   = None
+
+            self.fPortAttributes[portNameR] = portAttrs
+            self.canvas_addJackPort(None, portNameR)
+
+        for portOutName, portInName in connections:
+            self.canvas_connectPortsByName(portOutName, portInName)
+
+        patchcanvas.endBulkUpdate()
+        patchcanvas.setStale(True)
+
+        self.fStaleGraph = True
+
+        if DEBUG:
+            print("Catia - cached graph shown after %.1f ms, %i ports and %i connections" % (
+                  (monotonic() - gStartTime) * 1000, len(ports), len(connections)))
+
+        return True
+
+    # only the differences between the cached graph and the live one touch the canvas
+    def updateCachedGraph(self, portNameList):
+        startTime = monotonic()
+
+        cachedAttributes = self.fPortAttributes
+        livePortNames = set(portNameList)
+
+        self.fPortAttributes = {}
+        self.fPortUuids      = {}
+        self.fPortsNoUuid    = set()
+
+        # hidden ports are all added again below, they never get on the canvas
+        self.fHiddenPorts   = {}
+        self.fHiddenClients = {}
+
+        liveConnections = self.getJackConnections(portNameList)
+        liveConnectionSet = set(liveConnections)
+
+        # ports that are gone, or came back with a different flags, type or aliases
+        keptPortNames = set()
+        removedPorts = []
+
+        for port in self.fPortList:
+            portNameR = port[iPortNameR]
+
+            if portNameR in livePortNames:
+                oldAttrs = cachedAttributes[portNameR]
+                newAttrs = self.canvas_getPortAttributes(portNameR)
+
+                if (oldAttrs[iPortAttrFlags] == newAttrs[iPortAttrFlags] and
+                    oldAttrs[iPortAttrType] == newAttrs[iPortAttrType] and
+                    oldAttrs[iPortAttrAliases] == newAttrs[iPortAttrAliases]):
+                    keptPortNames.add(portNameR)
+                    continue
 
-            if portConnectionNames:
-                for portConName in portConnectionNames:
-                    self.canvas_connectPortsByName(portName, portConName)
+            removedPorts.append((port[iPortGroupId], port[iPortId]))
+
+        # connections first, the canvas does not remove those together with their ports
+        portNames = dict(((port[iPortGroupId], port[iPortId]), port[iPortNameR]) for port in self.fPortList)
+        cachedConnections = set()
+        removedConnections = 0
+
+        for connection in tuple(self.fConnectionList):
+            portOutName = portNames[(connection[iConnOutGroup], connection[iConnOutPort])]
+            portInName  = portNames[(connection[iConnInGroup], connection[iConnInPort])]
+
+            if ((portOutName, portInName) in liveConnectionSet and
+                portOutName in keptPortNames and portInName in keptPortNames):
+                cachedConnections.add((portOutName, portInName))
+                continue
+
+            self.canvas_disconnectPorts(*connection[iConnOutGroup:])
+            removedConnections += 1
+
+        for groupId, portId in removedPorts:
+            self.canvas_removeJackPort(groupId, portId)
+
+        keptGroups = tuple(self.fGroupList)
+        addedPorts = 0
+
+        for portName in portNameList:
+            if portName in keptPortNames:
+                continue
+            portPtr = jacklib.port_by_name(gJack.client, portName)
+            self.canvas_addJackPort(portPtr, portName)
+            addedPorts += 1
+
+        addedConnections = 0
+
+        for portName, portConName in liveConnections:
+            if (portName, portConName) in cachedConnections:
+                continue
+            self.canvas_connectPortsByName(portName, portConName)
+            addedConnections += 1
+
+        # new groups got their metadata when added, the ones kept from the cache still need it
+        for group in keptGroups:
+            clientUuid = self.fClientUuids.get(group[iGroupName], None)
+            if clientUuid is None:
+                continue
+
+            props = self.fProperties.get(clientUuid, {})
+
+            if URI_POSITION in props:
+                self.canvas_setGroupPosition(group[iGroupId], props[URI_POSITION])
+            if URI_PLUGIN_ID in props:
+                patchcanvas.setGroupIcon(group[iGroupId], patchcanvas.ICON_PLUGIN)
+
+        self.ui_setHiddenClients()
+
+        self.fStaleGraph = False
+        patchcanvas.setStale(False)
+
+        if DEBUG:
+            print("Catia - cached graph updated in %.1f ms, %.1f ms after start: "
+                  "%i ports kept, %i added, %i removed, %i connections kept, %i added, %i removed" % (
+                  (monotonic() - startTime) * 1000, (monotonic() - gStartTime) * 1000,
+                  len(keptPortNames), addedPorts, len(removedPorts),
+                  len(cachedConnections), addedConnections, removedConnections))
 
     def canvas_getGroupId(self, groupName):
         for group in self.fGroupList:
@@ -472,20 +864,144 @@ class CatiaMainW(AbstractCanvasJackClass):
                 return group[iGroupName]
         return ""
 
+    def canvas_getPortAttributes(self, portNameR, portPtr=None):
+        try:
+            return self.fPortAttributes[portNameR]
+        except KeyError:
+            pass
+
+        if portPtr is None:
+            portPtr = jacklib.port_by_name(gJack.client, portNameR)
+
+        aliases = jacklib.port_get_aliases(portPtr)
+
+        portAttrs = [None, None, None, None, None, None]
+        portAttrs[iPortAttrFlags]     = jacklib.port_flags(portPtr)
+        portAttrs[iPortAttrType]      = jacklib.port_type(portPtr)
+        portAttrs[iPortAttrAliases]   = tuple(aliases[1:aliases[0]+1])
+        portAttrs[iPortAttrShortName] = jacklib.port_short_name(portPtr)
+        portAttrs[iPortAttrUuid]      = jacklib.port_uuid(portPtr)
+        portAttrs[iPortAttrLatency]   = None # read on first use, changes once connections do
+
+        self.fPortAttributes[portNameR] = portAttrs
+
+        if portAttrs[iPortAttrUuid] > 0:
+            self.fPortUuids[portAttrs[iPortAttrUuid]] = portNameR
+        else:
+            self.fPortsNoUuid.add(portNameR)
+
+        return portAttrs
+
+    def canvas_removePortAttributes(self, portNameR):
+        portAttrs = self.fPortAttributes.pop(portNameR, None)
+
+        if portAttrs is not None:
+            self.fPortUuids.pop(portAttrs[iPortAttrUuid], None)
+            self.fPortsNoUuid.discard(portNameR)
+
+    def canvas_getClientName(self, clientUuid):
+        try:
+            return self.fClientNames[clientUuid]
+        except KeyError:
+            pass
+
+        clientName = jacklib.get_client_name_by_uuid(gJack.client, jacklib.uuid_unparse(clientUuid))
+
+        # also cached when not a client, so other subjects are only asked for once
+        if clientName:
+            clientName = jacklib._d(clientName)
+            self.fClientUuids[clientName] = clientUuid
+        else:
+            clientName = None
+
+        self.fClientNames[clientUuid] = clientName
+        return clientName
+
+    def canvas_getClientUuid(self, clientName):
+        try:
+            return self.fClientUuids[clientName]
+        except KeyError:
+            pass
+
+        uuid = jacklib.uuid_parse(jacklib.get_uuid_for_client_name(gJack.client, clientName))
+
+        if not isinstance(uuid, jacklib.jack_uuid_t):
+            return None
+
+        self.fClientUuids[clientName] = uuid.value
+        self.fClientNames[uuid.value] = clientName
+        return uuid.value
+
+    def canvas_removeClientUuid(self, clientName):
+        clientUuid = self.fClientUuids.pop(clientName, None)
+
+        if clientUuid is not None:
+            self.fClientNames.pop(clientUuid, None)
+
+    def canvas_getPortLatency(self, portNameR):
+        portAttrs = self.canvas_getPortAttributes(portNameR)
+
+        if portAttrs[iPortAttrLatency] is not None:
+            return portAttrs[iPortAttrLatency]
+
+        portPtr = jacklib.port_by_name(gJack.client, portNameR)
+
+        if portAttrs[iPortAttrFlags] & jacklib.JackPortIsInput:
+            mode = jacklib.JackPlaybackLatency
+        else:
+            mode = jacklib.JackCaptureLatency
+
+        latencyRange = jacklib.jack_latency_range_t()
+        jacklib.port_get_latency_range(portPtr, mode, latencyRange)
+
+        latency = [None, None, None, None]
+        latency[iPortLatency]      = jacklib.port_get_latency(portPtr)
+        latency[iPortLatencyTotal] = jacklib.port_get_total_latency(gJack.client, portPtr)
+        latency[iPortLatencyMin]   = latencyRange.min
+        latency[iPortLatencyMax]   = latencyRange.max
+
+        portAttrs[iPortAttrLatency] = latency
+        return latency
+
+    def isClientHidden(self, groupName, clientName):
+        if self.fClientFilter is None:
+            return False
+
+        key = (groupName, clientName)
+
+        try:
+            return self.fClientFilterCache[key]
+        except KeyError:
+            pass
+
+        hidden = bool(self.fClientFilter.match(groupName) is not None or
+                      (clientName != groupName and self.fClientFilter.match(clientName) is not None))
+        self.fClientFilterCache[key] = hidden
+        return hidden
+
+    def ui_setHiddenClients(self):
+        count = len(self.fHiddenClients)
+        self.ui.label_hidden_clients.setText(self.tr("%i hidden clients") % count)
+        self.ui.label_hidden_clients.setVisible(count > 0)
+        self.ui.line_5.setVisible(count > 0)
+
     def canvas_addJackGroup(self, groupName):
-        props = jacklib.get_client_properties(gJack.client, groupName)
+        # clients with group properties are all known by uuid already, others have none to read.
+        # the uuid is kept until the client goes away, so a group removed and added again keeps its properties
+        clientUuid = self.fClientUuids.get(groupName, None)
+        props = self.fProperties.get(clientUuid, {}) if clientUuid is not None else {}
 
         groupId    = self.fLastGroupId
         groupSplit = patchcanvas.SPLIT_UNDEF
         groupIcon  = patchcanvas.ICON_APPLICATION
         groupPos   = ""
 
-        for prop in props:
-            if prop.key == URI_POSITION:
-                groupPos = prop.value
-            elif prop.key == URI_PLUGIN_ICON:
-                print("plugin icon is", prop.value)
-            elif prop.key == URI_PLUGIN_ID:
+        for key, value in props.items():
+            if key == URI_POSITION:
+                groupPos = value
+            elif key == URI_PLUGIN_ICON:
+                print("plugin icon is", value)
+            elif key == URI_PLUGIN_ID:
                 groupIcon = patchcanvas.ICON_PLUGIN
 
             #if iconName == "hardware":
@@ -502,15 +1018,14 @@ class CatiaMainW(AbstractCanvasJackClass):
 
         if groupPos:
             x1, y1, x2, y2 = tuple(int(v) for v in groupPos.split(":",4))
-            groupSplit = (x1 != 0 and x2 != 0) or (y1 != 0 and y2 != 0)
+            if (x1 != 0 and x2 != 0) or (y1 != 0 and y2 != 0):
+                groupSplit = patchcanvas.SPLIT_YES
+            else:
+                groupSplit = patchcanvas.SPLIT_NO
 
         patchcanvas.addGroup(groupId, groupName, groupSplit, groupIcon)
 
         if groupPos:
-            if groupSplit:
-                patchcanvas.splitGroup(groupId)
-            else:
-                patchcanvas.joinGroup(groupId)
             patchcanvas.setGroupPosFull(groupId, x1, y1, x2, y2)
 
         groupObj = [None, None]
@@ -522,6 +1037,31 @@ class CatiaMainW(AbstractCanvasJackClass):
 
         return groupId
 
+    def canvas_setGroupPosition(self, groupId, value):
+        x1, y1, x2, y2 = tuple(int(v) for v in value.split(":",4))
+        split = (x1 != 0 and x2 != 0) or (y1 != 0 and y2 != 0)
+
+        # split and join rebuild the whole group, only do them when the state really changes
+        if split != patchcanvas.isGroupSplit(groupId):
+            if split:
+                patchcanvas.splitGroup(groupId)
+            else:
+                patchcanvas.joinGroup(groupId)
+            moved = True
+
+        else:
+            pos = patchcanvas.getGroupPos(groupId, patchcanvas.PORT_MODE_OUTPUT)
+            moved = pos.x() != x1 or pos.y() != y1
+            if split and not moved:
+                pos = patchcanvas.getGroupPos(groupId, patchcanvas.PORT_MODE_INPUT)
+                moved = pos.x() != x2 or pos.y() != y2
+
+        if moved:
+            patchcanvas.setGroupPosFull(groupId, x1, y1, x2, y2)
+
+        # split and join report the position from before, the one just applied is already stored
+        self.fPendingPositions.pop(self.canvas_getGroupName(groupId), None)
+
     def canvas_removeGroup(self, groupName):
         groupId = -1
         for group in self.fGroupList:
@@ -540,18 +1080,32 @@ class CatiaMainW(AbstractCanvasJackClass):
         groupId = -1
 
         portNameR = portName
+        portAttrs = self.canvas_getPortAttributes(portNameR, portPtr)
+        searchNames = []
 
         aliasN = self.fSavedSettings["Main/JackPortAlias"]
         if aliasN in (1, 2):
-            aliases = jacklib.port_get_aliases(portPtr)
-            if aliases[0] == 2 and aliasN == 2:
-                portName = aliases[2]
-            elif aliases[0] >= 1 and aliasN == 1:
+            aliases = portAttrs[iPortAttrAliases]
+            if len(aliases) == 2 and aliasN == 2:
                 portName = aliases[1]
+            elif len(aliases) >= 1 and aliasN == 1:
+                portName = aliases[0]
+
+            # make the real name and other aliases findable too
+            for name in (portNameR,) + aliases:
+                if name and name != portName:
+                    searchNames.append(name)
 
-        portFlags = jacklib.port_flags(portPtr)
         groupName = portName.split(":", 1)[0]
 
+        if self.isClientHidden(groupName, portNameR.split(":", 1)[0]):
+            self.fHiddenPorts[portNameR] = groupName
+            self.fHiddenClients[groupName] = self.fHiddenClients.get(groupName, 0) + 1
+            self.ui_setHiddenClients()
+            return -1
+
+        portFlags = portAttrs[iPortAttrFlags]
+
         if portFlags & jacklib.JackPortIsInput:
             portMode = patchcanvas.PORT_MODE_INPUT
         elif portFlags & jacklib.JackPortIsOutput:
@@ -561,7 +1115,7 @@ class CatiaMainW(AbstractCanvasJackClass):
 
         portShortName = portName.replace("%s:" % groupName, "", 1)
 
-        portTypeStr = jacklib.port_type(portPtr)
+        portTypeStr = portAttrs[iPortAttrType]
         if portTypeStr == jacklib.JACK_DEFAULT_AUDIO_TYPE:
             portType = patchcanvas.PORT_TYPE_AUDIO_JACK
         elif portTypeStr == jacklib.JACK_DEFAULT_MIDI_TYPE:
@@ -589,6 +1143,9 @@ class CatiaMainW(AbstractCanvasJackClass):
         self.fPortList.append(portObj)
         self.fLastPortId += 1
 
+        if len(searchNames) != 0:
+            patchcanvas.setPortSearchAliases(groupId, portId, searchNames)
+
         if groupId not in self.fGroupSplitList and (portFlags & jacklib.JackPortIsPhysical) > 0:
             patchcanvas.splitGroup(groupId)
             patchcanvas.setGroupIcon(groupId, patchcanvas.ICON_HARDWARE)
@@ -634,6 +1191,9 @@ class CatiaMainW(AbstractCanvasJackClass):
         return connectionId
 
     def canvas_connectPortsByName(self, portOutName, portInName):
+        if portOutName in self.fHiddenPorts or portInName in self.fHiddenPorts:
+            return -1
+
         outGroupId = outPortId = inGroupId = inPortId = -1
 
         for port in self.fPortList:
@@ -668,6 +1228,9 @@ class CatiaMainW(AbstractCanvasJackClass):
             break
 
     def canvas_disconnectPortsByName(self, portOutName, portInName):
+        if portOutName in self.fHiddenPorts or portInName in self.fHiddenPorts:
+            return
+
         outGroupId = outPortId = inGroupId = inPortId = -1
 
         for port in self.fPortList:
@@ -694,6 +1257,8 @@ class CatiaMainW(AbstractCanvasJackClass):
                 self.jackStopped()
                 return False
 
+        self.fJackWorker.setClient(gJack.client)
+
         self.menuJackTransport(True)
 
         self.ui.cb_buffer_size.setEnabled(True)
@@ -710,6 +1275,7 @@ class CatiaMainW(AbstractCanvasJackClass):
     def jackStopped(self):
         # client already closed
         gJack.client = None
+        self.fJackWorker.setClient(None)
 
         # refresh canvas (remove jack ports)
         patchcanvas.clear()
@@ -755,6 +1321,10 @@ class CatiaMainW(AbstractCanvasJackClass):
         self.SampleRateCallback.emit(sampleRate)
         return 0
 
+    def JackClientRegistrationCallback(self, clientName, registerYesNo, arg):
+        if DEBUG: print("JackClientRegistrationCallback(\"%s\", %i)" % (clientName, registerYesNo))
+        self.ClientRegistrationCallback.emit(str(clientName, encoding="utf-8"), bool(registerYesNo))
+
     def JackClientRenameCallback(self, oldName, newName, arg):
         if DEBUG: print("JackClientRenameCallback(\"%s\", \"%s\")" % (oldName, newName))
         self.ClientRenameCallback.emit(str(oldName, encoding="utf-8"), str(newName, encoding="utf-8"))
@@ -777,9 +1347,14 @@ class CatiaMainW(AbstractCanvasJackClass):
 
     def JackPropertyChangeCallback(self, uuid, key, change, arg):
         if DEBUG: print("PropertyChangeCallback(%i, %s, %i)" % (uuid, key, change))
-        self.PropertyChangeCallback.emit(jacklib.jack_uuid_t(uuid), str(key, encoding="utf-8"), change)
+        # key is NULL when all properties of the subject got removed
+        self.PropertyChangeCallback.emit(jacklib.jack_uuid_t(uuid), str(key, encoding="utf-8") if key else "", change)
         return 0
 
+    def JackLatencyCallback(self, mode, arg):
+        if DEBUG: print("JackLatencyCallback(%i)" % mode)
+        self.LatencyCallback.emit(mode)
+
     def JackShutdownCallback(self, arg):
         if DEBUG: print("JackShutdownCallback()")
         self.ShutdownCallback.emit()
@@ -807,9 +1382,17 @@ class CatiaMainW(AbstractCanvasJackClass):
         self.ui_setRealTime(bool(int(jacklib.is_realtime(gJack.client))))
         self.ui_setXruns(0)
 
+    @pyqtSlot(str, bool)
+    def slot_ClientRegistrationCallback(self, clientName, registerYesNo):
+        # a client registered later under the same name gets a new uuid
+        if not registerYesNo:
+            self.canvas_removeClientUuid(clientName)
+
     @pyqtSlot(str, str)
     def slot_ClientRenameCallback(self, oldName, newName):
-        pass # TODO
+        # same uuid, looked up again under the new name
+        self.canvas_removeClientUuid(oldName)
+        # TODO
 
     @pyqtSlot(int, bool)
     def slot_PortRegistrationCallback(self, portIdJack, registerYesNo):
@@ -818,6 +1401,16 @@ class CatiaMainW(AbstractCanvasJackClass):
 
         if registerYesNo:
             self.canvas_addJackPort(portPtr, portNameR)
+            return
+
+        self.canvas_removePortAttributes(portNameR)
+
+        if portNameR in self.fHiddenPorts:
+            groupName = self.fHiddenPorts.pop(portNameR)
+            self.fHiddenClients[groupName] -= 1
+            if self.fHiddenClients[groupName] == 0:
+                del self.fHiddenClients[groupName]
+            self.ui_setHiddenClients()
         else:
             for port in self.fPortList:
                 if port[iPortNameR] == portNameR:
@@ -843,8 +1436,24 @@ class CatiaMainW(AbstractCanvasJackClass):
 
     @pyqtSlot(int, str, str)
     def slot_PortRenameCallback(self, portIdJack, oldName, newName):
-        portPtr = jacklib.port_by_id(gJack.client, portIdJack)
-        portShortName = jacklib.port_short_name(portPtr)
+        portAttrs = self.fPortAttributes.pop(oldName, None)
+
+        if portAttrs is None:
+            portAttrs = self.canvas_getPortAttributes(newName, jacklib.port_by_id(gJack.client, portIdJack))
+        else:
+            portAttrs[iPortAttrShortName] = newName.split(":", 1)[-1]
+            self.fPortAttributes[newName] = portAttrs
+            if portAttrs[iPortAttrUuid] > 0:
+                self.fPortUuids[portAttrs[iPortAttrUuid]] = newName
+            elif oldName in self.fPortsNoUuid:
+                self.fPortsNoUuid.remove(oldName)
+                self.fPortsNoUuid.add(newName)
+
+        portShortName = portAttrs[iPortAttrShortName]
+
+        if oldName in self.fHiddenPorts:
+            self.fHiddenPorts[newName] = self.fHiddenPorts.pop(oldName)
+            return
 
         for port in self.fPortList:
             if port[iPortNameR] == oldName:
@@ -856,49 +1465,186 @@ class CatiaMainW(AbstractCanvasJackClass):
             return
 
         # Only set new name in canvas if no alias is active for this port
-        aliases = jacklib.port_get_aliases(portPtr)
-        if aliases[0] == 1 and self.fSavedSettings["Main/JackPortAlias"] == 1:
+        aliases = portAttrs[iPortAttrAliases]
+        if len(aliases) == 1 and self.fSavedSettings["Main/JackPortAlias"] == 1:
             pass
-        elif aliases[0] == 2 and self.fSavedSettings["Main/JackPortAlias"] == 2:
+        elif len(aliases) == 2 and self.fSavedSettings["Main/JackPortAlias"] == 2:
             pass
         else:
             self.canvas_renamePort(groupId, portIdCanvas, portShortName)
 
     @pyqtSlot(jacklib.jack_uuid_t, str, int)
     def slot_PropertyChangeCallback(self, uuid, key, change):
-        if key != URI_POSITION:
+        subject = uuid.value
+
+        if change == jacklib.PropertyDeleted:
+            if key:
+                self.fProperties.get(subject, {}).pop(key, None)
+            else:
+                self.fProperties.pop(subject, None)
+            value = None
+        else:
+            prop = jacklib.get_property(uuid, key)
+
+            if prop is None:
+                return
+
+            value = prop.value
+            self.fProperties.setdefault(subject, {})[key] = value
+
+        portNameR = self.fPortUuids.get(subject, None)
+
+        # port metadata changed, read its attributes again on next use
+        if portNameR is not None:
+            self.canvas_removePortAttributes(portNameR)
             return
 
-        prop = jacklib.get_property(uuid, key)
+        # ports without a uuid can not be matched against the subject, unless it is a client they all get read again
+        if len(self.fPortsNoUuid) != 0 and not self.canvas_getClientName(subject):
+            for portNameR in list(self.fPortsNoUuid):
+                self.canvas_removePortAttributes(portNameR)
 
-        if prop is None:
-          return
+        if key not in GROUP_PROPERTY_KEYS:
+            return
 
-        x1, y1, x2, y2 = tuple(int(v) for v in prop.value.split(":",4))
+        clientName = self.canvas_getClientName(subject)
 
-        clientName = jacklib.get_client_name_by_uuid(gJack.client, jacklib.uuid_unparse(uuid))
+        if not clientName or key != URI_POSITION or value is None:
+            return
 
-        if not clientName:
+        # our own write coming back
+        if self.fWrittenPositions.get(subject, None) == value:
+            del self.fWrittenPositions[subject]
             return
 
-        groupId = self.canvas_getGroupId(jacklib._d(clientName))
+        self.fIncomingPositions[subject] = value
+
+        if not self.fIncomingTimer.isActive():
+            self.fIncomingTimer.start()
 
-        if groupId == -1:
+    @pyqtSlot()
+    def slot_flushGroupPositions(self):
+        self.fPositionTimer.stop()
+
+        pendingPositions = self.fPendingPositions
+        self.fPendingPositions = {}
+
+        if not gJack.client:
             return
 
-        if (x1 != 0 and x2 != 0) or (y1 != 0 and y2 != 0):
-            patchcanvas.splitGroup(groupId)
+        for groupName, value in pendingPositions.items():
+            clientUuid = self.canvas_getClientUuid(groupName)
+            if clientUuid is None:
+                continue
+
+            props = self.fProperties.setdefault(clientUuid, {})
+
+            if props.get(URI_POSITION, None) == value:
+                continue
+
+            props[URI_POSITION] = value
+            self.fWrittenPositions[clientUuid] = value
+            self.fJackWorker.addCommand(JACK_COMMAND_SET_PROPERTY, clientUuid, URI_POSITION, value, "text/plain")
+
+    @pyqtSlot()
+    def slot_applyGroupPositions(self):
+        incomingPositions = self.fIncomingPositions
+        self.fIncomingPositions = {}
+
+        patchcanvas.beginBulkUpdate()
+
+        for clientUuid, value in incomingPositions.items():
+            clientName = self.canvas_getClientName(clientUuid)
+            if not clientName:
+                continue
+
+            groupId = self.canvas_getGroupId(clientName)
+            if groupId == -1:
+                continue
+
+            self.canvas_setGroupPosition(groupId, value)
+
+        patchcanvas.endBulkUpdate()
+
+    @pyqtSlot(int, object, object)
+    def slot_jackCommandFinished(self, command, args, result):
+        if command != JACK_COMMAND_PORT_ALIAS:
+            AbstractCanvasJackClass.slot_jackCommandFinished(self, command, args, result)
+            return
+
+        portNameR, portName = args[0], args[1]
+
+        portAttrs = self.fPortAttributes.get(portNameR, None)
+        if portAttrs is not None:
+            portAttrs[iPortAttrAliases] = result
+
+        for port in self.fPortList:
+            if port[iPortNameR] == portNameR:
+                patchcanvas.renamePort(port[iPortGroupId], port[iPortId], portName[len(port[iPortGroupName])+1:])
+                break
+
+    @pyqtSlot(int, object, int)
+    def slot_jackCommandFailed(self, command, args, error):
+        # some aliases may have been removed before failing, have them read again
+        if command == JACK_COMMAND_PORT_ALIAS:
+            self.canvas_removePortAttributes(args[0])
+
+        # the position never got stored, forget it so the next move writes it again
+        elif command == JACK_COMMAND_SET_PROPERTY and args[1] == URI_POSITION:
+            clientUuid, value = args[0], args[2]
+            props = self.fProperties.get(clientUuid, None)
+
+            if props is not None and props.get(URI_POSITION, None) == value:
+                del props[URI_POSITION]
+            if self.fWrittenPositions.get(clientUuid, None) == value:
+                del self.fWrittenPositions[clientUuid]
+
+        AbstractCanvasJackClass.slot_jackCommandFailed(self, command, args, error)
+
+    @pyqtSlot(int)
+    def slot_LatencyCallback(self, mode):
+        # capture latency is the one of output ports, playback latency the one of input ports
+        if mode == jacklib.JackCaptureLatency:
+            portFlag = jacklib.JackPortIsOutput
         else:
-            patchcanvas.joinGroup(groupId)
-        patchcanvas.setGroupPosFull(groupId, x1, y1, x2, y2)
+            portFlag = jacklib.JackPortIsInput
+
+        for portAttrs in self.fPortAttributes.values():
+            if portAttrs[iPortAttrFlags] & portFlag:
+                portAttrs[iPortAttrLatency] = None
 
     @pyqtSlot()
     def slot_ShutdownCallback(self):
         self.jackStopped()
 
+    @pyqtSlot()
+    def slot_canvasFind(self):
+        CommandPaletteW(self).exec_()
+
+    @pyqtSlot()
+    def slot_canvasMatrix(self):
+        if self.fMatrixWindow is None:
+            self.fMatrixWindow = ConnectionMatrixW(self)
+
+        self.fMatrixWindow.show()
+        self.fMatrixWindow.raise_()
+        self.fMatrixWindow.activateWindow()
+
+    @pyqtSlot(bool)
+    def slot_canvasShowAudio(self, yesno):
+        self.ui.act_canvas_show_audio.setChecked(yesno)
+        self.ui.b_canvas_show_audio.setChecked(yesno)
+        patchcanvas.setPortTypeVisible(patchcanvas.PORT_TYPE_AUDIO_JACK, yesno)
+
+    @pyqtSlot(bool)
+    def slot_canvasShowMidi(self, yesno):
+        self.ui.act_canvas_show_midi.setChecked(yesno)
+        self.ui.b_canvas_show_midi.setChecked(yesno)
+        patchcanvas.setPortTypeVisible(patchcanvas.PORT_TYPE_MIDI_JACK, yesno)
+
     @pyqtSlot()
     def slot_configureCatia(self):
-        dialog = SettingsW(self, "catia", hasGL)
+        dialog = SettingsW(self, "catia", isOpenGLAvailable())
         if dialog.exec_():
             self.loadSettings(False)
             patchcanvas.clear()
@@ -909,8 +1655,13 @@ class CatiaMainW(AbstractCanvasJackClass):
             pOptions.use_bezier_lines  = self.fSavedSettings["Canvas/UseBezierLines"]
             pOptions.antialiasing      = self.fSavedSettings["Canvas/Antialiasing"]
             pOptions.eyecandy          = self.fSavedSettings["Canvas/EyeCandy"]
+            pOptions.eyecandy_max_items = self.fSavedSettings["Canvas/EyeCandyMaxItems"]
             pOptions.auto_select_items = False # TODO
             pOptions.inline_displays   = False
+            pOptions.adaptive_quality  = self.fSavedSettings["Canvas/AdaptiveQuality"]
+            pOptions.frame_budget      = self.fSavedSettings["Canvas/FrameBudget"]
+            pOptions.managed_pan_zoom  = self.fSavedSettings["Canvas/ManagedPanZoom"]
+            pOptions.lightweight_ports = self.fSavedSettings["Canvas/LightweightPorts"]
 
             pFeatures = patchcanvas.features_t()
             pFeatures.group_info   = False
@@ -938,6 +1689,9 @@ class CatiaMainW(AbstractCanvasJackClass):
         settings.setValue("Geometry", self.saveGeometry())
         settings.setValue("ShowToolbar",  self.ui.act_settings_show_toolbar.isChecked())
         settings.setValue("ShowStatusbar", self.ui.act_settings_show_statusbar.isChecked())
+        settings.setValue("ShowMinimap", self.ui.act_settings_show_minimap.isChecked())
+        settings.setValue("ShowAudioPorts", self.ui.act_canvas_show_audio.isChecked())
+        settings.setValue("ShowMidiPorts", self.ui.act_canvas_show_midi.isChecked())
         settings.setValue("TransportView", self.fCurTransportView)
 
     def loadSettings(self, geometry):
@@ -954,20 +1708,42 @@ class CatiaMainW(AbstractCanvasJackClass):
             self.ui.act_settings_show_statusbar.setChecked(showStatusbar)
             self.ui.frame_statusbar.setVisible(showStatusbar)
 
+            showMinimap = settings.value("ShowMinimap", False, type=bool)
+            self.ui.act_settings_show_minimap.setChecked(showMinimap)
+            self.ui.dock_minimap.setVisible(showMinimap)
+
+            showAudioPorts = settings.value("ShowAudioPorts", True, type=bool)
+            self.ui.act_canvas_show_audio.setChecked(showAudioPorts)
+            self.ui.b_canvas_show_audio.setChecked(showAudioPorts)
+
+            showMidiPorts = settings.value("ShowMidiPorts", True, type=bool)
+            self.ui.act_canvas_show_midi.setChecked(showMidiPorts)
+            self.ui.b_canvas_show_midi.setChecked(showMidiPorts)
+
             self.setTransportView(settings.value("TransportView", TRANSPORT_VIEW_HMS, type=int))
 
         self.fSavedSettings = {
             "Main/RefreshInterval": settings.value("Main/RefreshInterval", 120, type=int),
             "Main/JackPortAlias": settings.value("Main/JackPortAlias", 2, type=int),
+            "Main/ClientFilters": settings.value("Main/ClientFilters", "", type=str),
             "Canvas/Theme": settings.value("Canvas/Theme", patchcanvas.getDefaultThemeName(), type=str),
             "Canvas/AutoHideGroups": settings.value("Canvas/AutoHideGroups", False, type=bool),
             "Canvas/UseBezierLines": settings.value("Canvas/UseBezierLines", True, type=bool),
             "Canvas/EyeCandy": settings.value("Canvas/EyeCandy", patchcanvas.EYECANDY_SMALL, type=int),
+            "Canvas/EyeCandyMaxItems": settings.value("Canvas/EyeCandyMaxItems", 100, type=int),
             "Canvas/UseOpenGL": settings.value("Canvas/UseOpenGL", False, type=bool),
+            "Canvas/OpenGLSamples": settings.value("Canvas/OpenGLSamples", 4, type=int),
+            "Canvas/LightweightPorts": settings.value("Canvas/LightweightPorts", False, type=bool),
             "Canvas/Antialiasing": settings.value("Canvas/Antialiasing", patchcanvas.ANTIALIASING_SMALL, type=int),
-            "Canvas/HighQualityAntialiasing": settings.value("Canvas/HighQualityAntialiasing", False, type=bool)
+            "Canvas/HighQualityAntialiasing": settings.value("Canvas/HighQualityAntialiasing", False, type=bool),
+            "Canvas/AdaptiveQuality": settings.value("Canvas/AdaptiveQuality", True, type=bool),
+            "Canvas/FrameBudget": settings.value("Canvas/FrameBudget", 20, type=int),
+            "Canvas/ManagedPanZoom": settings.value("Canvas/ManagedPanZoom", True, type=bool)
         }
 
+        self.fClientFilter = compileClientFilters(self.fSavedSettings["Main/ClientFilters"])
+        self.fClientFilterCache = {}
+
     def timerEvent(self, event):
         if event.timerId() == self.fTimer120:
             if gJack.client:
@@ -977,9 +1753,44 @@ class CatiaMainW(AbstractCanvasJackClass):
                 self.refreshDSPLoad()
         QMainWindow.timerEvent(self, event)
 
+    def eventFilter(self, obj, event):
+        if obj is self.fFirstFrameViewport and event.type() == QEvent.Paint:
+            self.fFirstFrameViewport.removeEventFilter(self)
+            self.fFirstFrameViewport = None
+
+            # runs once the paint is done
+            QTimer.singleShot(0, self.slot_firstFramePainted)
+
+        return QMainWindow.eventFilter(self, obj, event)
+
+    @pyqtSlot()
+    def slot_firstFramePainted(self):
+        if DEBUG:
+            print("Catia - first frame after %.1f ms, showing the %s graph" % (
+                  (monotonic() - gStartTime) * 1000, "cached" if self.fStaleGraph else "live"))
+
+        self.slot_warmStart()
+
+    @pyqtSlot()
+    def slot_warmStart(self):
+        if not self.fWarmStartPending:
+            return
+
+        self.fWarmStartPending = False
+        self.jackStarted()
+
     def closeEvent(self, event):
+        # a cached graph not checked yet is still on disk as it was
+        if gJack.client and not self.fStaleGraph:
+            self.saveCachedGraph()
+
+        self.slot_flushGroupPositions()
         self.saveSettings()
         patchcanvas.clear()
+
+        # pending commands still get to run, group positions among them
+        self.fJackWorker.stop()
+
         QMainWindow.closeEvent(self, event)
 
 # ------------------------------------------------------------------------------------------------------------
@@ -990,6 +1801,11 @@ if __name__ == '__main__':
     QApplication.setAttribute(Qt.AA_EnableHighDpiScaling)
     QApplication.setAttribute(Qt.AA_UseHighDpiPixmaps)
 
+    # Mesa software rasterizer, to try the OpenGL canvas on machines without a GPU
+    if "--software-gl" in sys.argv:
+        os.environ["LIBGL_ALWAYS_SOFTWARE"] = "1"
+        QApplication.setAttribute(Qt.AA_UseSoftwareOpenGL)
+
     app = QApplication(sys.argv)
     app.setApplicationName("Catia")
     app.setApplicationVersion(VERSION)
@@ -1015,8 +1831,8 @@ if __name__ == '__main__':
     # App-Loop
     ret = app.exec_()
 
-    # Close Jack
-    if gJack.client:
+    # Close Jack, unless a command is still stuck in a call on this client
+    if gJack.client and gui.fJackWorker.stop():
         jacklib.deactivate(gJack.client)
         jacklib.client_close(gJack.client)
 
@@ -21,38 +21,71 @@
 
 from __future__ import absolute_import, print_function, unicode_literals
 
-from ctypes import (ARRAY, CFUNCTYPE, POINTER, Structure, byref, c_char_p, c_double, c_float,
-                    c_int, c_int32, c_size_t, c_uint8, c_uint32, c_uint64, c_ulong, c_void_p, cdll,
-                    pointer)
+from ctypes import (ARRAY, CFUNCTYPE, POINTER, Structure, addressof, byref, c_char_p, c_double,
+                    c_float, c_int, c_int32, c_size_t, c_uint8, c_uint32, c_uint64, c_ulong, c_void_p,
+                    cast, cdll, create_string_buffer, pointer)
 from collections import namedtuple
 from sys import platform
+from threading import local
 
 
 # -------------------------------------------------------------------------------------------------
 # Load JACK shared library
 
+class _JackLibrary(object):
+    """Resolves JACK symbols on first use, with the signature declared for them.
+
+    Resolved functions are cached as instance attributes, so only the first lookup of each symbol
+    goes through __getattr__. Symbols missing in the loaded library resolve to None.
+    """
+
+    def __init__(self, lib):
+        self._lib = lib
+        self._signatures = {}
+
+    def _declare(self, name, argtypes, restype):
+        self._signatures[name] = (argtypes, restype)
+
+        func = self.__dict__.get(name)
+        if func is not None:
+            func.argtypes = argtypes
+            func.restype = restype
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        try:
+            func = self._lib[name]
+        except AttributeError:
+            func = None
+        else:
+            signature = self._signatures.get(name)
+            if signature is not None:
+                func.argtypes, func.restype = signature
+
+        setattr(self, name, func)
+        return func
+
+
 try:
     if platform == "darwin":
-        jlib = cdll.LoadLibrary("libjack.dylib")
+        jlib = _JackLibrary(cdll.LoadLibrary("libjack.dylib"))
     elif platform in ("win32", "win64", "cygwin"):
-        jlib = cdll.LoadLibrary("libjack.dll")
+        jlib = _JackLibrary(cdll.LoadLibrary("libjack.dll"))
     else:
-        jlib = cdll.LoadLibrary("libjack.so.0")
+        jlib = _JackLibrary(cdll.LoadLibrary("libjack.so.0"))
 except OSError:
     jlib = None
     raise ImportError("JACK is not available in this system")
 
+_declare = jlib._declare
+
 
 # -------------------------------------------------------------------------------------------------
 # JACK2 test
 
-try:
-    if jlib.jack_get_version_string:
-        JACK2 = True
-    else:
-        JACK2 = False
-except AttributeError:
-    JACK2 = False
+JACK2 = jlib.jack_get_version_string is not None
 
 
 # -------------------------------------------------------------------------------------------------
@@ -112,6 +145,41 @@ def _d(s, encoding=ENCODING):
     return s
 
 
+class _c_str_p(c_char_p):
+    """char* argument type which also takes str, for functions called without a Python wrapper."""
+
+    @classmethod
+    def from_param(cls, value):
+        if isinstance(value, str):
+            return value.encode(ENCODING)
+        return value
+
+
+def take_string_list(c_char_p_p, encoding=ENCODING, errors="strict"):
+    """Convert a NULL-terminated char** returned by JACK into a list and jack_free() it."""
+    if not c_char_p_p:
+        return []
+
+    try:
+        # find the terminator on the raw pointers, then copy all strings out at once before the memory goes away
+        pointers = cast(c_char_p_p, POINTER(c_void_p))
+        count = 0
+        while pointers[count]:
+            count += 1
+        strings = c_char_p_p[:count]
+    finally:
+        jlib.jack_free(c_char_p_p)
+
+    if not strings:
+        return []
+
+    if not encoding:
+        return strings
+
+    # C strings can not contain a null character, so decode them all at once
+    return b"\0".join(strings).decode(encoding, errors).split("\0")
+
+
 # -------------------------------------------------------------------------------------------------
 # Types
 
@@ -327,65 +395,17 @@ JackErrorCallback = CFUNCTYPE(None, c_char_p)
 # -------------------------------------------------------------------------------------------------
 # Functions
 
-try:
-    jlib.jack_get_version_string.argtypes = None
-    jlib.jack_get_version_string.restype = c_char_p
-except AttributeError:
-    jlib.jack_get_version_string = None
-
-try:
-    jlib.jack_client_open.argtypes = [c_char_p, jack_options_t, POINTER(jack_status_t), c_char_p]
-    jlib.jack_client_open.restype = POINTER(jack_client_t)
-except AttributeError:
-    jlib.jack_client_open = None
-
-try:
-    jlib.jack_client_rename.argtypes = [POINTER(jack_client_t), c_char_p]
-    jlib.jack_client_rename.restype = c_char_p
-except AttributeError:
-    jlib.jack_client_rename = None
-
-try:
-    jlib.jack_client_close.argtypes = [POINTER(jack_client_t)]
-    jlib.jack_client_close.restype = c_int
-except AttributeError:
-    jlib.jack_client_close = None
-
-try:
-    jlib.jack_client_name_size.argtypes = None
-    jlib.jack_client_name_size.restype = c_int
-except AttributeError:
-    jlib.jack_client_name_size = None
-
-try:
-    jlib.jack_get_client_name.argtypes = [POINTER(jack_client_t)]
-    jlib.jack_get_client_name.restype = c_char_p
-except AttributeError:
-    jlib.jack_get_client_name = None
-
-try:
-    jlib.jack_activate.argtypes = [POINTER(jack_client_t)]
-    jlib.jack_activate.restype = c_int
-except AttributeError:
-    jlib.jack_activate = None
-
-try:
-    jlib.jack_deactivate.argtypes = [POINTER(jack_client_t)]
-    jlib.jack_deactivate.restype = c_int
-except AttributeError:
-    jlib.jack_deactivate = None
-
-try:
-    jlib.jack_get_client_pid.argtypes = [c_char_p]
-    jlib.jack_get_client_pid.restype = c_int
-except AttributeError:
-    jlib.jack_get_client_pid = None
-
-try:
-    jlib.jack_is_realtime.argtypes = [POINTER(jack_client_t)]
-    jlib.jack_is_realtime.restype = c_int
-except AttributeError:
-    jlib.jack_is_realtime = None
+_declare("jack_get_version_string", None, c_char_p)
+_declare("jack_client_open", [c_char_p, jack_options_t, POINTER(jack_status_t),
+                              c_char_p], POINTER(jack_client_t))
+_declare("jack_client_rename", [POINTER(jack_client_t), c_char_p], c_char_p)
+_declare("jack_client_close", [POINTER(jack_client_t)], c_int)
+_declare("jack_client_name_size", None, c_int)
+_declare("jack_get_client_name", [POINTER(jack_client_t)], c_char_p)
+_declare("jack_activate", [POINTER(jack_client_t)], c_int)
+_declare("jack_deactivate", [POINTER(jack_client_t)], c_int)
+_declare("jack_get_client_pid", [c_char_p], c_int)
+_declare("jack_is_realtime", [POINTER(jack_client_t)], c_int)
 
 
 # JACK2 only:
@@ -465,23 +485,9 @@ def is_realtime(client):
 
 _thread_callback = None
 
-try:
-    jlib.jack_cycle_wait.argtypes = [POINTER(jack_client_t)]
-    jlib.jack_cycle_wait.restype = jack_nframes_t
-except AttributeError:
-    jlib.jack_cycle_wait = None
-
-try:
-    jlib.jack_cycle_signal.argtypes = [POINTER(jack_client_t), c_int]
-    jlib.jack_cycle_signal.restype = None
-except AttributeError:
-    jlib.jack_cycle_signal = None
-
-try:
-    jlib.jack_set_process_thread.argtypes = [POINTER(jack_client_t), JackThreadCallback, c_void_p]
-    jlib.jack_set_process_thread.restype = c_int
-except AttributeError:
-    jlib.jack_set_process_thread = None
+_declare("jack_cycle_wait", [POINTER(jack_client_t)], jack_nframes_t)
+_declare("jack_cycle_signal", [POINTER(jack_client_t), c_int], None)
+_declare("jack_set_process_thread", [POINTER(jack_client_t), JackThreadCallback, c_void_p], c_int)
 
 
 def cycle_wait(client):
@@ -515,147 +521,35 @@ _port_registration_callback = _port_connect_callback = _port_rename_callback = N
 _graph_callback = _xrun_callback = _latency_callback = None
 _property_change_callback = None
 
-try:
-    jlib.jack_set_thread_init_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackThreadInitCallback,
-        c_void_p
-    ]
-    jlib.jack_set_thread_init_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_thread_init_callback = None
-
-try:
-    jlib.jack_on_shutdown.argtypes = [POINTER(jack_client_t), JackShutdownCallback, c_void_p]
-    jlib.jack_on_shutdown.restype = None
-except AttributeError:
-    jlib.jack_on_shutdown = None
-
-try:
-    jlib.jack_on_info_shutdown.argtypes = [
-        POINTER(jack_client_t),
-        JackInfoShutdownCallback,
-        c_void_p
-    ]
-    jlib.jack_on_info_shutdown.restype = None
-except AttributeError:
-    jlib.jack_on_info_shutdown = None
-
-try:
-    jlib.jack_set_process_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackProcessCallback,
-        c_void_p
-    ]
-    jlib.jack_set_process_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_process_callback = None
-
-try:
-    jlib.jack_set_freewheel_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackFreewheelCallback,
-        c_void_p
-    ]
-    jlib.jack_set_freewheel_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_freewheel_callback = None
-
-try:
-    jlib.jack_set_buffer_size_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackBufferSizeCallback,
-        c_void_p
-    ]
-    jlib.jack_set_buffer_size_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_buffer_size_callback = None
-
-try:
-    jlib.jack_set_sample_rate_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackSampleRateCallback,
-        c_void_p
-    ]
-    jlib.jack_set_sample_rate_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_sample_rate_callback = None
-
-try:
-    jlib.jack_set_client_registration_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackClientRegistrationCallback,
-        c_void_p
-    ]
-    jlib.jack_set_client_registration_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_client_registration_callback = None
-
-try:
-    jlib.jack_set_client_rename_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackClientRenameCallback,
-        c_void_p
-    ]
-    jlib.jack_set_client_rename_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_client_rename_callback = None
-
-try:
-    jlib.jack_set_port_registration_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackPortRegistrationCallback,
-        c_void_p
-    ]
-    jlib.jack_set_port_registration_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_port_registration_callback = None
-
-try:
-    jlib.jack_set_port_connect_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackPortConnectCallback,
-        c_void_p
-    ]
-    jlib.jack_set_port_connect_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_port_connect_callback = None
-
-try:
-    jlib.jack_set_port_rename_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackPortRenameCallback,
-        c_void_p
-    ]
-    jlib.jack_set_port_rename_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_port_rename_callback = None
-
-try:
-    jlib.jack_set_graph_order_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackGraphOrderCallback,
-        c_void_p
-    ]
-    jlib.jack_set_graph_order_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_graph_order_callback = None
-
-try:
-    jlib.jack_set_xrun_callback.argtypes = [POINTER(jack_client_t), JackXRunCallback, c_void_p]
-    jlib.jack_set_xrun_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_xrun_callback = None
-
-try:
-    jlib.jack_set_latency_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackLatencyCallback,
-        c_void_p
-    ]
-    jlib.jack_set_latency_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_latency_callback = None
+_declare("jack_set_thread_init_callback", [POINTER(jack_client_t), JackThreadInitCallback,
+                                           c_void_p], c_int)
+_declare("jack_on_shutdown", [POINTER(jack_client_t), JackShutdownCallback, c_void_p], None)
+_declare("jack_on_info_shutdown", [POINTER(jack_client_t), JackInfoShutdownCallback,
+                                   c_void_p], None)
+_declare("jack_set_process_callback", [POINTER(jack_client_t), JackProcessCallback,
+                                       c_void_p], c_int)
+_declare("jack_set_freewheel_callback", [POINTER(jack_client_t), JackFreewheelCallback,
+                                         c_void_p], c_int)
+_declare("jack_set_buffer_size_callback", [POINTER(jack_client_t), JackBufferSizeCallback,
+                                           c_void_p], c_int)
+_declare("jack_set_sample_rate_callback", [POINTER(jack_client_t), JackSampleRateCallback,
+                                           c_void_p], c_int)
+_declare("jack_set_client_registration_callback", [POINTER(jack_client_t),
+                                                   JackClientRegistrationCallback,
+                                                   c_void_p], c_int)
+_declare("jack_set_client_rename_callback", [POINTER(jack_client_t), JackClientRenameCallback,
+                                             c_void_p], c_int)
+_declare("jack_set_port_registration_callback", [POINTER(jack_client_t),
+                                                 JackPortRegistrationCallback, c_void_p], c_int)
+_declare("jack_set_port_connect_callback", [POINTER(jack_client_t), JackPortConnectCallback,
+                                            c_void_p], c_int)
+_declare("jack_set_port_rename_callback", [POINTER(jack_client_t), JackPortRenameCallback,
+                                           c_void_p], c_int)
+_declare("jack_set_graph_order_callback", [POINTER(jack_client_t), JackGraphOrderCallback,
+                                           c_void_p], c_int)
+_declare("jack_set_xrun_callback", [POINTER(jack_client_t), JackXRunCallback, c_void_p], c_int)
+_declare("jack_set_latency_callback", [POINTER(jack_client_t), JackLatencyCallback,
+                                       c_void_p], c_int)
 
 
 def set_thread_init_callback(client, thread_init_callback, arg):
@@ -794,23 +688,12 @@ def set_latency_callback(client, latency_callback, arg):
 # -------------------------------------------------------------------------------------------------
 # Server Control
 
-jlib.jack_set_freewheel.argtypes = [POINTER(jack_client_t), c_int]
-jlib.jack_set_freewheel.restype = c_int
-
-jlib.jack_set_buffer_size.argtypes = [POINTER(jack_client_t), jack_nframes_t]
-jlib.jack_set_buffer_size.restype = c_int
-
-jlib.jack_get_sample_rate.argtypes = [POINTER(jack_client_t)]
-jlib.jack_get_sample_rate.restype = jack_nframes_t
-
-jlib.jack_get_buffer_size.argtypes = [POINTER(jack_client_t)]
-jlib.jack_get_buffer_size.restype = jack_nframes_t
-
-jlib.jack_engine_takeover_timebase.argtypes = [POINTER(jack_client_t)]
-jlib.jack_engine_takeover_timebase.restype = c_int
-
-jlib.jack_cpu_load.argtypes = [POINTER(jack_client_t)]
-jlib.jack_cpu_load.restype = c_float
+_declare("jack_set_freewheel", [POINTER(jack_client_t), c_int], c_int)
+_declare("jack_set_buffer_size", [POINTER(jack_client_t), jack_nframes_t], c_int)
+_declare("jack_get_sample_rate", [POINTER(jack_client_t)], jack_nframes_t)
+_declare("jack_get_buffer_size", [POINTER(jack_client_t)], jack_nframes_t)
+_declare("jack_engine_takeover_timebase", [POINTER(jack_client_t)], c_int)
+_declare("jack_cpu_load", [POINTER(jack_client_t)], c_float)
 
 
 def set_freewheel(client, onoff):
@@ -833,110 +716,45 @@ def engine_takeover_timebase(client):
     return jlib.jack_engine_takeover_timebase(client)
 
 
-def cpu_load(client):
-    return jlib.jack_cpu_load(client)
+# called directly, without a wrapper
+cpu_load = jlib.jack_cpu_load
 
 
 # -------------------------------------------------------------------------------------------------
 # Port Functions
 
-jlib.jack_port_register.argtypes = [POINTER(jack_client_t), c_char_p, c_char_p, c_ulong, c_ulong]
-jlib.jack_port_register.restype = POINTER(jack_port_t)
-
-jlib.jack_port_unregister.argtypes = [POINTER(jack_client_t), POINTER(jack_port_t)]
-jlib.jack_port_unregister.restype = c_int
-
-jlib.jack_port_get_buffer.argtypes = [POINTER(jack_port_t), jack_nframes_t]
-jlib.jack_port_get_buffer.restype = c_void_p
-
-jlib.jack_port_name.argtypes = [POINTER(jack_port_t)]
-jlib.jack_port_name.restype = c_char_p
-
-jlib.jack_port_short_name.argtypes = [POINTER(jack_port_t)]
-jlib.jack_port_short_name.restype = c_char_p
-
-jlib.jack_port_flags.argtypes = [POINTER(jack_port_t)]
-jlib.jack_port_flags.restype = c_int
-
-jlib.jack_port_type.argtypes = [POINTER(jack_port_t)]
-jlib.jack_port_type.restype = c_char_p
-
-if JACK2:
-    jlib.jack_port_type_id.argtypes = [POINTER(jack_port_t)]
-    jlib.jack_port_type_id.restype = jack_port_type_id_t
-
-jlib.jack_port_is_mine.argtypes = [POINTER(jack_client_t), POINTER(jack_port_t)]
-jlib.jack_port_is_mine.restype = c_int
-
-jlib.jack_port_connected.argtypes = [POINTER(jack_port_t)]
-jlib.jack_port_connected.restype = c_int
-
-jlib.jack_port_connected_to.argtypes = [POINTER(jack_port_t), c_char_p]
-jlib.jack_port_connected_to.restype = c_int
-
-jlib.jack_port_get_connections.argtypes = [POINTER(jack_port_t)]
-jlib.jack_port_get_connections.restype = POINTER(c_char_p)
-
-jlib.jack_port_get_all_connections.argtypes = [POINTER(jack_client_t), POINTER(jack_port_t)]
-jlib.jack_port_get_all_connections.restype = POINTER(c_char_p)
-
-jlib.jack_port_tie.argtypes = [POINTER(jack_port_t), POINTER(jack_port_t)]
-jlib.jack_port_tie.restype = c_int
-
-jlib.jack_port_untie.argtypes = [POINTER(jack_port_t)]
-jlib.jack_port_untie.restype = c_int
-
-jlib.jack_port_set_name.argtypes = [POINTER(jack_port_t), c_char_p]
-jlib.jack_port_set_name.restype = c_int
-
-jlib.jack_port_set_alias.argtypes = [POINTER(jack_port_t), c_char_p]
-jlib.jack_port_set_alias.restype = c_int
-
-jlib.jack_port_unset_alias.argtypes = [POINTER(jack_port_t), c_char_p]
-jlib.jack_port_unset_alias.restype = c_int
-
-jlib.jack_port_get_aliases.argtypes = [POINTER(jack_port_t), POINTER(ARRAY(c_char_p, 2))]
-jlib.jack_port_get_aliases.restype = c_int
-
-jlib.jack_port_request_monitor.argtypes = [POINTER(jack_port_t), c_int]
-jlib.jack_port_request_monitor.restype = c_int
-
-jlib.jack_port_request_monitor_by_name.argtypes = [POINTER(jack_client_t), c_char_p, c_int]
-jlib.jack_port_request_monitor_by_name.restype = c_int
-
-jlib.jack_port_ensure_monitor.argtypes = [POINTER(jack_port_t), c_int]
-jlib.jack_port_ensure_monitor.restype = c_int
-
-jlib.jack_port_monitoring_input.argtypes = [POINTER(jack_port_t)]
-jlib.jack_port_monitoring_input.restype = c_int
-
-jlib.jack_connect.argtypes = [POINTER(jack_client_t), c_char_p, c_char_p]
-jlib.jack_connect.restype = c_int
-
-jlib.jack_disconnect.argtypes = [POINTER(jack_client_t), c_char_p, c_char_p]
-jlib.jack_disconnect.restype = c_int
-
-jlib.jack_port_disconnect.argtypes = [POINTER(jack_client_t), POINTER(jack_port_t)]
-jlib.jack_port_disconnect.restype = c_int
-
-jlib.jack_port_name_size.argtypes = None
-jlib.jack_port_name_size.restype = c_int
-
-jlib.jack_port_type_size.argtypes = None
-jlib.jack_port_type_size.restype = c_int
-
-try:
-    jlib.jack_port_uuid.argtypes = [POINTER(jack_port_t)]
-    jlib.jack_port_uuid.restype = jack_uuid_t
-except AttributeError:
-    jlib.jack_port_uuid = None
-
-
-try:
-    jlib.jack_port_type_get_buffer_size.argtypes = [POINTER(jack_client_t), c_char_p]
-    jlib.jack_port_type_get_buffer_size.restype = c_size_t
-except AttributeError:
-    jlib.jack_port_type_get_buffer_size = None
+_declare("jack_port_register", [POINTER(jack_client_t), c_char_p, c_char_p, c_ulong,
+                                c_ulong], POINTER(jack_port_t))
+_declare("jack_port_unregister", [POINTER(jack_client_t), POINTER(jack_port_t)], c_int)
+_declare("jack_port_get_buffer", [POINTER(jack_port_t), jack_nframes_t], c_void_p)
+_declare("jack_port_name", [POINTER(jack_port_t)], c_char_p)
+_declare("jack_port_short_name", [POINTER(jack_port_t)], c_char_p)
+_declare("jack_port_flags", [POINTER(jack_port_t)], c_int)
+_declare("jack_port_type", [POINTER(jack_port_t)], c_char_p)
+_declare("jack_port_type_id", [POINTER(jack_port_t)], jack_port_type_id_t)
+_declare("jack_port_is_mine", [POINTER(jack_client_t), POINTER(jack_port_t)], c_int)
+_declare("jack_port_connected", [POINTER(jack_port_t)], c_int)
+_declare("jack_port_connected_to", [POINTER(jack_port_t), c_char_p], c_int)
+_declare("jack_port_get_connections", [POINTER(jack_port_t)], POINTER(c_char_p))
+_declare("jack_port_get_all_connections", [POINTER(jack_client_t),
+                                           POINTER(jack_port_t)], POINTER(c_char_p))
+_declare("jack_port_tie", [POINTER(jack_port_t), POINTER(jack_port_t)], c_int)
+_declare("jack_port_untie", [POINTER(jack_port_t)], c_int)
+_declare("jack_port_set_name", [POINTER(jack_port_t), c_char_p], c_int)
+_declare("jack_port_set_alias", [POINTER(jack_port_t), c_char_p], c_int)
+_declare("jack_port_unset_alias", [POINTER(jack_port_t), c_char_p], c_int)
+_declare("jack_port_get_aliases", [POINTER(jack_port_t), POINTER(ARRAY(c_char_p, 2))], c_int)
+_declare("jack_port_request_monitor", [POINTER(jack_port_t), c_int], c_int)
+_declare("jack_port_request_monitor_by_name", [POINTER(jack_client_t), c_char_p, c_int], c_int)
+_declare("jack_port_ensure_monitor", [POINTER(jack_port_t), c_int], c_int)
+_declare("jack_port_monitoring_input", [POINTER(jack_port_t)], c_int)
+_declare("jack_connect", [POINTER(jack_client_t), _c_str_p, _c_str_p], c_int)
+_declare("jack_disconnect", [POINTER(jack_client_t), _c_str_p, _c_str_p], c_int)
+_declare("jack_port_disconnect", [POINTER(jack_client_t), POINTER(jack_port_t)], c_int)
+_declare("jack_port_name_size", None, c_int)
+_declare("jack_port_type_size", None, c_int)
+_declare("jack_port_uuid", [POINTER(jack_port_t)], jack_uuid_t)
+_declare("jack_port_type_get_buffer_size", [POINTER(jack_client_t), c_char_p], c_size_t)
 
 
 def port_register(client, port_name, port_type, flags, buffer_size):
@@ -951,20 +769,24 @@ def port_get_buffer(port, nframes):
     return jlib.jack_port_get_buffer(port, nframes)
 
 
+_jack_port_name = jlib.jack_port_name
+_jack_port_type = jlib.jack_port_type
+
+
 def port_name(port):
-    return _d(jlib.jack_port_name(port))
+    return _jack_port_name(port).decode(ENCODING)
 
 
 def port_short_name(port):
     return _d(jlib.jack_port_short_name(port))
 
 
-def port_flags(port):
-    return jlib.jack_port_flags(port)
+# called directly, without a wrapper
+port_flags = jlib.jack_port_flags
 
 
 def port_type(port):
-    return _d(jlib.jack_port_type(port))
+    return _jack_port_type(port).decode(ENCODING)
 
 
 # JACK2 only:
@@ -985,23 +807,11 @@ def port_connected_to(port, port_name):
 
 
 def port_get_connections(port):
-    ports = jlib.jack_port_get_connections(port)
-    if not ports:
-        return
-    for port_name in ports:
-        if port_name is None:
-            break
-        yield _d(port_name)
+    return take_string_list(jlib.jack_port_get_connections(port))
 
 
 def port_get_all_connections(client, port):
-    ports = jlib.jack_port_get_all_connections(client, port)
-    if not ports:
-        return
-    for port_name in ports:
-        if port_name is None:
-            break
-        yield _d(port_name)
+    return take_string_list(jlib.jack_port_get_all_connections(client, port))
 
 
 def port_tie(src, dst):
@@ -1024,14 +834,30 @@ def port_unset_alias(port, alias):
     return jlib.jack_port_unset_alias(port, _e(alias))
 
 
+# buffers JACK writes the aliases into, allocated on first use and then reused
+# one set per thread, JACK writes into them with the GIL released
+_alias_local = local()
+
+
 def port_get_aliases(port):
     # NOTE - this function has no 2nd argument in jacklib
     # Instead, aliases will be passed in return value, in form of (int ret, str alias1, str alias2)
-    name_size = port_name_size()
-    alias_type = c_char_p * 2
-    aliases = alias_type(b" " * name_size, b" " * name_size)
-    ret = jlib.jack_port_get_aliases(port, pointer(aliases))
-    return ret, _d(aliases[0]), _d(aliases[1])
+    try:
+        alias_buffers = _alias_local.buffers
+    except AttributeError:
+        name_size = port_name_size()
+        alias_buffers = (create_string_buffer(name_size), create_string_buffer(name_size))
+        alias_type = c_char_p * 2
+        _alias_local.buffers = alias_buffers
+        _alias_local.pointer = pointer(alias_type(addressof(alias_buffers[0]),
+                                                  addressof(alias_buffers[1])))
+
+    ret = jlib.jack_port_get_aliases(port, _alias_local.pointer)
+
+    # only the first 'ret' buffers got written, the rest still has aliases of a previous port
+    return (ret,
+            _d(alias_buffers[0].value) if ret >= 1 else "",
+            _d(alias_buffers[1].value) if ret >= 2 else "")
 
 
 def port_request_monitor(port, onoff):
@@ -1050,12 +876,9 @@ def port_monitoring_input(port):
     return jlib.jack_port_monitoring_input(port)
 
 
-def connect(client, source_port, destination_port):
-    return jlib.jack_connect(client, _e(source_port), _e(destination_port))
-
-
-def disconnect(client, source_port, destination_port):
-    return jlib.jack_disconnect(client, _e(source_port), _e(destination_port))
+# called directly, without a wrapper, port names are encoded by the argument type
+connect = jlib.jack_connect
+disconnect = jlib.jack_disconnect
 
 
 def port_disconnect(client, port):
@@ -1087,40 +910,16 @@ def port_uuid(port):
 # -------------------------------------------------------------------------------------------------
 # Latency Functions
 
-jlib.jack_port_set_latency.argtypes = [POINTER(jack_port_t), jack_nframes_t]
-jlib.jack_port_set_latency.restype = None
-
-try:
-    jlib.jack_port_get_latency_range.argtypes = [
-        POINTER(jack_port_t),
-        jack_latency_callback_mode_t,
-        POINTER(jack_latency_range_t)
-    ]
-    jlib.jack_port_get_latency_range.restype = None
-except AttributeError:
-    jlib.jack_port_get_latency_range = None
-
-try:
-    jlib.jack_port_set_latency_range.argtypes = [
-        POINTER(jack_port_t),
-        jack_latency_callback_mode_t,
-        POINTER(jack_latency_range_t)
-    ]
-    jlib.jack_port_set_latency_range.restype = None
-except AttributeError:
-    jlib.jack_port_set_latency_range = None
-
-jlib.jack_recompute_total_latencies.argtypes = [POINTER(jack_client_t)]
-jlib.jack_recompute_total_latencies.restype = c_int
-
-jlib.jack_port_get_latency.argtypes = [POINTER(jack_port_t)]
-jlib.jack_port_get_latency.restype = jack_nframes_t
-
-jlib.jack_port_get_total_latency.argtypes = [POINTER(jack_client_t), POINTER(jack_port_t)]
-jlib.jack_port_get_total_latency.restype = jack_nframes_t
-
-jlib.jack_recompute_total_latency.argtypes = [POINTER(jack_client_t), POINTER(jack_port_t)]
-jlib.jack_recompute_total_latency.restype = c_int
+_declare("jack_port_set_latency", [POINTER(jack_port_t), jack_nframes_t], None)
+_declare("jack_port_get_latency_range", [POINTER(jack_port_t), jack_latency_callback_mode_t,
+                                         POINTER(jack_latency_range_t)], None)
+_declare("jack_port_set_latency_range", [POINTER(jack_port_t), jack_latency_callback_mode_t,
+                                         POINTER(jack_latency_range_t)], None)
+_declare("jack_recompute_total_latencies", [POINTER(jack_client_t)], c_int)
+_declare("jack_port_get_latency", [POINTER(jack_port_t)], jack_nframes_t)
+_declare("jack_port_get_total_latency", [POINTER(jack_client_t),
+                                         POINTER(jack_port_t)], jack_nframes_t)
+_declare("jack_recompute_total_latency", [POINTER(jack_client_t), POINTER(jack_port_t)], c_int)
 
 
 def port_set_latency(port, nframes):
@@ -1156,14 +955,10 @@ def recompute_total_latency(client, port):
 # -------------------------------------------------------------------------------------------------
 # Port Searching
 
-jlib.jack_get_ports.argtypes = [POINTER(jack_client_t), c_char_p, c_char_p, c_ulong]
-jlib.jack_get_ports.restype = POINTER(c_char_p)
-
-jlib.jack_port_by_name.argtypes = [POINTER(jack_client_t), c_char_p]
-jlib.jack_port_by_name.restype = POINTER(jack_port_t)
-
-jlib.jack_port_by_id.argtypes = [POINTER(jack_client_t), jack_port_id_t]
-jlib.jack_port_by_id.restype = POINTER(jack_port_t)
+_declare("jack_get_ports", [POINTER(jack_client_t), c_char_p, c_char_p,
+                            c_ulong], POINTER(c_char_p))
+_declare("jack_port_by_name", [POINTER(jack_client_t), _c_str_p], POINTER(jack_port_t))
+_declare("jack_port_by_id", [POINTER(jack_client_t), jack_port_id_t], POINTER(jack_port_t))
 
 
 def get_ports(client, port_name_pattern=None, type_name_pattern=None, flags=0):
@@ -1171,8 +966,8 @@ def get_ports(client, port_name_pattern=None, type_name_pattern=None, flags=0):
                                _e(type_name_pattern or ''), flags)
 
 
-def port_by_name(client, port_name):
-    return jlib.jack_port_by_name(client, _e(port_name))
+# called directly, without a wrapper, the port name is encoded by the argument type
+port_by_name = jlib.jack_port_by_name
 
 
 def port_by_id(client, port_id):
@@ -1182,36 +977,16 @@ def port_by_id(client, port_id):
 # -------------------------------------------------------------------------------------------------
 # Time Functions
 
-jlib.jack_frames_since_cycle_start.argtypes = [POINTER(jack_client_t)]
-jlib.jack_frames_since_cycle_start.restype = jack_nframes_t
-
-jlib.jack_frame_time.argtypes = [POINTER(jack_client_t)]
-jlib.jack_frame_time.restype = jack_nframes_t
-
-jlib.jack_last_frame_time.argtypes = [POINTER(jack_client_t)]
-jlib.jack_last_frame_time.restype = jack_nframes_t
-
-try:
-    # JACK_OPTIONAL_WEAK_EXPORT
-    jlib.jack_get_cycle_times.argtypes = [
-        POINTER(jack_client_t),
-        POINTER(jack_nframes_t),
-        POINTER(jack_time_t),
-        POINTER(jack_time_t),
-        POINTER(c_float)
-    ]
-    jlib.jack_get_cycle_times.restype = c_int
-except AttributeError:
-    jlib.jack_get_cycle_times = None
-
-jlib.jack_frames_to_time.argtypes = [POINTER(jack_client_t), jack_nframes_t]
-jlib.jack_frames_to_time.restype = jack_time_t
-
-jlib.jack_time_to_frames.argtypes = [POINTER(jack_client_t), jack_time_t]
-jlib.jack_time_to_frames.restype = jack_nframes_t
-
-jlib.jack_get_time.argtypes = None
-jlib.jack_get_time.restype = jack_time_t
+_declare("jack_frames_since_cycle_start", [POINTER(jack_client_t)], jack_nframes_t)
+_declare("jack_frame_time", [POINTER(jack_client_t)], jack_nframes_t)
+_declare("jack_last_frame_time", [POINTER(jack_client_t)], jack_nframes_t)
+# JACK_OPTIONAL_WEAK_EXPORT
+_declare("jack_get_cycle_times", [POINTER(jack_client_t), POINTER(jack_nframes_t),
+                                  POINTER(jack_time_t), POINTER(jack_time_t),
+                                  POINTER(c_float)], c_int)
+_declare("jack_frames_to_time", [POINTER(jack_client_t), jack_nframes_t], jack_time_t)
+_declare("jack_time_to_frames", [POINTER(jack_client_t), jack_time_t], jack_nframes_t)
+_declare("jack_get_time", None, jack_time_t)
 
 
 def frames_since_cycle_start(client):
@@ -1228,7 +1003,7 @@ def last_frame_time(client):
 
 def get_cycle_times(client, current_frames, current_usecs, next_usecs, period_usecs):
     # JACK_OPTIONAL_WEAK_EXPORT
-    if jlib.jack_frames_to_time:
+    if jlib.jack_get_cycle_times:
         return jlib.jack_get_cycle_times(client, current_frames, current_usecs, next_usecs,
                                          period_usecs)
     return -1
@@ -1256,14 +1031,8 @@ def get_time():
 
 _error_callback = None
 
-jlib.jack_free.argtypes = [c_void_p]
-jlib.jack_free.restype = None
-
-try:
-    jlib.jack_set_error_function.argtypes = [JackErrorCallback]
-    jlib.jack_set_error_function.restype = None
-except AttributeError:
-    jlib.jack_set_error_function = None
+_declare("jack_free", [c_void_p], None)
+_declare("jack_set_error_function", [JackErrorCallback], None)
 
 
 def set_error_function(error_callback):
@@ -1282,40 +1051,18 @@ def free(ptr):
 
 _sync_callback = _timebase_callback = None
 
-jlib.jack_release_timebase.argtypes = [POINTER(jack_client_t)]
-jlib.jack_release_timebase.restype = c_int
-
-jlib.jack_set_sync_callback.argtypes = [POINTER(jack_client_t), JackSyncCallback, c_void_p]
-jlib.jack_set_sync_callback.restype = c_int
-
-jlib.jack_set_sync_timeout.argtypes = [POINTER(jack_client_t), jack_time_t]
-jlib.jack_set_sync_timeout.restype = c_int
-
-jlib.jack_set_timebase_callback.argtypes = [
-    POINTER(jack_client_t),
-    c_int,
-    JackTimebaseCallback,
-    c_void_p
-]
-jlib.jack_set_timebase_callback.restype = c_int
-
-jlib.jack_transport_locate.argtypes = [POINTER(jack_client_t), jack_nframes_t]
-jlib.jack_transport_locate.restype = c_int
-
-jlib.jack_transport_query.argtypes = [POINTER(jack_client_t), POINTER(jack_position_t)]
-jlib.jack_transport_query.restype = jack_transport_state_t
-
-jlib.jack_get_current_transport_frame.argtypes = [POINTER(jack_client_t)]
-jlib.jack_get_current_transport_frame.restype = jack_nframes_t
-
-jlib.jack_transport_reposition.argtypes = [POINTER(jack_client_t), POINTER(jack_position_t)]
-jlib.jack_transport_reposition.restype = c_int
-
-jlib.jack_transport_start.argtypes = [POINTER(jack_client_t)]
-jlib.jack_transport_start.restype = None
-
-jlib.jack_transport_stop.argtypes = [POINTER(jack_client_t)]
-jlib.jack_transport_stop.restype = None
+_declare("jack_release_timebase", [POINTER(jack_client_t)], c_int)
+_declare("jack_set_sync_callback", [POINTER(jack_client_t), JackSyncCallback, c_void_p], c_int)
+_declare("jack_set_sync_timeout", [POINTER(jack_client_t), jack_time_t], c_int)
+_declare("jack_set_timebase_callback", [POINTER(jack_client_t), c_int, JackTimebaseCallback,
+                                        c_void_p], c_int)
+_declare("jack_transport_locate", [POINTER(jack_client_t), jack_nframes_t], c_int)
+_declare("jack_transport_query", [POINTER(jack_client_t),
+                                  POINTER(jack_position_t)], jack_transport_state_t)
+_declare("jack_get_current_transport_frame", [POINTER(jack_client_t)], jack_nframes_t)
+_declare("jack_transport_reposition", [POINTER(jack_client_t), POINTER(jack_position_t)], c_int)
+_declare("jack_transport_start", [POINTER(jack_client_t)], None)
+_declare("jack_transport_stop", [POINTER(jack_client_t)], None)
 
 
 def release_timebase(client):
@@ -1342,8 +1089,8 @@ def transport_locate(client, frame):
     return jlib.jack_transport_locate(client, frame)
 
 
-def transport_query(client, pos):
-    return jlib.jack_transport_query(client, pos)
+# called directly, without a wrapper
+transport_query = jlib.jack_transport_query
 
 
 def get_current_transport_frame(client):
@@ -1365,31 +1112,15 @@ def transport_stop(client):
 # -------------------------------------------------------------------------------------------------
 # MIDI
 
-jlib.jack_midi_get_event_count.argtypes = [c_void_p]
-jlib.jack_midi_get_event_count.restype = jack_nframes_t
-
-jlib.jack_midi_event_get.argtypes = [POINTER(jack_midi_event_t), c_void_p, c_uint32]
-jlib.jack_midi_event_get.restype = c_int
-
-jlib.jack_midi_clear_buffer.argtypes = [c_void_p]
-jlib.jack_midi_clear_buffer.restype = None
-
-jlib.jack_midi_max_event_size.argtypes = [c_void_p]
-jlib.jack_midi_max_event_size.restype = c_size_t
-
-jlib.jack_midi_event_reserve.argtypes = [c_void_p, jack_nframes_t, c_size_t]
-jlib.jack_midi_event_reserve.restype = POINTER(jack_midi_data_t)
-
-jlib.jack_midi_event_write.argtypes = [
-    c_void_p,
-    jack_nframes_t,
-    POINTER(jack_midi_data_t),
-    c_size_t
-]
-jlib.jack_midi_event_write.restype = c_int
-
-jlib.jack_midi_get_lost_event_count.argtypes = [c_void_p]
-jlib.jack_midi_get_lost_event_count.restype = c_uint32
+_declare("jack_midi_get_event_count", [c_void_p], jack_nframes_t)
+_declare("jack_midi_event_get", [POINTER(jack_midi_event_t), c_void_p, c_uint32], c_int)
+_declare("jack_midi_clear_buffer", [c_void_p], None)
+_declare("jack_midi_max_event_size", [c_void_p], c_size_t)
+_declare("jack_midi_event_reserve", [c_void_p, jack_nframes_t,
+                                     c_size_t], POINTER(jack_midi_data_t))
+_declare("jack_midi_event_write", [c_void_p, jack_nframes_t, POINTER(jack_midi_data_t),
+                                   c_size_t], c_int)
+_declare("jack_midi_get_lost_event_count", [c_void_p], c_uint32)
 
 
 def midi_get_event_count(port_buffer):
@@ -1425,86 +1156,20 @@ def midi_get_lost_event_count(port_buffer):
 
 _session_callback = None
 
-try:
-    jlib.jack_set_session_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackSessionCallback,
-        c_void_p
-    ]
-    jlib.jack_set_session_callback.restype = c_int
-except AttributeError:
-    jlib.jack_set_session_callback = None
-
-try:
-    jlib.jack_session_reply.argtypes = [POINTER(jack_client_t), POINTER(jack_session_event_t)]
-    jlib.jack_session_reply.restype = c_int
-except AttributeError:
-    jlib.jack_session_reply = None
-
-try:
-    jlib.jack_session_event_free.argtypes = [POINTER(jack_session_event_t)]
-    jlib.jack_session_event_free.restype = None
-except AttributeError:
-    jlib.jack_session_event_free = None
-
-try:
-    jlib.jack_client_get_uuid.argtypes = [POINTER(jack_client_t)]
-    jlib.jack_client_get_uuid.restype = c_char_p
-except AttributeError:
-    jlib.jack_client_get_uuid = None
-
-try:
-    jlib.jack_session_notify.argtypes = [
-        POINTER(jack_client_t),
-        c_char_p,
-        jack_session_event_type_t,
-        c_char_p
-    ]
-    jlib.jack_session_notify.restype = POINTER(jack_session_command_t)
-except AttributeError:
-    jlib.jack_session_notify = None
-
-try:
-    jlib.jack_session_commands_free.argtypes = [POINTER(jack_session_command_t)]
-    jlib.jack_session_commands_free.restype = None
-except AttributeError:
-    jlib.jack_session_commands_free = None
-
-try:
-    jlib.jack_get_uuid_for_client_name.argtypes = [POINTER(jack_client_t), c_char_p]
-    jlib.jack_get_uuid_for_client_name.restype = c_char_p
-except AttributeError:
-    jlib.jack_get_uuid_for_client_name = None
-
-try:
-    jlib.jack_get_client_name_by_uuid.argtypes = [POINTER(jack_client_t), c_char_p]
-    jlib.jack_get_client_name_by_uuid.restype = c_char_p
-except AttributeError:
-    jlib.jack_get_client_name_by_uuid = None
-
-try:
-    jlib.jack_reserve_client_name.argtypes = [POINTER(jack_client_t), c_char_p, c_char_p]
-    jlib.jack_reserve_client_name.restype = c_int
-except AttributeError:
-    jlib.jack_reserve_client_name = None
-
-try:
-    jlib.jack_client_has_session_callback.argtypes = [POINTER(jack_client_t), c_char_p]
-    jlib.jack_client_has_session_callback.restype = c_int
-except AttributeError:
-    jlib.jack_client_has_session_callback = None
-
-try:
-    jlib.jack_uuid_parse.argtypes = [c_char_p, POINTER(jack_uuid_t)]
-    jlib.jack_uuid_parse.restype = c_int
-except AttributeError:
-    jlib.jack_uuid_parse = None
-
-try:
-    jlib.jack_uuid_unparse.argtypes = [jack_uuid_t, c_char_p]
-    jlib.jack_uuid_unparse.restype = None
-except AttributeError:
-    jlib.jack_uuid_unparse = None
+_declare("jack_set_session_callback", [POINTER(jack_client_t), JackSessionCallback,
+                                       c_void_p], c_int)
+_declare("jack_session_reply", [POINTER(jack_client_t), POINTER(jack_session_event_t)], c_int)
+_declare("jack_session_event_free", [POINTER(jack_session_event_t)], None)
+_declare("jack_client_get_uuid", [POINTER(jack_client_t)], c_char_p)
+_declare("jack_session_notify", [POINTER(jack_client_t), c_char_p, jack_session_event_type_t,
+                                 c_char_p], POINTER(jack_session_command_t))
+_declare("jack_session_commands_free", [POINTER(jack_session_command_t)], None)
+_declare("jack_get_uuid_for_client_name", [POINTER(jack_client_t), c_char_p], c_char_p)
+_declare("jack_get_client_name_by_uuid", [POINTER(jack_client_t), c_char_p], c_char_p)
+_declare("jack_reserve_client_name", [POINTER(jack_client_t), c_char_p, c_char_p], c_int)
+_declare("jack_client_has_session_callback", [POINTER(jack_client_t), c_char_p], c_int)
+_declare("jack_uuid_parse", [c_char_p, POINTER(jack_uuid_t)], c_int)
+_declare("jack_uuid_unparse", [jack_uuid_t, c_char_p], None)
 
 
 def set_session_callback(client, session_callback, arg):
@@ -1598,45 +1263,14 @@ def uuid_unparse(uuid, encoding=ENCODING):
 
 _custom_appearance_callback = None
 
-try:
-    jlib.jack_custom_publish_data.argtypes = [POINTER(jack_client_t), c_char_p, c_void_p, c_size_t]
-    jlib.jack_custom_publish_data.restype = c_int
-except AttributeError:
-    jlib.jack_custom_publish_data = None
-
-try:
-    jlib.jack_custom_get_data.argtypes = [
-        POINTER(jack_client_t),
-        c_char_p,
-        c_char_p,
-        POINTER(c_void_p),
-        POINTER(c_size_t)
-    ]
-    jlib.jack_custom_get_data.restype = c_int
-except AttributeError:
-    jlib.jack_custom_get_data = None
-
-try:
-    jlib.jack_custom_unpublish_data.argtypes = [POINTER(jack_client_t), c_char_p]
-    jlib.jack_custom_unpublish_data.restype = c_int
-except AttributeError:
-    jlib.jack_custom_unpublish_data = None
-
-try:
-    jlib.jack_custom_get_keys.argtypes = [POINTER(jack_client_t), c_char_p]
-    jlib.jack_custom_get_keys.restype = POINTER(c_char_p)
-except AttributeError:
-    jlib.jack_custom_get_keys = None
-
-try:
-    jlib.jack_custom_set_data_appearance_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackCustomDataAppearanceCallback,
-        c_void_p
-    ]
-    jlib.jack_custom_set_data_appearance_callback.restype = c_int
-except AttributeError:
-    jlib.jack_custom_set_data_appearance_callback = None
+_declare("jack_custom_publish_data", [POINTER(jack_client_t), c_char_p, c_void_p, c_size_t], c_int)
+_declare("jack_custom_get_data", [POINTER(jack_client_t), c_char_p, c_char_p, POINTER(c_void_p),
+                                  POINTER(c_size_t)], c_int)
+_declare("jack_custom_unpublish_data", [POINTER(jack_client_t), c_char_p], c_int)
+_declare("jack_custom_get_keys", [POINTER(jack_client_t), c_char_p], POINTER(c_char_p))
+_declare("jack_custom_set_data_appearance_callback", [POINTER(jack_client_t),
+                                                      JackCustomDataAppearanceCallback,
+                                                      c_void_p], c_int)
 
 
 def custom_publish_data(client, key, data, size):
@@ -1688,52 +1322,17 @@ def custom_set_data_appearance_callback(client, custom_callback, arg):
 
 Property = namedtuple('Property', ('key', 'value', 'type'))
 
-try:
-    jlib.jack_free_description.argtypes = [POINTER(jack_description_t), c_int]
-    jlib.jack_free_description.restype = None
-
-    jlib.jack_get_all_properties.argtypes = [POINTER(POINTER(jack_description_t))]
-    jlib.jack_get_all_properties.restype = c_int
-
-    jlib.jack_get_properties.argtypes = [jack_uuid_t, POINTER(jack_description_t)]
-    jlib.jack_get_properties.restype = c_int
-
-    jlib.jack_get_property.argtypes = [jack_uuid_t, c_char_p, POINTER(c_char_p), POINTER(c_char_p)]
-    jlib.jack_get_property.restype = c_int
-
-    jlib.jack_remove_all_properties.argtypes = [POINTER(jack_client_t)]
-    jlib.jack_remove_all_properties.restype = c_int
-
-    jlib.jack_remove_properties.argtypess = [POINTER(jack_client_t), POINTER(jack_uuid_t)]
-    jlib.jack_remove_properties.restype = c_int
-
-    jlib.jack_remove_property.argtypes = [POINTER(jack_client_t), POINTER(jack_uuid_t), c_char_p]
-    jlib.jack_remove_property.restype = c_int
-
-    jlib.jack_set_property.argtypes = [
-        POINTER(jack_client_t),
-        jack_uuid_t,
-        c_char_p,
-        c_char_p,
-        c_char_p
-    ]
-    jlib.jack_set_property.restype = c_int
-
-    jlib.jack_set_property_change_callback.argtypes = [
-        POINTER(jack_client_t),
-        JackPropertyChangeCallback,
-        c_void_p
-    ]
-    jlib.jack_set_property_change_callback.restype = c_int
-except AttributeError:
-    jlib.jack_free_description = None
-    jlib.jack_get_properties = None
-    jlib.jack_get_property = None
-    jlib.jack_remove_all_properties = None
-    jlib.jack_remove_properties = None
-    jlib.jack_remove_property = None
-    jlib.jack_set_property = None
-    jlib.jack_set_property_change_callback = None
+_declare("jack_free_description", [POINTER(jack_description_t), c_int], None)
+_declare("jack_get_all_properties", [POINTER(POINTER(jack_description_t))], c_int)
+_declare("jack_get_properties", [jack_uuid_t, POINTER(jack_description_t)], c_int)
+_declare("jack_get_property", [jack_uuid_t, c_char_p, POINTER(c_char_p), POINTER(c_char_p)], c_int)
+_declare("jack_remove_all_properties", [POINTER(jack_client_t)], c_int)
+_declare("jack_remove_properties", [POINTER(jack_client_t), jack_uuid_t], c_int)
+_declare("jack_remove_property", [POINTER(jack_client_t), jack_uuid_t, c_char_p], c_int)
+_declare("jack_set_property", [POINTER(jack_client_t), jack_uuid_t, c_char_p, c_char_p,
+                               c_char_p], c_int)
+_declare("jack_set_property_change_callback", [POINTER(jack_client_t), JackPropertyChangeCallback,
+                                               c_void_p], c_int)
 
 
 def free_description(description, free_description_itself=0):
@@ -1777,8 +1376,8 @@ def get_all_properties(encoding=ENCODING):
 
             if description.property_cnt:
                 results[description.subject] = [
-                    _decode_property(description.properties[p_idx], encoding)
-                    for p_idx in range(description.property_cnt)
+                    _decode_property(description.properties[i], encoding)
+                    for i in range(description.property_cnt)
                 ]
 
             jlib.jack_free_description(description, 0)
@@ -1871,11 +1470,11 @@ def get_port_pretty_name(client, port, encoding=ENCODING):
 
 
 def remove_all_properties(client):
-    return jlib.jack_remove_property(client)
+    return jlib.jack_remove_all_properties(client)
 
 
 def remove_properties(client, subject):
-    return jlib.jack_remove_property(client, subject)
+    return jlib.jack_remove_properties(client, subject)
 
 
 def remove_client_properties(client, client_uuid):
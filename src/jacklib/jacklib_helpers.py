@@ -70,22 +70,7 @@ def get_jack_status_error_string(cStatus):
 # Convert C char** -> Python list
 
 def c_char_p_p_to_list(c_char_p_p, encoding=jacklib.ENCODING, errors='ignore'):
-    i = 0
-    retList = []
-
-    if not c_char_p_p:
-        return retList
-
-    while True:
-        new_char_p = c_char_p_p[i]
-        if not new_char_p:
-            break
-
-        retList.append(new_char_p.decode(encoding=encoding, errors=errors))
-        i += 1
-
-    jacklib.free(c_char_p_p)
-    return retList
+    return jacklib.take_string_list(c_char_p_p, encoding, errors)
 
 
 # -------------------------------------------------------------------------------------------------
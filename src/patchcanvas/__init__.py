@@ -27,6 +27,12 @@ from PyQt5.QtWidgets import QGraphicsItem
 
 from .theme import getDefaultThemeName
 
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom)
+
+from .searchindex import SearchIndex
+from .spatialindex import SpatialIndex
+
 # ------------------------------------------------------------------------------------------------------------
 
 # Maximum Id for a plugin, treated as invalid/zero if above this value
@@ -86,6 +92,21 @@ EYECANDY_NONE  = 0
 EYECANDY_SMALL = 1
 EYECANDY_FULL  = 2
 
+# Render Quality Tier, lowered while interacting if painting is too slow
+QUALITY_FULL            = 0
+QUALITY_NO_ANTIALIASING = 1
+QUALITY_NO_GRADIENTS    = 2
+QUALITY_STRAIGHT_LINES  = 3
+
+# Z-Value bands (bottom to top), boxes are only restacked inside their own band
+Z_VALUE_LINES_BACKGROUND = 0.0
+Z_VALUE_BOXES            = 1.0
+Z_VALUE_LINES_FOREGROUND = 2.0
+Z_VALUE_LINE_MOV         = 3.0
+
+# Stacking steps available inside the box band, compacted when used up
+Z_VALUE_BOX_STEPS = 65536
+
 # ------------------------------------------------------------------------------------------------------------
 
 # object types
@@ -109,7 +130,12 @@ class options_t(object):
         'use_bezier_lines',
         'antialiasing',
         'eyecandy',
-        'inline_displays'
+        'eyecandy_max_items',
+        'inline_displays',
+        'adaptive_quality',
+        'frame_budget',
+        'managed_pan_zoom',
+        'lightweight_ports'
     ]
 
 # Canvas features
@@ -126,24 +152,36 @@ class features_t(object):
 class Canvas(object):
     def __init__(self):
         self.qobject = None
+        self.fade_animation = None
         self.settings = None
+        self.layout_store = None
         self.theme = None
         self.initiated = False
 
         self.group_list = []
         self.port_list = []
         self.connection_list = []
-        self.animation_list = []
+        self.group_map = {}
+        self.port_map = {}
+        self.group_ports = {}
+        self.connection_map = {}
+        self.port_connections = {}
         self.group_plugin_map = {}
         self.old_group_pos = {}
+        self.icon_renderers = {}
+        self.icon_pixmaps = {}
 
         self.callback = self.callback
         self.debug = False
         self.scene = None
         self.last_z_value = 0
+        self.focused_box = None
+        self.hidden_port_types = set()
         self.last_connection_id = 0
         self.initial_pos = QPointF(0, 0)
         self.size_rect = QRectF()
+        self.spatial_index = SpatialIndex()
+        self.search_index = SearchIndex()
 
     def callback(self, action, value1, value2, value_str):
         print("Canvas::callback({}, {}, {}, {})".format(action, value1, value2, value_str))
@@ -258,7 +296,12 @@ options.auto_select_items = False
 options.use_bezier_lines  = True
 options.antialiasing      = ANTIALIASING_SMALL
 options.eyecandy          = EYECANDY_SMALL
+options.eyecandy_max_items = 100
 options.inline_displays   = False
+options.adaptive_quality  = True
+options.frame_budget      = 20
+options.managed_pan_zoom  = True
+options.lightweight_ports = False
 
 features = features_t()
 features.group_info   = False
@@ -276,7 +319,12 @@ def setOptions(new_options):
     options.use_bezier_lines  = new_options.use_bezier_lines
     options.antialiasing      = new_options.antialiasing
     options.eyecandy          = new_options.eyecandy
+    options.eyecandy_max_items = new_options.eyecandy_max_items
     options.inline_displays   = new_options.inline_displays
+    options.adaptive_quality  = new_options.adaptive_quality
+    options.frame_budget      = new_options.frame_budget
+    options.managed_pan_zoom  = new_options.managed_pan_zoom
+    options.lightweight_ports = new_options.lightweight_ports
 
 def setFeatures(new_features):
     if canvas.initiated: return
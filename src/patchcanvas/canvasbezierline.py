@@ -19,7 +19,7 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtCore import Qt, QLineF, QPointF
 from PyQt5.QtGui import QColor, QLinearGradient, QPainter, QPainterPath, QPen
 from PyQt5.QtWidgets import QGraphicsPathItem
 
@@ -32,14 +32,20 @@ from . import (
     CanvasBezierLineType,
     ACTION_PORTS_DISCONNECT,
     EYECANDY_FULL,
+    QUALITY_NO_ANTIALIASING,
+    QUALITY_NO_GRADIENTS,
+    QUALITY_STRAIGHT_LINES,
     PORT_MODE_OUTPUT,
     PORT_TYPE_AUDIO_JACK,
     PORT_TYPE_MIDI_ALSA,
     PORT_TYPE_MIDI_JACK,
     PORT_TYPE_PARAMETER,
+    Z_VALUE_LINES_BACKGROUND,
+    Z_VALUE_LINES_FOREGROUND,
 )
 
 from .canvasportglow import CanvasPortGlow
+from .spatialindex import INDEX_LINE
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -80,6 +86,13 @@ class CanvasBezierLine(QGraphicsPathItem):
 
         self.m_lineSelected = yesno
         self.updateLineGradient()
+        self.updateZValue()
+
+    def updateZValue(self):
+        if self.m_lineSelected or canvas.focused_box in (self.item1.parentItem(), self.item2.parentItem()):
+            self.setZValue(Z_VALUE_LINES_FOREGROUND)
+        else:
+            self.setZValue(Z_VALUE_LINES_BACKGROUND)
 
     def triggerDisconnect(self):
         for connection in canvas.connection_list:
@@ -106,6 +119,10 @@ class CanvasBezierLine(QGraphicsPathItem):
             self.m_lineSelected = False
             self.updateLineGradient()
 
+            # hidden lines are kept out of the index until shown again
+            if self.isVisible():
+                canvas.spatial_index.update(INDEX_LINE, self, self.sceneBoundingRect())
+
     def type(self):
         return CanvasBezierLineType
 
@@ -145,19 +162,41 @@ class CanvasBezierLine(QGraphicsPathItem):
 
     def paint(self, painter, option, widget):
         painter.save()
-        painter.setRenderHint(QPainter.Antialiasing, bool(options.antialiasing))
+        quality_tier = canvas.scene.getQualityTier()
+        painter.setRenderHint(QPainter.Antialiasing,
+                              bool(options.antialiasing and quality_tier < QUALITY_NO_ANTIALIASING))
 
         pen = self.pen()
+
+        if quality_tier >= QUALITY_NO_GRADIENTS:
+            pen = QPen(pen)
+            pen.setColor(pen.brush().gradient().stops()[0][1])
+
         cosm_pen = QPen(pen)
         cosm_pen.setCosmetic(True)
         cosm_pen.setWidthF(1.00001)
 
-        QGraphicsPathItem.paint(self, painter, option, widget)
-
-        painter.setPen(cosm_pen)
+        path = self.path()
         painter.setBrush(Qt.NoBrush)
-        painter.setOpacity(0.2)
-        painter.drawPath(self.path())
+
+        if quality_tier >= QUALITY_STRAIGHT_LINES:
+            start = path.elementAt(0)
+            line = QLineF(QPointF(start.x, start.y), path.currentPosition())
+
+            painter.setPen(pen)
+            painter.drawLine(line)
+
+            painter.setPen(cosm_pen)
+            painter.setOpacity(0.2)
+            painter.drawLine(line)
+
+        else:
+            painter.setPen(pen)
+            painter.drawPath(path)
+
+            painter.setPen(cosm_pen)
+            painter.setOpacity(0.2)
+            painter.drawPath(path)
 
         painter.restore()
 
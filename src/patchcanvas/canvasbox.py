@@ -19,6 +19,8 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
+from bisect import bisect_right
+
 from PyQt5.QtCore import pyqtSignal, pyqtSlot, qCritical, QT_VERSION, Qt, QPointF, QRectF, QTimer
 from PyQt5.QtGui import QCursor, QFont, QFontMetrics, QImage, QLinearGradient, QPainter, QPen
 from PyQt5.QtWidgets import QGraphicsItem, QGraphicsObject, QMenu
@@ -54,6 +56,8 @@ from . import (
     ACTION_PORTS_DISCONNECT,
     ACTION_INLINE_DISPLAY,
     EYECANDY_FULL,
+    QUALITY_NO_ANTIALIASING,
+    QUALITY_NO_GRADIENTS,
     PORT_MODE_NULL,
     PORT_MODE_INPUT,
     PORT_MODE_OUTPUT,
@@ -67,9 +71,12 @@ from . import (
 
 from .canvasboxshadow import CanvasBoxShadow
 from .canvasicon import CanvasIcon
-from .canvasport import CanvasPort
+from .canvasmenu import CanvasLazyMenu, CanvasMenuAddEntries
+from .canvasport import CanvasPort, paintCanvasPort
+from .canvasportrow import CanvasPortRow
+from .spatialindex import INDEX_BOX, INDEX_PORT
 from .theme import Theme
-from .utils import CanvasItemFX, CanvasGetFullPortName, CanvasGetPortConnectionList
+from .utils import CanvasItemFX, CanvasGetFullPortName, CanvasGetPortConnectionList, CanvasRaiseBox
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -121,8 +128,16 @@ class CanvasBox(QGraphicsObject):
         self.m_will_signal_pos_change = False
 
         self.m_port_list_ids = []
+        self.m_port_widgets = {}
         self.m_connection_lines = []
 
+        # Lightweight port rows, sorted by position for lookups
+        self.m_port_rows_in = []
+        self.m_port_rows_in_y = []
+        self.m_port_rows_out = []
+        self.m_port_rows_out_y = []
+        self.m_hover_row = None
+
         # Set Font
         self.m_font_name = QFont()
         self.m_font_name.setFamily(canvas.theme.box_font_name)
@@ -152,13 +167,14 @@ class CanvasBox(QGraphicsObject):
             self.shadow = None
 
         # Final touches
-        self.setFlags(QGraphicsItem.ItemIsFocusable | QGraphicsItem.ItemIsMovable | QGraphicsItem.ItemIsSelectable)
+        self.setFlags(QGraphicsItem.ItemIsFocusable | QGraphicsItem.ItemIsMovable | QGraphicsItem.ItemIsSelectable |
+                      QGraphicsItem.ItemSendsGeometryChanges)
 
         # Wait for at least 1 port
         if options.auto_hide_groups:
             self.setVisible(False)
 
-        if options.auto_select_items:
+        if options.auto_select_items or options.lightweight_ports:
             self.setAcceptHoverEvents(True)
 
         self.updatePositions()
@@ -240,7 +256,10 @@ class CanvasBox(QGraphicsObject):
                 self.setVisible(True)
                 self.blockSignals(False)
 
-        new_widget = CanvasPort(self.m_group_id, port_id, port_name, port_mode, port_type, is_alternate, self)
+        if options.lightweight_ports:
+            new_widget = CanvasPortRow(self.m_group_id, port_id, port_name, port_mode, port_type, is_alternate, self)
+        else:
+            new_widget = CanvasPort(self.m_group_id, port_id, port_name, port_mode, port_type, is_alternate, self)
 
         port_dict = port_dict_t()
         port_dict.group_id = self.m_group_id
@@ -251,7 +270,11 @@ class CanvasBox(QGraphicsObject):
         port_dict.is_alternate = is_alternate
         port_dict.widget = new_widget
 
+        if port_type in canvas.hidden_port_types:
+            new_widget.setVisible(False)
+
         self.m_port_list_ids.append(port_id)
+        self.m_port_widgets[port_id] = new_widget
 
         return new_widget
 
@@ -262,6 +285,15 @@ class CanvasBox(QGraphicsObject):
             qCritical("PatchCanvas::CanvasBox.removePort(%i) - unable to find port to remove" % port_id)
             return
 
+        widget = self.m_port_widgets.pop(port_id, None)
+        canvas.spatial_index.remove(widget)
+
+        if options.lightweight_ports and widget is not None:
+            if self.m_hover_row is widget:
+                self.m_hover_row = None
+            widget.removeItem()
+            self.updatePortRows()
+
         if len(self.m_port_list_ids) > 0:
             self.updatePositions()
 
@@ -321,10 +353,10 @@ class CanvasBox(QGraphicsObject):
         app_name_size = fontHorizontalAdvance(self.m_font_name, self.m_group_name) + 30
         self.p_width = max(50, app_name_size)
 
-        # Get Port List
+        # Get Port List, without the hidden port types
         port_list = []
-        for port in canvas.port_list:
-            if port.group_id == self.m_group_id and port.port_id in self.m_port_list_ids:
+        for port in canvas.group_ports.get(self.m_group_id, ()):
+            if port.port_id in self.m_port_widgets and port.port_type not in canvas.hidden_port_types:
                 port_list.append(port)
 
         if len(port_list) == 0:
@@ -376,13 +408,14 @@ class CanvasBox(QGraphicsObject):
             self.repositionPorts(port_list)
 
         self.repaintLines(True)
+        self.updateSpatialIndex()
         self.update()
 
     def repositionPorts(self, port_list = None):
         if port_list is None:
             port_list = []
-            for port in canvas.port_list:
-                if port.group_id == self.m_group_id and port.port_id in self.m_port_list_ids:
+            for port in canvas.group_ports.get(self.m_group_id, ()):
+                if port.port_id in self.m_port_widgets and port.port_type not in canvas.hidden_port_types:
                     port_list.append(port)
 
         # Horizontal ports re-positioning
@@ -397,6 +430,36 @@ class CanvasBox(QGraphicsObject):
                 port.widget.setX(outX)
                 port.widget.setPortWidth(self.p_width_out)
 
+        if options.lightweight_ports:
+            self.updatePortRows()
+
+    def updatePortRows(self):
+        rows = sorted((row for row in self.m_port_widgets.values() if row.m_visible), key=lambda row: row.m_y)
+
+        self.m_port_rows_in = [row for row in rows if row.m_port_mode == PORT_MODE_INPUT]
+        self.m_port_rows_in_y = [row.m_y for row in self.m_port_rows_in]
+        self.m_port_rows_out = [row for row in rows if row.m_port_mode == PORT_MODE_OUTPUT]
+        self.m_port_rows_out_y = [row.m_y for row in self.m_port_rows_out]
+
+    def getPortRowAt(self, pos):
+        for rows, rows_y in ((self.m_port_rows_in, self.m_port_rows_in_y),
+                             (self.m_port_rows_out, self.m_port_rows_out_y)):
+            index = bisect_right(rows_y, pos.y()) - 1
+            if index >= 0 and rows[index].m_visible and rows[index].contains(pos):
+                return rows[index]
+
+        return None
+
+    @pyqtSlot()
+    def releasePortItems(self):
+        for row in self.m_port_widgets.values():
+            item = row.getItem()
+            if item is None or row is self.m_hover_row:
+                continue
+            if item.isSelected() or item.m_mouse_down:
+                continue
+            row.removeItem()
+
     def repaintLines(self, forced=False):
         if self.pos() != self.m_last_pos or forced:
             for connection in self.m_connection_lines:
@@ -404,14 +467,28 @@ class CanvasBox(QGraphicsObject):
 
         self.m_last_pos = self.pos()
 
-    def resetLinesZValue(self):
-        for connection in canvas.connection_list:
-            if connection.port_out_id in self.m_port_list_ids and connection.port_in_id in self.m_port_list_ids:
-                z_value = canvas.last_z_value
+    def updateSpatialIndex(self):
+        rect = self.sceneBoundingRect()
+        canvas.spatial_index.update(INDEX_BOX, self, rect)
+        canvas.scene.updateBoxBounds(rect)
+
+        for port_widget in self.m_port_widgets.values():
+            if port_widget.getPortType() in canvas.hidden_port_types:
+                canvas.spatial_index.remove(port_widget)
             else:
-                z_value = canvas.last_z_value - 1
+                canvas.spatial_index.update(INDEX_PORT, port_widget, port_widget.sceneBoundingRect())
+
+    def resetLinesZValue(self):
+        old_box = canvas.focused_box
+        canvas.focused_box = self
 
-            connection.widget.setZValue(z_value)
+        # only the lines of the previous and new focused box change band
+        if old_box is not None and old_box is not self:
+            for connection in old_box.m_connection_lines:
+                connection.line.updateZValue()
+
+        for connection in self.m_connection_lines:
+            connection.line.updateZValue()
 
     def triggerSignalPositionChanged(self):
         self.positionChanged.emit(self.m_group_id, self.m_splitted, self.x(), self.y())
@@ -427,91 +504,18 @@ class CanvasBox(QGraphicsObject):
     def type(self):
         return CanvasBoxType
 
+    def itemChange(self, change, value):
+        if change == QGraphicsItem.ItemPositionHasChanged:
+            self.updateSpatialIndex()
+        return QGraphicsObject.itemChange(self, change, value)
+
     def contextMenuEvent(self, event):
         event.accept()
         menu = QMenu()
 
-        # Conenct menu stuff
-        connMenu = QMenu("Connect", menu)
-
-        our_port_types = []
-        our_port_outs = {
-            PORT_TYPE_AUDIO_JACK: [],
-            PORT_TYPE_MIDI_JACK: [],
-            PORT_TYPE_MIDI_ALSA: [],
-            PORT_TYPE_PARAMETER: [],
-        }
-        for port in canvas.port_list:
-            if port.group_id != self.m_group_id:
-                continue
-            if port.port_mode != PORT_MODE_OUTPUT:
-                continue
-            if port.port_id not in self.m_port_list_ids:
-                continue
-            if port.port_type not in our_port_types:
-                our_port_types.append(port.port_type)
-            our_port_outs[port.port_type].append((port.group_id, port.port_id))
-
-        if len(our_port_types) != 0:
-            act_x_conn = None
-            for group in canvas.group_list:
-                if self.m_group_id == group.group_id:
-                    continue
-
-                has_ports = False
-                target_ports = {
-                    PORT_TYPE_AUDIO_JACK: [],
-                    PORT_TYPE_MIDI_JACK: [],
-                    PORT_TYPE_MIDI_ALSA: [],
-                    PORT_TYPE_PARAMETER: [],
-                }
-
-                for port in canvas.port_list:
-                    if port.group_id != group.group_id:
-                        continue
-                    if port.port_mode != PORT_MODE_INPUT:
-                        continue
-                    if port.port_type not in our_port_types:
-                        continue
-                    has_ports = True
-                    target_ports[port.port_type].append((port.group_id, port.port_id))
-
-                if not has_ports:
-                    continue
-
-                act_x_conn = connMenu.addAction(group.group_name)
-                act_x_conn.setData((our_port_outs, target_ports))
-                act_x_conn.triggered.connect(canvas.qobject.PortContextMenuConnect)
-
-            if act_x_conn is None:
-                act_x_disc = connMenu.addAction("Nothing to connect to")
-                act_x_disc.setEnabled(False)
-
-        else:
-            act_x_disc = connMenu.addAction("No output ports")
-            act_x_disc.setEnabled(False)
-
-        # Disconnect menu stuff
-        discMenu = QMenu("Disconnect", menu)
-
-        conn_list = []
-        conn_list_ids = []
-
-        for port_id in self.m_port_list_ids:
-            tmp_conn_list = CanvasGetPortConnectionList(self.m_group_id, port_id)
-            for tmp_conn_id, tmp_group_id, tmp_port_id in tmp_conn_list:
-                if tmp_conn_id not in conn_list_ids:
-                    conn_list.append((tmp_conn_id, tmp_group_id, tmp_port_id))
-                    conn_list_ids.append(tmp_conn_id)
-
-        if len(conn_list) > 0:
-            for conn_id, group_id, port_id in conn_list:
-                act_x_disc = discMenu.addAction(CanvasGetFullPortName(group_id, port_id))
-                act_x_disc.setData(conn_id)
-                act_x_disc.triggered.connect(canvas.qobject.PortContextMenuDisconnect)
-        else:
-            act_x_disc = discMenu.addAction("No connections")
-            act_x_disc.setEnabled(False)
+        # Conenct and Disconnect menus get filled when first shown
+        connMenu = CanvasLazyMenu("Connect", menu, self.fillConnectMenu)
+        discMenu = CanvasLazyMenu("Disconnect", menu, self.fillDisconnectMenu)
 
         menu.addMenu(connMenu)
         menu.addMenu(discMenu)
@@ -550,12 +554,14 @@ class CanvasBox(QGraphicsObject):
             act_p_replace = act_p_remove = None
 
         haveIns = haveOuts = False
-        for port in canvas.port_list:
-            if port.group_id == self.m_group_id and port.port_id in self.m_port_list_ids:
-                if port.port_mode == PORT_MODE_INPUT:
-                    haveIns = True
-                elif port.port_mode == PORT_MODE_OUTPUT:
-                    haveOuts = True
+        for port_id in self.m_port_list_ids:
+            port = canvas.port_map.get((self.m_group_id, port_id), None)
+            if port is None:
+                continue
+            if port.port_mode == PORT_MODE_INPUT:
+                haveIns = True
+            elif port.port_mode == PORT_MODE_OUTPUT:
+                haveOuts = True
 
         if not (self.m_splitted or bool(haveIns and haveOuts)):
             act_x_sep2.setVisible(False)
@@ -567,7 +573,7 @@ class CanvasBox(QGraphicsObject):
             pass
 
         elif act_selected == act_x_disc_all:
-            for conn_id in conn_list_ids:
+            for conn_id, group_id, port_id in self.getConnectionList():
                 canvas.callback(ACTION_PORTS_DISCONNECT, conn_id, 0, "")
 
         elif act_selected == act_x_info:
@@ -600,6 +606,72 @@ class CanvasBox(QGraphicsObject):
         elif act_selected == act_p_remove:
             canvas.callback(ACTION_PLUGIN_REMOVE, self.m_plugin_id, 0, "")
 
+    def getConnectionList(self):
+        conn_list = []
+        conn_list_ids = set()
+
+        for port_id in self.m_port_list_ids:
+            for conn_id, group_id, port_id2 in CanvasGetPortConnectionList(self.m_group_id, port_id):
+                if conn_id not in conn_list_ids:
+                    conn_list.append((conn_id, group_id, port_id2))
+                    conn_list_ids.add(conn_id)
+
+        return conn_list
+
+    def fillConnectMenu(self, connMenu):
+        our_port_outs = {
+            PORT_TYPE_AUDIO_JACK: [],
+            PORT_TYPE_MIDI_JACK: [],
+            PORT_TYPE_MIDI_ALSA: [],
+            PORT_TYPE_PARAMETER: [],
+        }
+        for port in canvas.group_ports.get(self.m_group_id, ()):
+            if port.port_mode != PORT_MODE_OUTPUT:
+                continue
+            if port.port_id not in self.m_port_list_ids:
+                continue
+            our_port_outs[port.port_type].append((port.group_id, port.port_id))
+
+        our_port_types = [port_type for port_type, ports in our_port_outs.items() if len(ports) != 0]
+
+        if len(our_port_types) == 0:
+            act_x_disc = connMenu.addAction("No output ports")
+            act_x_disc.setEnabled(False)
+            return
+
+        entries = []
+        for group in canvas.group_list:
+            if self.m_group_id == group.group_id:
+                continue
+
+            has_ports = False
+            target_ports = {
+                PORT_TYPE_AUDIO_JACK: [],
+                PORT_TYPE_MIDI_JACK: [],
+                PORT_TYPE_MIDI_ALSA: [],
+                PORT_TYPE_PARAMETER: [],
+            }
+
+            for port in canvas.group_ports.get(group.group_id, ()):
+                if port.port_mode != PORT_MODE_INPUT:
+                    continue
+                if port.port_type not in our_port_types:
+                    continue
+                has_ports = True
+                target_ports[port.port_type].append((port.group_id, port.port_id))
+
+            if has_ports:
+                entries.append((group.group_name, (our_port_outs, target_ports)))
+
+        CanvasMenuAddEntries(connMenu, entries, canvas.qobject.PortContextMenuConnect, "Nothing to connect to")
+
+    def fillDisconnectMenu(self, discMenu):
+        entries = []
+        for conn_id, group_id, port_id in self.getConnectionList():
+            entries.append((CanvasGetFullPortName(group_id, port_id), conn_id))
+
+        CanvasMenuAddEntries(discMenu, entries, canvas.qobject.PortContextMenuDisconnect, "No connections")
+
     def keyPressEvent(self, event):
         if self.m_plugin_id >= 0 and event.key() == Qt.Key_Delete:
             event.accept()
@@ -614,6 +686,25 @@ class CanvasBox(QGraphicsObject):
             self.setSelected(True)
         QGraphicsObject.hoverEnterEvent(self, event)
 
+    def hoverMoveEvent(self, event):
+        if options.lightweight_ports:
+            row = self.getPortRowAt(event.pos())
+
+            if row is not self.m_hover_row:
+                self.m_hover_row = row
+                if row is not None:
+                    row.createItem()
+                self.releasePortItems()
+
+        QGraphicsObject.hoverMoveEvent(self, event)
+
+    def hoverLeaveEvent(self, event):
+        if options.lightweight_ports and self.m_hover_row is not None:
+            self.m_hover_row = None
+            self.releasePortItems()
+
+        QGraphicsObject.hoverLeaveEvent(self, event)
+
     def mouseDoubleClickEvent(self, event):
         if self.m_plugin_id >= 0:
             event.accept()
@@ -627,8 +718,7 @@ class CanvasBox(QGraphicsObject):
             event.ignore()
             return
 
-        canvas.last_z_value += 1
-        self.setZValue(canvas.last_z_value)
+        CanvasRaiseBox(self)
         self.resetLinesZValue()
         self.m_cursor_moving = False
 
@@ -680,7 +770,9 @@ class CanvasBox(QGraphicsObject):
 
     def paint(self, painter, option, widget):
         painter.save()
-        painter.setRenderHint(QPainter.Antialiasing, bool(options.antialiasing == ANTIALIASING_FULL))
+        quality_tier = canvas.scene.getQualityTier()
+        painter.setRenderHint(QPainter.Antialiasing,
+                              bool(options.antialiasing == ANTIALIASING_FULL and quality_tier < QUALITY_NO_ANTIALIASING))
         rect = QRectF(0, 0, self.p_width, self.p_height)
 
         # Draw rectangle
@@ -689,7 +781,7 @@ class CanvasBox(QGraphicsObject):
         painter.setPen(pen)
         lineHinting = pen.widthF() / 2
 
-        if canvas.theme.box_bg_type == Theme.THEME_BG_GRADIENT:
+        if canvas.theme.box_bg_type == Theme.THEME_BG_GRADIENT and quality_tier < QUALITY_NO_GRADIENTS:
             box_gradient = QLinearGradient(0, 0, 0, self.p_height)
             box_gradient.setColorAt(0, canvas.theme.box_bg_1)
             box_gradient.setColorAt(1, canvas.theme.box_bg_2)
@@ -733,6 +825,17 @@ class CanvasBox(QGraphicsObject):
 
         painter.drawText(textPos, self.m_group_name)
 
+        # Draw lightweight ports, unless they currently have a real item
+        if options.lightweight_ports:
+            for row in self.m_port_widgets.values():
+                if row.m_item is not None or not row.m_visible:
+                    continue
+                painter.save()
+                painter.setBrush(Qt.NoBrush)
+                painter.translate(row.m_x, row.m_y)
+                paintCanvasPort(painter, row, False)
+                painter.restore()
+
         self.repaintLines()
 
         painter.restore()
@@ -771,6 +874,7 @@ class CanvasBox(QGraphicsObject):
                 self.p_width += int(max(0, min((80 - 14)*scaling, (inheight-inwidth) * aspectRatio * scaling)))
                 self.repositionPorts()
                 self.repaintLines(True)
+                self.updateSpatialIndex()
                 self.update()
                 return
 
@@ -19,72 +19,128 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-from PyQt5.QtCore import QAbstractAnimation
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, QElapsedTimer, QObject, QTimer
 from PyQt5.QtWidgets import QGraphicsObject
 
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Custom)
 
-from . import canvas, CanvasBoxType
+from . import canvas, options, CanvasBoxType
 
 # ------------------------------------------------------------------------------------------------------------
 
-class CanvasFadeAnimation(QAbstractAnimation):
-    def __init__(self, item, show):
-        QAbstractAnimation.__init__(self)
+# Drives all eyecandy fades from a single timer.
+# Each animated item maps to (start time, duration, show, destroy), and every tick updates all of them in one pass.
+class CanvasFadeAnimation(QObject):
+    # signals
+    itemFinished = pyqtSignal(object, bool, bool)
 
-        self.m_show = show
-        self.m_duration = 0
-        self.m_item = item
-        self.m_item_is_object = isinstance(item, QGraphicsObject)
+    TICK_INTERVAL = 16
 
-    def item(self):
-        return self.m_item
+    def __init__(self, parent=None):
+        QObject.__init__(self, parent)
 
-    def forceStop(self):
-        self.blockSignals(True)
-        self.stop()
-        self.blockSignals(False)
+        self.m_items = {}
+        self.m_burst = []
+        self.m_burst_skip = False
 
-    def setDuration(self, time):
-        if self.m_item.opacity() == 0 and not self.m_show:
-            self.m_duration = 0
-        else:
-            if self.m_item_is_object:
-                self.m_item.blockSignals(True)
-                self.m_item.show()
-                self.m_item.blockSignals(False)
-            else:
-                self.m_item.show()
-            self.m_duration = time
-
-    def duration(self):
-        return self.m_duration
-
-    def updateCurrentTime(self, time):
-        if self.m_duration == 0:
+        self.m_clock = QElapsedTimer()
+        self.m_clock.start()
+
+        self.m_timer = QTimer(self)
+        self.m_timer.setInterval(self.TICK_INTERVAL)
+        self.m_timer.timeout.connect(self.slot_tick)
+
+    def isAnimating(self, item):
+        return item in self.m_items
+
+    def start(self, item, show, destroy, duration):
+        self.m_items.pop(item, None)
+
+        if not show and item.opacity() == 0:
+            self.itemFinished.emit(item, show, destroy)
             return
 
-        if self.m_show:
-            value = float(time) / self.m_duration
+        if isinstance(item, QGraphicsObject):
+            item.blockSignals(True)
+            item.show()
+            item.blockSignals(False)
         else:
-            value = 1.0 - (float(time) / self.m_duration)
+            item.show()
+
+        # Too many items changing at once, skip the fades
+        if self.m_burst_skip:
+            self.finish(item, show, destroy)
+            return
+
+        item.setOpacity(0.0 if show else 1.0)
+
+        if item.type() == CanvasBoxType:
+            item.setShadowOpacity(0.0 if show else 1.0)
+
+        self.m_items[item] = (self.m_clock.elapsed(), duration, show, destroy)
+        self.m_burst.append(item)
+
+        if len(self.m_burst) > options.eyecandy_max_items:
+            if canvas.debug:
+                print("PatchCanvas::CanvasFadeAnimation.start() - too many items, skipping fades")
 
+            self.m_burst_skip = True
+            for bitem in self.m_burst:
+                state = self.m_items.pop(bitem, None)
+                if state is not None:
+                    self.finish(bitem, state[2], state[3])
+            self.m_burst = []
+
+        # always keep ticking until the next frame, that is where the burst gets reset
+        if not self.m_timer.isActive():
+            self.m_timer.start()
+
+    def finish(self, item, show, destroy):
         try:
-            self.m_item.setOpacity(value)
+            item.setOpacity(1.0 if show else 0.0)
         except RuntimeError:
-            print("CanvasFadeAnimation::updateCurrentTime() - failed to animate canvas item, already destroyed?")
-            self.forceStop()
-            canvas.animation_list.remove(self)
             return
 
-        if self.m_item.type() == CanvasBoxType:
-            self.m_item.setShadowOpacity(value)
+        if item.type() == CanvasBoxType:
+            item.setShadowOpacity(1.0 if show else 0.0)
+
+        self.itemFinished.emit(item, show, destroy)
+
+    @pyqtSlot()
+    def slot_tick(self):
+        now = self.m_clock.elapsed()
+        finished = []
+
+        self.m_burst = []
+        self.m_burst_skip = False
+
+        for item, (start, duration, show, destroy) in self.m_items.items():
+            value = float(now - start) / duration
+
+            if value >= 1.0:
+                finished.append((item, show, destroy))
+                continue
+
+            if not show:
+                value = 1.0 - value
+
+            try:
+                item.setOpacity(value)
+            except RuntimeError:
+                print("CanvasFadeAnimation::slot_tick() - failed to animate canvas item, already destroyed?")
+                finished.append((item, None, False))
+                continue
+
+            if item.type() == CanvasBoxType:
+                item.setShadowOpacity(value)
 
-    def updateDirection(self, direction):
-        pass
+        for item, show, destroy in finished:
+            del self.m_items[item]
+            if show is not None:
+                self.finish(item, show, destroy)
 
-    def updateState(self, oldState, newState):
-        pass
+        if len(self.m_items) == 0:
+            self.m_timer.stop()
 
 # ------------------------------------------------------------------------------------------------------------
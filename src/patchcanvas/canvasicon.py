@@ -19,10 +19,12 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-from PyQt5.QtCore import qCritical, QRectF
-from PyQt5.QtGui import QPainter
-from PyQt5.QtSvg import QGraphicsSvgItem, QSvgRenderer
-from PyQt5.QtWidgets import QGraphicsColorizeEffect
+from math import ceil
+
+from PyQt5.QtCore import QT_VERSION, qCritical, Qt, QRectF
+from PyQt5.QtGui import QImage, QPainter, QPixmap
+from PyQt5.QtSvg import QSvgRenderer
+from PyQt5.QtWidgets import QGraphicsItem
 
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Custom)
@@ -41,21 +43,65 @@ from . import (
 
 # ------------------------------------------------------------------------------------------------------------
 
-class CanvasIcon(QGraphicsSvgItem):
+# Max amount of tinted pixmaps kept around, zooming creates a new size each step
+ICON_PIXMAP_CACHE_SIZE = 256
+
+def getIconRenderer(icon_path):
+    renderer = canvas.icon_renderers.get(icon_path, None)
+
+    if renderer is None:
+        renderer = QSvgRenderer(icon_path)
+        canvas.icon_renderers[icon_path] = renderer
+
+    return renderer
+
+def getIconPixmap(icon_path, color, width, height, dpr):
+    key = (icon_path, color.rgba(), width, height, dpr)
+    pixmap = canvas.icon_pixmaps.get(key, None)
+
+    if pixmap is not None:
+        return pixmap
+
+    if len(canvas.icon_pixmaps) >= ICON_PIXMAP_CACHE_SIZE:
+        canvas.icon_pixmaps.clear()
+
+    image = QImage(width, height, QImage.Format_ARGB32_Premultiplied)
+    image.fill(Qt.transparent)
+
+    painter = QPainter(image)
+    getIconRenderer(icon_path).render(painter, QRectF(0, 0, width, height))
+    painter.end()
+
+    # Same as QGraphicsColorizeEffect: grayscale, screen the color on top, then restore the original alpha
+    tinted = image.convertToFormat(QImage.Format_ARGB32).convertToFormat(QImage.Format_Grayscale8)
+    tinted = tinted.convertToFormat(QImage.Format_ARGB32_Premultiplied)
+
+    painter = QPainter(tinted)
+    painter.setCompositionMode(QPainter.CompositionMode_Screen)
+    painter.fillRect(tinted.rect(), color)
+    painter.setCompositionMode(QPainter.CompositionMode_DestinationIn)
+    painter.drawImage(0, 0, image)
+    painter.end()
+
+    pixmap = QPixmap.fromImage(tinted)
+    canvas.icon_pixmaps[key] = pixmap
+    return pixmap
+
+# ------------------------------------------------------------------------------------------------------------
+
+class CanvasIcon(QGraphicsItem):
     def __init__(self, icon, name, parent):
-        QGraphicsSvgItem.__init__(self)
+        QGraphicsItem.__init__(self)
         self.setParentItem(parent)
 
-        self.m_renderer = None
+        self.m_icon_path = ""
         self.p_size = QRectF(0, 0, 0, 0)
 
-        self.m_colorFX = QGraphicsColorizeEffect(self)
-        self.m_colorFX.setColor(canvas.theme.box_text.color())
-
-        self.setGraphicsEffect(self.m_colorFX)
         self.setIcon(icon, name)
 
     def setIcon(self, icon, name):
+        self.prepareGeometryChange()
+
         name = name.lower()
         icon_path = ""
 
@@ -112,8 +158,7 @@ class CanvasIcon(QGraphicsSvgItem):
                       icon2str(icon), name.encode()))
             return
 
-        self.m_renderer = QSvgRenderer(icon_path, canvas.scene)
-        self.setSharedRenderer(self.m_renderer)
+        self.m_icon_path = icon_path
         self.update()
 
     def type(self):
@@ -123,14 +168,23 @@ class CanvasIcon(QGraphicsSvgItem):
         return self.p_size
 
     def paint(self, painter, option, widget):
-        if not self.m_renderer:
-            QGraphicsSvgItem.paint(self, painter, option, widget)
+        if not self.m_icon_path:
             return
 
+        # sized from the painter, the minimap and other scene renders do not use the view scale
+        dpr = painter.device().devicePixelRatioF() if QT_VERSION >= 0x50600 else 1.0
+        scaling = painter.worldTransform().m11() * dpr
+        width = int(ceil(self.p_size.width() * scaling))
+        height = int(ceil(self.p_size.height() * scaling))
+
+        if width <= 0 or height <= 0:
+            return
+
+        pixmap = getIconPixmap(self.m_icon_path, canvas.theme.box_text.color(), width, height, dpr)
+
         painter.save()
-        painter.setRenderHint(QPainter.Antialiasing, False)
-        painter.setRenderHint(QPainter.TextAntialiasing, False)
-        self.m_renderer.render(painter, self.p_size)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+        painter.drawPixmap(self.p_size, pixmap, QRectF(pixmap.rect()))
         painter.restore()
 
 # ------------------------------------------------------------------------------------------------------------
@@ -32,14 +32,19 @@ from . import (
     CanvasLineType,
     ACTION_PORTS_DISCONNECT,
     EYECANDY_FULL,
+    QUALITY_NO_ANTIALIASING,
+    QUALITY_NO_GRADIENTS,
     PORT_MODE_OUTPUT,
     PORT_TYPE_AUDIO_JACK,
     PORT_TYPE_MIDI_ALSA,
     PORT_TYPE_MIDI_JACK,
     PORT_TYPE_PARAMETER,
+    Z_VALUE_LINES_BACKGROUND,
+    Z_VALUE_LINES_FOREGROUND,
 )
 
 from .canvasportglow import CanvasPortGlow
+from .spatialindex import INDEX_LINE
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -79,6 +84,13 @@ class CanvasLine(QGraphicsLineItem):
 
         self.m_lineSelected = yesno
         self.updateLineGradient()
+        self.updateZValue()
+
+    def updateZValue(self):
+        if self.m_lineSelected or canvas.focused_box in (self.item1.parentItem(), self.item2.parentItem()):
+            self.setZValue(Z_VALUE_LINES_FOREGROUND)
+        else:
+            self.setZValue(Z_VALUE_LINES_BACKGROUND)
 
     def triggerDisconnect(self):
         for connection in canvas.connection_list:
@@ -99,6 +111,10 @@ class CanvasLine(QGraphicsLineItem):
             self.m_lineSelected = False
             self.updateLineGradient()
 
+            # hidden lines are kept out of the index until shown again
+            if self.isVisible():
+                canvas.spatial_index.update(INDEX_LINE, self, self.sceneBoundingRect())
+
     def type(self):
         return CanvasLineType
 
@@ -138,14 +154,22 @@ class CanvasLine(QGraphicsLineItem):
 
     def paint(self, painter, option, widget):
         painter.save()
-        painter.setRenderHint(QPainter.Antialiasing, bool(options.antialiasing))
+        quality_tier = canvas.scene.getQualityTier()
+        painter.setRenderHint(QPainter.Antialiasing,
+                              bool(options.antialiasing and quality_tier < QUALITY_NO_ANTIALIASING))
 
         pen = self.pen()
+
+        if quality_tier >= QUALITY_NO_GRADIENTS:
+            pen = QPen(pen)
+            pen.setColor(pen.brush().gradient().stops()[0][1])
+
         cosm_pen = QPen(pen)
         cosm_pen.setCosmetic(True)
         cosm_pen.setWidthF(1.00001)
 
-        QGraphicsLineItem.paint(self, painter, option, widget)
+        painter.setPen(pen)
+        painter.drawLine(self.line())
 
         painter.setPen(cosm_pen)
         painter.setBrush(Qt.NoBrush)
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+from PyQt5.QtCore import pyqtSlot
+from PyQt5.QtWidgets import QMenu
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Maximum number of entries shown directly in a menu, longer lists get paged into submenus
+MENU_CHUNK_SIZE = 40
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Menu that only gets filled right before it is shown for the first time.
+# 'populate' is called with the menu as its only argument.
+class CanvasLazyMenu(QMenu):
+    def __init__(self, title, parent, populate):
+        QMenu.__init__(self, title, parent)
+
+        self.m_populate = populate
+        self.m_populated = False
+
+        self.aboutToShow.connect(self.slot_aboutToShow)
+
+    def isPopulated(self):
+        return self.m_populated
+
+    @pyqtSlot()
+    def slot_aboutToShow(self):
+        if self.m_populated:
+            return
+
+        self.m_populated = True
+        self.m_populate(self)
+
+# ------------------------------------------------------------------------------------------------------------
+
+def CanvasMenuAddEntries(menu, entries, slot, empty_text):
+    if len(entries) == 0:
+        act_x_none = menu.addAction(empty_text)
+        act_x_none.setEnabled(False)
+        return
+
+    if len(entries) <= MENU_CHUNK_SIZE:
+        for title, data in entries:
+            act_x_entry = menu.addAction(title)
+            act_x_entry.setData(data)
+            act_x_entry.triggered.connect(slot)
+        return
+
+    for i in range(0, len(entries), MENU_CHUNK_SIZE):
+        chunk = entries[i:i+MENU_CHUNK_SIZE]
+        title = "%s ... %s" % (chunk[0][0], chunk[-1][0])
+        menu.addMenu(CanvasLazyMenu(title, menu, lambda m, c=chunk: CanvasMenuAddEntries(m, c, slot, empty_text)))
+
+# ------------------------------------------------------------------------------------------------------------
@@ -40,18 +40,147 @@ from . import (
     ACTION_PORT_RENAME,
     ACTION_PORTS_CONNECT,
     ACTION_PORTS_DISCONNECT,
+    QUALITY_NO_ANTIALIASING,
     PORT_MODE_INPUT,
     PORT_MODE_OUTPUT,
     PORT_TYPE_AUDIO_JACK,
     PORT_TYPE_MIDI_ALSA,
     PORT_TYPE_MIDI_JACK,
     PORT_TYPE_PARAMETER,
+    Z_VALUE_LINE_MOV,
 )
 
 from .canvasbezierlinemov import CanvasBezierLineMov
 from .canvaslinemov import CanvasLineMov
+from .canvasmenu import CanvasLazyMenu, CanvasMenuAddEntries
+from .spatialindex import INDEX_PORT
 from .theme import Theme
-from .utils import CanvasGetFullPortName, CanvasGetPortConnectionList
+from .utils import CanvasGetFullPortName, CanvasGetPortConnectionList, CanvasRaiseBox
+
+# ------------------------------------------------------------------------------------------------------------
+# Port shape painting, shared with the lightweight port rows drawn by CanvasBox
+
+def paintCanvasPort(painter, port, selected):
+    theme = canvas.theme
+    if port.m_port_type == PORT_TYPE_AUDIO_JACK:
+        poly_color = theme.port_audio_jack_bg_sel if selected else theme.port_audio_jack_bg
+        poly_pen = theme.port_audio_jack_pen_sel  if selected else theme.port_audio_jack_pen
+        text_pen = theme.port_audio_jack_text_sel if selected else theme.port_audio_jack_text
+        conn_pen = QPen(theme.port_audio_jack_pen_sel)
+    elif port.m_port_type == PORT_TYPE_MIDI_JACK:
+        poly_color = theme.port_midi_jack_bg_sel if selected else theme.port_midi_jack_bg
+        poly_pen = theme.port_midi_jack_pen_sel  if selected else theme.port_midi_jack_pen
+        text_pen = theme.port_midi_jack_text_sel if selected else theme.port_midi_jack_text
+        conn_pen = QPen(theme.port_midi_jack_pen_sel)
+    elif port.m_port_type == PORT_TYPE_MIDI_ALSA:
+        poly_color = theme.port_midi_alsa_bg_sel if selected else theme.port_midi_alsa_bg
+        poly_pen = theme.port_midi_alsa_pen_sel  if selected else theme.port_midi_alsa_pen
+        text_pen = theme.port_midi_alsa_text_sel if selected else theme.port_midi_alsa_text
+        conn_pen = QPen(theme.port_midi_alsa_pen_sel)
+    elif port.m_port_type == PORT_TYPE_PARAMETER:
+        poly_color = theme.port_parameter_bg_sel if selected else theme.port_parameter_bg
+        poly_pen = theme.port_parameter_pen_sel  if selected else theme.port_parameter_pen
+        text_pen = theme.port_parameter_text_sel if selected else theme.port_parameter_text
+        conn_pen = QPen(theme.port_parameter_pen_sel)
+    else:
+        qCritical("PatchCanvas::paintCanvasPort() - invalid port type '%s'" % port_type2str(port.m_port_type))
+        return
+
+    # To prevent quality worsening
+    poly_pen = QPen(poly_pen)
+    poly_pen.setWidthF(poly_pen.widthF() + 0.00001)
+
+    if port.m_is_alternate:
+        poly_color = poly_color.darker(180)
+        #poly_pen.setColor(poly_pen.color().darker(110))
+        #text_pen.setColor(text_pen.color()) #.darker(150))
+        #conn_pen.setColor(conn_pen.color()) #.darker(150))
+
+    lineHinting = poly_pen.widthF() / 2
+
+    poly_locx = [0, 0, 0, 0, 0]
+    poly_corner_xhinting = (float(canvas.theme.port_height)/2) % floor(float(canvas.theme.port_height)/2)
+    if poly_corner_xhinting == 0:
+        poly_corner_xhinting = 0.5 * (1 - 7 / (float(canvas.theme.port_height)/2))
+
+    if port.m_port_mode == PORT_MODE_INPUT:
+        text_pos = QPointF(3, canvas.theme.port_text_ypos)
+
+        if canvas.theme.port_mode == Theme.THEME_PORT_POLYGON:
+            poly_locx[0] = lineHinting
+            poly_locx[1] = port.m_port_width + 5 - lineHinting
+            poly_locx[2] = port.m_port_width + 12 - poly_corner_xhinting
+            poly_locx[3] = port.m_port_width + 5 - lineHinting
+            poly_locx[4] = lineHinting
+        elif canvas.theme.port_mode == Theme.THEME_PORT_SQUARE:
+            poly_locx[0] = lineHinting
+            poly_locx[1] = port.m_port_width + 5 - lineHinting
+            poly_locx[2] = port.m_port_width + 5 - lineHinting
+            poly_locx[3] = port.m_port_width + 5 - lineHinting
+            poly_locx[4] = lineHinting
+        else:
+            qCritical("PatchCanvas::paintCanvasPort() - invalid theme port mode '%s'" % canvas.theme.port_mode)
+            return
+
+    elif port.m_port_mode == PORT_MODE_OUTPUT:
+        text_pos = QPointF(9, canvas.theme.port_text_ypos)
+
+        if canvas.theme.port_mode == Theme.THEME_PORT_POLYGON:
+            poly_locx[0] = port.m_port_width + 12 - lineHinting
+            poly_locx[1] = 7 + lineHinting
+            poly_locx[2] = 0 + poly_corner_xhinting
+            poly_locx[3] = 7 + lineHinting
+            poly_locx[4] = port.m_port_width + 12 - lineHinting
+        elif canvas.theme.port_mode == Theme.THEME_PORT_SQUARE:
+            poly_locx[0] = port.m_port_width + 12 - lineHinting
+            poly_locx[1] = 5 + lineHinting
+            poly_locx[2] = 5 + lineHinting
+            poly_locx[3] = 5 + lineHinting
+            poly_locx[4] = port.m_port_width + 12 - lineHinting
+        else:
+            qCritical("PatchCanvas::paintCanvasPort() - invalid theme port mode '%s'" % canvas.theme.port_mode)
+            return
+
+    else:
+        qCritical("PatchCanvas::paintCanvasPort() - invalid port mode '%s'" % port_mode2str(port.m_port_mode))
+        return
+
+    polygon = QPolygonF()
+    polygon += QPointF(poly_locx[0], lineHinting)
+    polygon += QPointF(poly_locx[1], lineHinting)
+    polygon += QPointF(poly_locx[2], float(canvas.theme.port_height)/2)
+    polygon += QPointF(poly_locx[3], canvas.theme.port_height - lineHinting)
+    polygon += QPointF(poly_locx[4], canvas.theme.port_height - lineHinting)
+    polygon += QPointF(poly_locx[0], lineHinting)
+
+    if canvas.theme.port_bg_pixmap:
+        portRect = polygon.boundingRect().adjusted(-lineHinting+1, -lineHinting+1, lineHinting-1, lineHinting-1)
+        portPos = portRect.topLeft()
+        painter.drawTiledPixmap(portRect, canvas.theme.port_bg_pixmap, portPos)
+    else:
+        painter.setBrush(poly_color) #.lighter(200))
+
+    painter.setPen(poly_pen)
+    painter.drawPolygon(polygon)
+
+    painter.setPen(text_pen)
+    painter.setFont(port.m_port_font)
+    painter.drawText(text_pos, port.m_port_name)
+
+    if canvas.theme.idx == Theme.THEME_OOSTUDIO and canvas.theme.port_bg_pixmap:
+        conn_pen.setCosmetic(True)
+        conn_pen.setWidthF(0.4)
+        painter.setPen(conn_pen)
+
+        if port.m_port_mode == PORT_MODE_INPUT:
+            connLineX = portRect.left()+1
+        else:
+            connLineX = portRect.right()-1
+        conn_path = QPainterPath()
+        conn_path.addRect(QRectF(connLineX-1, portRect.top(), 2, portRect.height()))
+        painter.fillPath(conn_path, conn_pen.brush())
+        painter.drawLine(QLineF(connLineX, portRect.top(), connLineX, portRect.bottom()))
+
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -79,6 +208,9 @@ class CanvasPort(QGraphicsItem):
         self.m_line_mov = None
         self.m_hover_item = None
 
+        # lightweight port row this item was created for, if any
+        self.m_row = None
+
         self.m_mouse_down = False
         self.m_cursor_moving = False
 
@@ -121,14 +253,14 @@ class CanvasPort(QGraphicsItem):
 
     def setPortName(self, port_name):
         if QFontMetrics(self.m_port_font).width(port_name) < QFontMetrics(self.m_port_font).width(self.m_port_name):
-            QTimer.singleShot(0, canvas.scene.update)
+            canvas.scene.scheduleUpdate(self.sceneBoundingRect())
 
         self.m_port_name = port_name
         self.update()
 
     def setPortWidth(self, port_width):
         if port_width < self.m_port_width:
-            QTimer.singleShot(0, canvas.scene.update)
+            canvas.scene.scheduleUpdate(self.sceneBoundingRect())
 
         self.m_port_width = port_width
         self.update()
@@ -185,18 +317,13 @@ class CanvasPort(QGraphicsItem):
             else:
                 self.m_line_mov = CanvasLineMov(self.m_port_mode, self.m_port_type, self)
 
-            canvas.last_z_value += 1
-            self.m_line_mov.setZValue(canvas.last_z_value)
-            canvas.last_z_value += 1
-            self.parentItem().setZValue(canvas.last_z_value)
+            # the drag line is a child of this port, lift its box into the drag line band while dragging
+            self.m_line_mov.setZValue(Z_VALUE_LINE_MOV)
+            self.parentItem().setZValue(Z_VALUE_LINE_MOV)
 
         item = None
-        items = canvas.scene.items(event.scenePos(), Qt.ContainsItemShape, Qt.AscendingOrder)
-        #for i in range(len(items)):
-        for _, itemx in enumerate(items):
-            if itemx.type() != CanvasPortType:
-                continue
-            if itemx == self:
+        for itemx in canvas.spatial_index.queryPoint(INDEX_PORT, event.scenePos()):
+            if itemx == self or itemx is self.m_row or not itemx.isVisible():
                 continue
             if item is None or itemx.parentItem().zValue() > item.parentItem().zValue():
                 item = itemx
@@ -223,6 +350,8 @@ class CanvasPort(QGraphicsItem):
                 canvas.scene.removeItem(item)
                 del item
 
+                CanvasRaiseBox(self.parentItem())
+
             for connection in canvas.connection_list:
                 if (
                     (connection.group_out_id == self.m_group_id and
@@ -272,6 +401,9 @@ class CanvasPort(QGraphicsItem):
         self.m_mouse_down = False
         self.m_cursor_moving = False
 
+        if self.m_row is not None:
+            QTimer.singleShot(0, self.parentItem().releasePortItems)
+
     def mouseReleaseEvent(self, event):
         self.handleMouseRelease()
         QGraphicsItem.mouseReleaseEvent(self, event)
@@ -283,18 +415,7 @@ class CanvasPort(QGraphicsItem):
         self.setSelected(True)
 
         menu = QMenu()
-        discMenu = QMenu("Disconnect", menu)
-
-        conn_list = CanvasGetPortConnectionList(self.m_group_id, self.m_port_id)
-
-        if len(conn_list) > 0:
-            for conn_id, group_id, port_id in conn_list:
-                act_x_disc = discMenu.addAction(CanvasGetFullPortName(group_id, port_id))
-                act_x_disc.setData(conn_id)
-                act_x_disc.triggered.connect(canvas.qobject.PortContextMenuDisconnect)
-        else:
-            act_x_disc = discMenu.addAction("No connections")
-            act_x_disc.setEnabled(False)
+        discMenu = CanvasLazyMenu("Disconnect", menu, self.fillDisconnectMenu)
 
         menu.addMenu(discMenu)
         act_x_disc_all = menu.addAction("Disconnect &All")
@@ -314,7 +435,7 @@ class CanvasPort(QGraphicsItem):
         act_selected = menu.exec_(event.screenPos())
 
         if act_selected == act_x_disc_all:
-            self.triggerDisconnect(conn_list)
+            self.triggerDisconnect()
 
         elif act_selected == act_x_info:
             canvas.callback(ACTION_PORT_INFO, self.m_group_id, self.m_port_id, "")
@@ -322,20 +443,22 @@ class CanvasPort(QGraphicsItem):
         elif act_selected == act_x_rename:
             canvas.callback(ACTION_PORT_RENAME, self.m_group_id, self.m_port_id, "")
 
+    def fillDisconnectMenu(self, discMenu):
+        entries = []
+        for conn_id, group_id, port_id in CanvasGetPortConnectionList(self.m_group_id, self.m_port_id):
+            entries.append((CanvasGetFullPortName(group_id, port_id), conn_id))
+
+        CanvasMenuAddEntries(discMenu, entries, canvas.qobject.PortContextMenuDisconnect, "No connections")
+
     def setPortSelected(self, yesno):
-        for connection in canvas.connection_list:
-            if (
-                (connection.group_out_id == self.m_group_id and
-                 connection.port_out_id == self.m_port_id)
-                or
-                (connection.group_in_id == self.m_group_id and
-                 connection.port_in_id == self.m_port_id)
-               ):
-                connection.widget.updateLineSelected()
+        for connection in canvas.port_connections.get((self.m_group_id, self.m_port_id), ()):
+            connection.widget.updateLineSelected()
 
     def itemChange(self, change, value):
         if change == QGraphicsItem.ItemSelectedHasChanged:
             self.setPortSelected(value)
+            if not value and self.m_row is not None:
+                QTimer.singleShot(0, self.parentItem().releasePortItems)
         return QGraphicsItem.itemChange(self, change, value)
 
     def triggerDisconnect(self, conn_list=None):
@@ -349,129 +472,10 @@ class CanvasPort(QGraphicsItem):
 
     def paint(self, painter, option, widget):
         painter.save()
-        painter.setRenderHint(QPainter.Antialiasing, bool(options.antialiasing == ANTIALIASING_FULL))
-
-        selected = self.isSelected()
-        theme = canvas.theme
-        if self.m_port_type == PORT_TYPE_AUDIO_JACK:
-            poly_color = theme.port_audio_jack_bg_sel if selected else theme.port_audio_jack_bg
-            poly_pen = theme.port_audio_jack_pen_sel  if selected else theme.port_audio_jack_pen
-            text_pen = theme.port_audio_jack_text_sel if selected else theme.port_audio_jack_text
-            conn_pen = QPen(theme.port_audio_jack_pen_sel)
-        elif self.m_port_type == PORT_TYPE_MIDI_JACK:
-            poly_color = theme.port_midi_jack_bg_sel if selected else theme.port_midi_jack_bg
-            poly_pen = theme.port_midi_jack_pen_sel  if selected else theme.port_midi_jack_pen
-            text_pen = theme.port_midi_jack_text_sel if selected else theme.port_midi_jack_text
-            conn_pen = QPen(theme.port_midi_jack_pen_sel)
-        elif self.m_port_type == PORT_TYPE_MIDI_ALSA:
-            poly_color = theme.port_midi_alsa_bg_sel if selected else theme.port_midi_alsa_bg
-            poly_pen = theme.port_midi_alsa_pen_sel  if selected else theme.port_midi_alsa_pen
-            text_pen = theme.port_midi_alsa_text_sel if selected else theme.port_midi_alsa_text
-            conn_pen = QPen(theme.port_midi_alsa_pen_sel)
-        elif self.m_port_type == PORT_TYPE_PARAMETER:
-            poly_color = theme.port_parameter_bg_sel if selected else theme.port_parameter_bg
-            poly_pen = theme.port_parameter_pen_sel  if selected else theme.port_parameter_pen
-            text_pen = theme.port_parameter_text_sel if selected else theme.port_parameter_text
-            conn_pen = QPen(theme.port_parameter_pen_sel)
-        else:
-            qCritical("PatchCanvas::CanvasPort.paint() - invalid port type '%s'" % port_type2str(self.m_port_type))
-            return
-
-        # To prevent quality worsening
-        poly_pen = QPen(poly_pen)
-        poly_pen.setWidthF(poly_pen.widthF() + 0.00001)
-
-        if self.m_is_alternate:
-            poly_color = poly_color.darker(180)
-            #poly_pen.setColor(poly_pen.color().darker(110))
-            #text_pen.setColor(text_pen.color()) #.darker(150))
-            #conn_pen.setColor(conn_pen.color()) #.darker(150))
-
-        lineHinting = poly_pen.widthF() / 2
-
-        poly_locx = [0, 0, 0, 0, 0]
-        poly_corner_xhinting = (float(canvas.theme.port_height)/2) % floor(float(canvas.theme.port_height)/2)
-        if poly_corner_xhinting == 0:
-            poly_corner_xhinting = 0.5 * (1 - 7 / (float(canvas.theme.port_height)/2))
-
-        if self.m_port_mode == PORT_MODE_INPUT:
-            text_pos = QPointF(3, canvas.theme.port_text_ypos)
-
-            if canvas.theme.port_mode == Theme.THEME_PORT_POLYGON:
-                poly_locx[0] = lineHinting
-                poly_locx[1] = self.m_port_width + 5 - lineHinting
-                poly_locx[2] = self.m_port_width + 12 - poly_corner_xhinting
-                poly_locx[3] = self.m_port_width + 5 - lineHinting
-                poly_locx[4] = lineHinting
-            elif canvas.theme.port_mode == Theme.THEME_PORT_SQUARE:
-                poly_locx[0] = lineHinting
-                poly_locx[1] = self.m_port_width + 5 - lineHinting
-                poly_locx[2] = self.m_port_width + 5 - lineHinting
-                poly_locx[3] = self.m_port_width + 5 - lineHinting
-                poly_locx[4] = lineHinting
-            else:
-                qCritical("PatchCanvas::CanvasPort.paint() - invalid theme port mode '%s'" % canvas.theme.port_mode)
-                return
-
-        elif self.m_port_mode == PORT_MODE_OUTPUT:
-            text_pos = QPointF(9, canvas.theme.port_text_ypos)
-
-            if canvas.theme.port_mode == Theme.THEME_PORT_POLYGON:
-                poly_locx[0] = self.m_port_width + 12 - lineHinting
-                poly_locx[1] = 7 + lineHinting
-                poly_locx[2] = 0 + poly_corner_xhinting
-                poly_locx[3] = 7 + lineHinting
-                poly_locx[4] = self.m_port_width + 12 - lineHinting
-            elif canvas.theme.port_mode == Theme.THEME_PORT_SQUARE:
-                poly_locx[0] = self.m_port_width + 12 - lineHinting
-                poly_locx[1] = 5 + lineHinting
-                poly_locx[2] = 5 + lineHinting
-                poly_locx[3] = 5 + lineHinting
-                poly_locx[4] = self.m_port_width + 12 - lineHinting
-            else:
-                qCritical("PatchCanvas::CanvasPort.paint() - invalid theme port mode '%s'" % canvas.theme.port_mode)
-                return
-
-        else:
-            qCritical("PatchCanvas::CanvasPort.paint() - invalid port mode '%s'" % port_mode2str(self.m_port_mode))
-            return
-
-        polygon = QPolygonF()
-        polygon += QPointF(poly_locx[0], lineHinting)
-        polygon += QPointF(poly_locx[1], lineHinting)
-        polygon += QPointF(poly_locx[2], float(canvas.theme.port_height)/2)
-        polygon += QPointF(poly_locx[3], canvas.theme.port_height - lineHinting)
-        polygon += QPointF(poly_locx[4], canvas.theme.port_height - lineHinting)
-        polygon += QPointF(poly_locx[0], lineHinting)
-
-        if canvas.theme.port_bg_pixmap:
-            portRect = polygon.boundingRect().adjusted(-lineHinting+1, -lineHinting+1, lineHinting-1, lineHinting-1)
-            portPos = portRect.topLeft()
-            painter.drawTiledPixmap(portRect, canvas.theme.port_bg_pixmap, portPos)
-        else:
-            painter.setBrush(poly_color) #.lighter(200))
-
-        painter.setPen(poly_pen)
-        painter.drawPolygon(polygon)
-
-        painter.setPen(text_pen)
-        painter.setFont(self.m_port_font)
-        painter.drawText(text_pos, self.m_port_name)
-
-        if canvas.theme.idx == Theme.THEME_OOSTUDIO and canvas.theme.port_bg_pixmap:
-            conn_pen.setCosmetic(True)
-            conn_pen.setWidthF(0.4)
-            painter.setPen(conn_pen)
-
-            if self.m_port_mode == PORT_MODE_INPUT:
-                connLineX = portRect.left()+1
-            else:
-                connLineX = portRect.right()-1
-            conn_path = QPainterPath()
-            conn_path.addRect(QRectF(connLineX-1, portRect.top(), 2, portRect.height()))
-            painter.fillPath(conn_path, conn_pen.brush())
-            painter.drawLine(QLineF(connLineX, portRect.top(), connLineX, portRect.bottom()))
-
+        painter.setRenderHint(QPainter.Antialiasing,
+                              bool(options.antialiasing == ANTIALIASING_FULL and
+                                   canvas.scene.getQualityTier() < QUALITY_NO_ANTIALIASING))
+        paintCanvasPort(painter, self, self.isSelected())
         painter.restore()
 
 # ------------------------------------------------------------------------------------------------------------
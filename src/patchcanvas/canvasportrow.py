@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+from PyQt5.QtCore import QPointF, QRectF
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom)
+
+from . import (
+    canvas,
+    CanvasPortType,
+    ACTION_PORTS_DISCONNECT,
+)
+
+from .canvasport import CanvasPort
+from .utils import CanvasGetPortConnectionList
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Lightweight port, painted by its CanvasBox instead of being a QGraphicsItem of its own.
+# It provides the same API as CanvasPort, a real CanvasPort item is only created on demand
+# (port under the cursor, selected or being dragged) and removed again once no longer needed.
+class CanvasPortRow(object):
+    __slots__ = [
+        'm_group_id',
+        'm_port_id',
+        'm_port_mode',
+        'm_port_type',
+        'm_port_name',
+        'm_is_alternate',
+        'm_port_width',
+        'm_port_height',
+        'm_port_font',
+        'm_x',
+        'm_y',
+        'm_visible',
+        'm_parent',
+        'm_item'
+    ]
+
+    def __init__(self, group_id, port_id, port_name, port_mode, port_type, is_alternate, parent):
+        self.m_group_id = group_id
+        self.m_port_id = port_id
+        self.m_port_mode = port_mode
+        self.m_port_type = port_type
+        self.m_port_name = port_name
+        self.m_is_alternate = is_alternate
+
+        self.m_port_width = 15
+        self.m_port_height = canvas.theme.port_height
+        self.m_port_font = parent.m_font_port
+
+        self.m_x = 0.0
+        self.m_y = 0.0
+        self.m_visible = True
+        self.m_parent = parent
+        self.m_item = None
+
+    def getGroupId(self):
+        return self.m_group_id
+
+    def getPortId(self):
+        return self.m_port_id
+
+    def getPortMode(self):
+        return self.m_port_mode
+
+    def getPortType(self):
+        return self.m_port_type
+
+    def getPortName(self):
+        return self.m_port_name
+
+    def getFullPortName(self):
+        return self.m_parent.getGroupName() + ":" + self.m_port_name
+
+    def getPortWidth(self):
+        return self.m_port_width
+
+    def getPortHeight(self):
+        return self.m_port_height
+
+    def getItem(self):
+        return self.m_item
+
+    def setPortMode(self, port_mode):
+        self.m_port_mode = port_mode
+        if self.m_item is not None:
+            self.m_item.setPortMode(port_mode)
+        self.update()
+
+    def setPortType(self, port_type):
+        self.m_port_type = port_type
+        if self.m_item is not None:
+            self.m_item.setPortType(port_type)
+        self.update()
+
+    def setPortName(self, port_name):
+        self.m_port_name = port_name
+        if self.m_item is not None:
+            self.m_item.setPortName(port_name)
+        self.update()
+
+    def setPortWidth(self, port_width):
+        if port_width < self.m_port_width:
+            canvas.scene.scheduleUpdate(self.sceneBoundingRect())
+
+        self.m_port_width = port_width
+        if self.m_item is not None:
+            self.m_item.setPortWidth(port_width)
+        self.update()
+
+    def type(self):
+        return CanvasPortType
+
+    # --------------------------------------------------------------------------------------------------------
+    # QGraphicsItem-like API, so lines and hit testing can use rows and items the same way
+
+    def parentItem(self):
+        return self.m_parent
+
+    def x(self):
+        return self.m_x
+
+    def y(self):
+        return self.m_y
+
+    def pos(self):
+        return QPointF(self.m_x, self.m_y)
+
+    def setX(self, x):
+        self.m_x = x
+        if self.m_item is not None:
+            self.m_item.setX(x)
+
+    def setY(self, y):
+        self.m_y = y
+        if self.m_item is not None:
+            self.m_item.setY(y)
+
+    def scenePos(self):
+        return self.m_parent.scenePos() + QPointF(self.m_x, self.m_y)
+
+    def boundingRect(self):
+        return QRectF(0, 0, self.m_port_width + 12, self.m_port_height)
+
+    def sceneBoundingRect(self):
+        return self.boundingRect().translated(self.scenePos())
+
+    def contains(self, pos):
+        return (self.m_x <= pos.x() < self.m_x + self.m_port_width + 12 and
+                self.m_y <= pos.y() < self.m_y + self.m_port_height)
+
+    def isVisible(self):
+        return self.m_visible and self.m_parent.isVisible()
+
+    def setVisible(self, yesno):
+        self.m_visible = yesno
+        if self.m_item is not None:
+            self.m_item.setVisible(yesno)
+        self.update()
+
+    def isSelected(self):
+        return self.m_item is not None and self.m_item.isSelected()
+
+    def setSelected(self, yesno):
+        if yesno:
+            self.createItem().setSelected(True)
+        elif self.m_item is not None:
+            self.m_item.setSelected(False)
+
+    def update(self):
+        self.m_parent.update(QRectF(self.m_x, self.m_y, self.m_port_width + 12, self.m_port_height))
+
+    def triggerDisconnect(self, conn_list=None):
+        if not conn_list:
+            conn_list = CanvasGetPortConnectionList(self.m_group_id, self.m_port_id)
+        for conn_id, group_id, port_id in conn_list:
+            canvas.callback(ACTION_PORTS_DISCONNECT, conn_id, 0, "")
+
+    # --------------------------------------------------------------------------------------------------------
+
+    def createItem(self):
+        if self.m_item is not None:
+            return self.m_item
+
+        item = CanvasPort(self.m_group_id, self.m_port_id, self.m_port_name, self.m_port_mode, self.m_port_type,
+                          self.m_is_alternate, self.m_parent)
+        item.m_row = self
+        item.setPos(self.m_x, self.m_y)
+        item.setPortWidth(self.m_port_width)
+        item.setVisible(self.m_visible)
+
+        self.m_item = item
+        return item
+
+    def removeItem(self):
+        if self.m_item is None:
+            return
+
+        item = self.m_item
+        self.m_item = None
+        item.m_row = None
+        canvas.scene.removeItem(item)
+        del item
+
+# ------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+from PyQt5.QtCore import pyqtSlot, qCritical, Qt, QAbstractTableModel, QModelIndex, QTimer
+from PyQt5.QtGui import QBrush
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom)
+
+from . import (
+    canvas,
+    ACTION_PORTS_CONNECT,
+    ACTION_PORTS_DISCONNECT,
+    PORT_MODE_INPUT,
+    PORT_MODE_OUTPUT,
+    PORT_TYPE_AUDIO_JACK,
+    PORT_TYPE_MIDI_ALSA,
+    PORT_TYPE_MIDI_JACK,
+    PORT_TYPE_PARAMETER,
+)
+
+from .utils import CanvasCallback
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Above this many inserted plus removed rows and columns a full model reset is cheaper than the diff
+MATRIX_MAX_DIFF = 256
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Table of output ports (rows) x input ports (columns) of a single port type, read straight from the canvas maps.
+# Structural changes are collected and applied on the next event loop iteration as row and column diffs,
+# connections only touch their own cell. Nothing is stored per cell, so views only ever ask for what they paint.
+class CanvasMatrixModel(QAbstractTableModel):
+    def __init__(self, port_type, parent=None):
+        QAbstractTableModel.__init__(self, parent)
+
+        self.m_port_type = port_type
+        self.m_rows = []
+        self.m_columns = []
+        self.m_row_index = {}
+        self.m_column_index = {}
+
+        self.m_flush_pending = False
+
+        if canvas.qobject is None:
+            qCritical("PatchCanvas::CanvasMatrixModel() - canvas not initiated")
+            return
+
+        canvas.qobject.portAdded.connect(self.slot_portsChanged)
+        canvas.qobject.portRemoved.connect(self.slot_portsChanged)
+        canvas.qobject.portRenamed.connect(self.slot_portRenamed)
+        canvas.qobject.groupRenamed.connect(self.slot_groupRenamed)
+        canvas.qobject.portsConnected.connect(self.slot_connectionChanged)
+        canvas.qobject.portsDisconnected.connect(self.slot_connectionChanged)
+
+        self.m_rows = self.getPortKeys(PORT_MODE_OUTPUT)
+        self.m_columns = self.getPortKeys(PORT_MODE_INPUT)
+        self.updateIndexes()
+
+    def getPortType(self):
+        return self.m_port_type
+
+    def setPortType(self, port_type):
+        if port_type == self.m_port_type:
+            return
+
+        self.beginResetModel()
+        self.m_port_type = port_type
+        self.m_rows = self.getPortKeys(PORT_MODE_OUTPUT)
+        self.m_columns = self.getPortKeys(PORT_MODE_INPUT)
+        self.updateIndexes()
+        self.endResetModel()
+
+    def getPortKeys(self, port_mode):
+        port_type = self.m_port_type
+        return sorted(key for key, port in canvas.port_map.items()
+                      if port.port_mode == port_mode and port.port_type == port_type)
+
+    def getPortName(self, key):
+        port = canvas.port_map.get(key, None)
+        if port is None:
+            return ""
+
+        group = canvas.group_map.get(key[0], None)
+        if group is None:
+            return port.port_name
+
+        return "%s:%s" % (group.group_name, port.port_name)
+
+    def getConnection(self, row, column):
+        in_key = self.m_columns[column]
+
+        for connection in canvas.port_connections.get(self.m_rows[row], ()):
+            if connection.group_in_id == in_key[0] and connection.port_in_id == in_key[1]:
+                return connection
+
+        return None
+
+    def toggleConnection(self, index):
+        if not index.isValid():
+            return
+
+        connection = self.getConnection(index.row(), index.column())
+
+        if connection is not None:
+            CanvasCallback(ACTION_PORTS_DISCONNECT, connection.connection_id, 0, "")
+        else:
+            out_key = self.m_rows[index.row()]
+            in_key = self.m_columns[index.column()]
+            CanvasCallback(ACTION_PORTS_CONNECT, 0, 0, "%i:%i:%i:%i" % (out_key + in_key))
+
+    def updateIndexes(self):
+        self.m_row_index = dict((key, i) for i, key in enumerate(self.m_rows))
+        self.m_column_index = dict((key, i) for i, key in enumerate(self.m_columns))
+
+    def applyDiff(self, keys, new_keys, begin_remove, end_remove, begin_insert, end_insert):
+        new_set = set(new_keys)
+        removed = [i for i, key in enumerate(keys) if key not in new_set]
+
+        # remove runs of consecutive keys, from the end so indexes stay valid
+        while len(removed) != 0:
+            last = removed.pop()
+            first = last
+            while len(removed) != 0 and removed[-1] == first - 1:
+                first = removed.pop()
+            begin_remove(QModelIndex(), first, last)
+            del keys[first:last+1]
+            end_remove()
+
+        # what is left is in the same order as new_keys, insert the missing runs where they belong
+        old_set = set(keys)
+        i = 0
+        count = len(new_keys)
+
+        while i < count:
+            if new_keys[i] in old_set:
+                i += 1
+                continue
+            first = i
+            while i < count and new_keys[i] not in old_set:
+                i += 1
+            begin_insert(QModelIndex(), first, i - 1)
+            keys[first:first] = new_keys[first:i]
+            end_insert()
+
+    def flush(self):
+        self.m_flush_pending = False
+
+        new_rows = self.getPortKeys(PORT_MODE_OUTPUT)
+        new_columns = self.getPortKeys(PORT_MODE_INPUT)
+
+        row_changes = len(set(self.m_rows).symmetric_difference(new_rows))
+        column_changes = len(set(self.m_columns).symmetric_difference(new_columns))
+
+        if row_changes == 0 and column_changes == 0:
+            return
+
+        if row_changes + column_changes > MATRIX_MAX_DIFF:
+            self.beginResetModel()
+            self.m_rows = new_rows
+            self.m_columns = new_columns
+            self.updateIndexes()
+            self.endResetModel()
+            return
+
+        if row_changes != 0:
+            self.applyDiff(self.m_rows, new_rows,
+                           self.beginRemoveRows, self.endRemoveRows, self.beginInsertRows, self.endInsertRows)
+        if column_changes != 0:
+            self.applyDiff(self.m_columns, new_columns,
+                           self.beginRemoveColumns, self.endRemoveColumns,
+                           self.beginInsertColumns, self.endInsertColumns)
+
+        self.updateIndexes()
+
+    @pyqtSlot(int, int)
+    def slot_portsChanged(self, group_id, port_id):
+        if self.m_flush_pending:
+            return
+
+        self.m_flush_pending = True
+        QTimer.singleShot(0, self.flush)
+
+    @pyqtSlot(int, int)
+    def slot_portRenamed(self, group_id, port_id):
+        key = (group_id, port_id)
+
+        row = self.m_row_index.get(key, -1)
+        if row >= 0:
+            self.headerDataChanged.emit(Qt.Vertical, row, row)
+
+        column = self.m_column_index.get(key, -1)
+        if column >= 0:
+            self.headerDataChanged.emit(Qt.Horizontal, column, column)
+
+    @pyqtSlot(int)
+    def slot_groupRenamed(self, group_id):
+        if len(self.m_rows) != 0:
+            self.headerDataChanged.emit(Qt.Vertical, 0, len(self.m_rows) - 1)
+        if len(self.m_columns) != 0:
+            self.headerDataChanged.emit(Qt.Horizontal, 0, len(self.m_columns) - 1)
+
+    @pyqtSlot(int, int, int, int)
+    def slot_connectionChanged(self, group_out_id, port_out_id, group_in_id, port_in_id):
+        row = self.m_row_index.get((group_out_id, port_out_id), -1)
+        column = self.m_column_index.get((group_in_id, port_in_id), -1)
+
+        if row < 0 or column < 0:
+            return
+
+        index = self.index(row, column)
+        self.dataChanged.emit(index, index, [Qt.BackgroundRole])
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.m_rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.m_columns)
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def data(self, index, role=Qt.DisplayRole):
+        if role == Qt.BackgroundRole:
+            if self.getConnection(index.row(), index.column()) is None:
+                return None
+
+            if self.m_port_type == PORT_TYPE_AUDIO_JACK:
+                return QBrush(canvas.theme.line_audio_jack_sel)
+            if self.m_port_type == PORT_TYPE_MIDI_JACK:
+                return QBrush(canvas.theme.line_midi_jack_sel)
+            if self.m_port_type == PORT_TYPE_MIDI_ALSA:
+                return QBrush(canvas.theme.line_midi_alsa_sel)
+            if self.m_port_type == PORT_TYPE_PARAMETER:
+                return QBrush(canvas.theme.line_parameter_sel)
+            return None
+
+        if role == Qt.ToolTipRole:
+            return "%s -> %s" % (self.getPortName(self.m_rows[index.row()]),
+                                 self.getPortName(self.m_columns[index.column()]))
+
+        return None
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+
+        if orientation == Qt.Vertical:
+            keys = self.m_rows
+        else:
+            keys = self.m_columns
+
+        if section < 0 or section >= len(keys):
+            return None
+
+        return self.getPortName(keys[section])
+
+# ------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+import json
+import os
+
+from hashlib import sha1
+
+from PyQt5.QtCore import pyqtSlot, qWarning, QObject, QPointF, QTimer
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom)
+
+from . import canvas, SPLIT_UNDEF, SPLIT_YES
+
+# ------------------------------------------------------------------------------------------------------------
+
+LAYOUT_FILE_VERSION = 1
+
+# Least recently used entries above these counts are dropped when the file is written
+LAYOUT_MAX_GROUPS  = 1000
+LAYOUT_MAX_LAYOUTS = 32
+
+# Changes are collected for this long before the file gets written
+LAYOUT_SYNC_DELAY = 2000
+
+# Group entry, a list so the file stays compact
+iLayoutSplit = 0
+iLayoutX1    = 1
+iLayoutY1    = 2
+iLayoutX2    = 3
+iLayoutY2    = 4
+iLayoutUsed  = 5
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Sorted group names hashed together, the same set of clients always gets the same layout
+def getLayoutSignature(group_names):
+    return sha1("\n".join(sorted(group_names)).encode("utf-8")).hexdigest()[:16]
+
+def newLayoutEntry(split, pos1, pos2, used):
+    entry = [SPLIT_UNDEF, 0, 0, 0, 0, 0]
+    entry[iLayoutSplit] = split
+    entry[iLayoutX1]    = int(pos1.x())
+    entry[iLayoutY1]    = int(pos1.y())
+    entry[iLayoutX2]    = int(pos2.x()) if pos2 is not None else 0
+    entry[iLayoutY2]    = int(pos2.y()) if pos2 is not None else 0
+    entry[iLayoutUsed]  = used
+    return entry
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Group positions and named layouts, kept in memory and written to a single JSON file in batches.
+# File format:
+#   {"version": 1, "clock": N,
+#    "groups":  {group_name: [split, x1, y1, x2, y2, used]},
+#    "layouts": {signature: {"used": N, "groups": {group_name: [split, x1, y1, x2, y2, used]}}}}
+# "used" is a counter bumped on every read or write of an entry, the lowest ones are the first to expire.
+class LayoutStore(QObject):
+    def __init__(self, filename, parent=None):
+        QObject.__init__(self, parent)
+
+        self.m_filename = filename
+        self.m_clock = 0
+        self.m_groups = {}
+        self.m_layouts = {}
+        self.m_dirty = False
+
+        self.m_sync_timer = QTimer(self)
+        self.m_sync_timer.setInterval(LAYOUT_SYNC_DELAY)
+        self.m_sync_timer.setSingleShot(True)
+        self.m_sync_timer.timeout.connect(self.sync)
+
+    def getFilename(self):
+        return self.m_filename
+
+    def tick(self):
+        self.m_clock += 1
+        return self.m_clock
+
+    def setDirty(self):
+        self.m_dirty = True
+
+        if not self.m_sync_timer.isActive():
+            self.m_sync_timer.start()
+
+    # --------------------------------------------------------------------------------------------------------
+
+    def load(self, settings=None):
+        if not os.path.exists(self.m_filename):
+            if settings is not None:
+                self.migrateSettings(settings)
+            return
+
+        try:
+            with open(self.m_filename, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+        except (IOError, ValueError) as e:
+            qWarning("PatchCanvas::LayoutStore::load() - failed to read \"%s\": %s" % (self.m_filename, e))
+            return
+
+        if data.get("version", 0) != LAYOUT_FILE_VERSION:
+            qWarning("PatchCanvas::LayoutStore::load() - unsupported version in \"%s\"" % self.m_filename)
+            return
+
+        self.m_clock = int(data.get("clock", 0))
+        self.m_groups = data.get("groups", {})
+        self.m_layouts = data.get("layouts", {})
+
+        if canvas.debug:
+            print("PatchCanvas::LayoutStore::load() - %i groups, %i layouts" % (len(self.m_groups),
+                                                                                   len(self.m_layouts)))
+
+    # positions stored by older versions, one QSettings key per group and box
+    def migrateSettings(self, settings):
+        settings.beginGroup("CanvasPositions")
+        keys = settings.childKeys()
+        settings.endGroup()
+
+        if len(keys) == 0:
+            return
+
+        for key in keys:
+            if not key.endswith("_SPLIT"):
+                continue
+
+            group_name = key[:-6]
+            split = settings.value("CanvasPositions/" + key, SPLIT_UNDEF, int)
+
+            if split == SPLIT_YES:
+                pos1 = settings.value("CanvasPositions/%s_OUTPUT" % group_name, QPointF(0, 0), QPointF)
+                pos2 = settings.value("CanvasPositions/%s_INPUT" % group_name, QPointF(0, 0), QPointF)
+            else:
+                pos1 = settings.value("CanvasPositions/" + group_name, QPointF(0, 0), QPointF)
+                pos2 = None
+
+            self.m_groups[group_name] = newLayoutEntry(split, pos1, pos2, self.tick())
+
+        if canvas.debug:
+            print("PatchCanvas::LayoutStore::migrateSettings() - %i groups" % len(self.m_groups))
+
+        self.m_dirty = True
+
+        # the old keys only go away once their replacement is safely on disk
+        if self.sync():
+            settings.remove("CanvasPositions")
+
+    def expire(self):
+        if len(self.m_groups) > LAYOUT_MAX_GROUPS:
+            names = sorted(self.m_groups, key=lambda name: self.m_groups[name][iLayoutUsed])
+            for name in names[:len(self.m_groups) - LAYOUT_MAX_GROUPS]:
+                del self.m_groups[name]
+
+        if len(self.m_layouts) > LAYOUT_MAX_LAYOUTS:
+            signatures = sorted(self.m_layouts, key=lambda signature: self.m_layouts[signature]["used"])
+            for signature in signatures[:len(self.m_layouts) - LAYOUT_MAX_LAYOUTS]:
+                del self.m_layouts[signature]
+
+    @pyqtSlot()
+    def sync(self):
+        self.m_sync_timer.stop()
+
+        if not self.m_dirty:
+            return True
+
+        self.expire()
+
+        data = {
+            "version": LAYOUT_FILE_VERSION,
+            "clock": self.m_clock,
+            "groups": self.m_groups,
+            "layouts": self.m_layouts,
+        }
+
+        # written next to the old file first, so a failed write never leaves a truncated one behind
+        tmp_filename = self.m_filename + ".tmp"
+
+        try:
+            dirname = os.path.dirname(self.m_filename)
+            if dirname and not os.path.exists(dirname):
+                os.makedirs(dirname)
+            with open(tmp_filename, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, separators=(",", ":"))
+            os.replace(tmp_filename, self.m_filename)
+        except (IOError, OSError) as e:
+            qWarning("PatchCanvas::LayoutStore::sync() - failed to write \"%s\": %s" % (self.m_filename, e))
+            return False
+
+        self.m_dirty = False
+        return True
+
+    # --------------------------------------------------------------------------------------------------------
+
+    def getGroup(self, group_name):
+        entry = self.m_groups.get(group_name, None)
+
+        if entry is not None:
+            # not worth a write on its own, goes along with the next one
+            entry[iLayoutUsed] = self.tick()
+            self.m_dirty = True
+
+        return entry
+
+    def setGroup(self, group_name, split, pos1, pos2=None):
+        self.m_groups[group_name] = newLayoutEntry(split, pos1, pos2, self.tick())
+        self.setDirty()
+
+    def getLayout(self, signature):
+        layout = self.m_layouts.get(signature, None)
+
+        if layout is None:
+            return None
+
+        layout["used"] = self.tick()
+        self.m_dirty = True
+        return layout["groups"]
+
+    # groups is a dict of group name -> (split, pos1, pos2)
+    def setLayout(self, signature, groups):
+        used = self.tick()
+        self.m_layouts[signature] = {
+            "used": used,
+            "groups": dict((group_name, newLayoutEntry(split, pos1, pos2, used))
+                           for group_name, (split, pos1, pos2) in groups.items()),
+        }
+        self.setDirty()
+
+# ------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+from PyQt5.QtCore import pyqtSlot, Qt, QMetaObject, QPointF, QRectF, QSize, QTimer
+from PyQt5.QtGui import QImage, QPainter
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom)
+
+from . import canvas
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Dirty regions are collected for this long before being rendered into the minimap
+MINIMAP_UPDATE_INTERVAL = 250
+
+# Dirty regions are tracked in tiles of this many minimap pixels, so scattered small changes do not add up to a
+# single huge rect
+MINIMAP_TILE_SIZE = 16
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Overview of the whole scene with the visible area marked, click or drag to move the view around.
+# The scene is rendered into a low resolution image when shown, after that only the regions reported as changed by
+# the scene get rendered again. Scene rect and widget size changes just rescale the existing image.
+# The scene 'changed' signal is only connected while shown, as views get slower item updates while it is connected.
+class CanvasMinimap(QWidget):
+    def __init__(self, scene, parent=None):
+        QWidget.__init__(self, parent)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMinimumSize(160, 120)
+
+        self.m_scene = scene
+        self.m_view = scene.getView()
+
+        self.m_image = QImage()
+        self.m_scene_rect = QRectF()
+        self.m_scale = 1.0
+        self.m_offset = QPointF(0, 0)
+        self.m_dirty_tiles = set()
+        self.m_full_render = True
+        self.m_ignore_changes = False
+        self.m_tracking_changes = False
+        self.m_detached_views = []
+        self.m_render_count = 0
+
+        self.m_update_timer = QTimer(self)
+        self.m_update_timer.setInterval(MINIMAP_UPDATE_INTERVAL)
+        self.m_update_timer.setSingleShot(True)
+        self.m_update_timer.timeout.connect(self.slot_renderDirty)
+
+        self.m_scene.sceneRectChanged.connect(self.slot_sceneRectChanged)
+        self.m_scene.scaleChanged.connect(self.update)
+        self.m_view.horizontalScrollBar().valueChanged.connect(self.update)
+        self.m_view.verticalScrollBar().valueChanged.connect(self.update)
+        self.m_view.horizontalScrollBar().rangeChanged.connect(self.update)
+        self.m_view.verticalScrollBar().rangeChanged.connect(self.update)
+
+    def getRenderCount(self):
+        return self.m_render_count
+
+    def sizeHint(self):
+        return QSize(240, 160)
+
+    # --------------------------------------------------------------------------------------------------------
+
+    def getImageSize(self):
+        ratio = self.devicePixelRatioF()
+        return QSize(max(1, int(self.width() * ratio)), max(1, int(self.height() * ratio)))
+
+    def updateMapping(self):
+        rect = self.m_scene_rect
+
+        if rect.isEmpty():
+            self.m_scale = 1.0
+            self.m_offset = QPointF(0, 0)
+            return
+
+        width = self.m_image.width()
+        height = self.m_image.height()
+
+        self.m_scale = min(width / rect.width(), height / rect.height())
+        self.m_offset = QPointF((width - rect.width() * self.m_scale) / 2 - rect.x() * self.m_scale,
+                                (height - rect.height() * self.m_scale) / 2 - rect.y() * self.m_scale)
+
+    def mapFromScene(self, rect):
+        scale = self.m_scale
+        return QRectF(rect.x() * scale + self.m_offset.x(),
+                      rect.y() * scale + self.m_offset.y(),
+                      rect.width() * scale, rect.height() * scale)
+
+    def mapRectToScene(self, rect):
+        scale = self.m_scale
+        return QRectF((rect.x() - self.m_offset.x()) / scale,
+                      (rect.y() - self.m_offset.y()) / scale,
+                      rect.width() / scale, rect.height() / scale)
+
+    def mapToScene(self, pos):
+        ratio = self.devicePixelRatioF()
+        return QPointF((pos.x() * ratio - self.m_offset.x()) / self.m_scale,
+                       (pos.y() * ratio - self.m_offset.y()) / self.m_scale)
+
+    def addDirtyRect(self, rect):
+        # grow by a couple of minimap pixels, so antialiased edges are not left behind
+        rect = self.mapFromScene(rect).adjusted(-2, -2, 2, 2).intersected(QRectF(self.m_image.rect()))
+
+        if rect.isEmpty():
+            return
+
+        tile = MINIMAP_TILE_SIZE
+
+        for ty in range(int(rect.top()) // tile, int(rect.bottom()) // tile + 1):
+            for tx in range(int(rect.left()) // tile, int(rect.right()) // tile + 1):
+                self.m_dirty_tiles.add((tx, ty))
+
+    def takeDirtyRects(self):
+        tile = MINIMAP_TILE_SIZE
+        rows = {}
+
+        for tx, ty in self.m_dirty_tiles:
+            rows.setdefault(ty, []).append(tx)
+
+        self.m_dirty_tiles = set()
+
+        # horizontal runs of tiles per row, runs with the same span in consecutive rows are then joined together
+        tile_rects = []
+        open_spans = {}
+
+        for ty in sorted(rows):
+            columns = sorted(rows[ty])
+            spans = []
+            first = last = columns[0]
+            for tx in columns[1:]:
+                if tx != last + 1:
+                    spans.append((first, last))
+                    first = tx
+                last = tx
+            spans.append((first, last))
+
+            next_spans = {}
+            for span in spans:
+                rows_span = open_spans.pop(span, None)
+                if rows_span is not None and rows_span[1] == ty - 1:
+                    next_spans[span] = (rows_span[0], ty)
+                else:
+                    if rows_span is not None:
+                        tile_rects.append((span, rows_span))
+                    next_spans[span] = (ty, ty)
+
+            tile_rects += open_spans.items()
+            open_spans = next_spans
+
+        tile_rects += open_spans.items()
+
+        image_rect = QRectF(self.m_image.rect())
+        rects = []
+
+        for (first, last), (first_row, last_row) in tile_rects:
+            rect = QRectF(first * tile, first_row * tile, (last - first + 1) * tile, (last_row - first_row + 1) * tile)
+            rects.append(self.mapRectToScene(rect.intersected(image_rect)))
+
+        return rects
+
+    def resizeImage(self, size, scene_rect):
+        dirty_rects = self.takeDirtyRects() if len(self.m_dirty_tiles) != 0 else ()
+
+        old_image = self.m_image
+        old_rect = self.mapFromScene(self.m_scene_rect)
+        old_scene_rect = self.m_scene_rect
+
+        self.m_image = QImage(size, QImage.Format_ARGB32_Premultiplied)
+        self.m_image.fill(canvas.theme.canvas_bg if canvas.theme else Qt.black)
+        self.m_scene_rect = QRectF(scene_rect)
+        self.updateMapping()
+
+        if old_image.isNull() or old_scene_rect.isEmpty():
+            return
+
+        painter = QPainter(self.m_image)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+        painter.drawImage(self.mapFromScene(old_scene_rect), old_image, old_rect)
+        painter.end()
+
+        for rect in dirty_rects:
+            self.addDirtyRect(rect)
+
+    def renderScene(self, source):
+        target = self.mapFromScene(source)
+
+        painter = QPainter(self.m_image)
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setRenderHint(QPainter.SmoothPixmapTransform, True)
+        painter.setClipRect(target)
+        painter.fillRect(target, canvas.theme.canvas_bg if canvas.theme else Qt.black)
+        self.m_scene.render(painter, target, source, Qt.IgnoreAspectRatio)
+        painter.end()
+
+        self.m_render_count += 1
+
+    # --------------------------------------------------------------------------------------------------------
+
+    # items changed before 'changed' got connected are all reported on the first emit after it, the full render
+    # done from here on is going to include them anyway
+    @pyqtSlot()
+    def slot_acceptChanges(self):
+        if not self.m_tracking_changes:
+            return
+
+        self.m_ignore_changes = False
+        self.m_full_render = True
+        self.update()
+
+    @pyqtSlot('QList<QRectF>')
+    def slot_sceneChanged(self, regions):
+        if self.m_full_render or self.m_ignore_changes:
+            return
+
+        for rect in regions:
+            self.addDirtyRect(rect)
+
+        if len(self.m_dirty_tiles) != 0 and not self.m_update_timer.isActive():
+            self.m_update_timer.start()
+
+    @pyqtSlot(QRectF)
+    def slot_sceneRectChanged(self, rect):
+        if self.m_image.isNull() or self.m_full_render:
+            return
+
+        self.resizeImage(self.m_image.size(), rect)
+        self.update()
+
+    @pyqtSlot()
+    def slot_renderDirty(self):
+        if self.m_full_render or len(self.m_dirty_tiles) == 0:
+            return
+
+        for rect in self.takeDirtyRects():
+            self.renderScene(rect)
+
+        self.update()
+
+    # --------------------------------------------------------------------------------------------------------
+
+    def showEvent(self, event):
+        QWidget.showEvent(self, event)
+
+        if self.m_tracking_changes:
+            return
+
+        self.m_tracking_changes = True
+        self.m_ignore_changes = True
+        self.m_scene.changed.connect(self.slot_sceneChanged)
+
+        for view in self.m_detached_views:
+            self.m_scene.changed.connect(view.updateScene)
+        self.m_detached_views = []
+
+        QMetaObject.invokeMethod(self, "slot_acceptChanges", Qt.QueuedConnection)
+
+    def hideEvent(self, event):
+        QWidget.hideEvent(self, event)
+
+        if not self.m_tracking_changes:
+            return
+
+        # nothing is tracked while hidden, the image gets rendered again in full once shown
+        self.m_tracking_changes = False
+        self.m_scene.changed.disconnect(self.slot_sceneChanged)
+
+        # the views get connected to 'changed' the first time it is used and stay connected for good,
+        # take them off too so item updates go straight to the views again
+        for view in self.m_scene.views():
+            try:
+                self.m_scene.changed.disconnect(view.updateScene)
+            except TypeError:
+                continue
+            self.m_detached_views.append(view)
+
+        self.m_update_timer.stop()
+        self.m_dirty_tiles = set()
+        self.m_full_render = True
+
+    def resizeEvent(self, event):
+        QWidget.resizeEvent(self, event)
+
+        if self.m_image.isNull() or self.m_full_render:
+            return
+
+        self.resizeImage(self.getImageSize(), self.m_scene_rect)
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self.centerViewOn(event.pos())
+            return
+
+        QWidget.mousePressEvent(self, event)
+
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.LeftButton:
+            self.centerViewOn(event.pos())
+            return
+
+        QWidget.mouseMoveEvent(self, event)
+
+    def centerViewOn(self, pos):
+        if self.m_image.isNull():
+            return
+
+        self.m_view.centerOn(self.mapToScene(pos))
+
+    def paintEvent(self, event):
+        # the only full render, done after being shown and once the widget has its final size
+        if self.m_full_render and not self.m_ignore_changes:
+            self.m_full_render = False
+            self.m_dirty_tiles = set()
+            self.m_image = QImage(self.getImageSize(), QImage.Format_ARGB32_Premultiplied)
+            self.m_image.fill(canvas.theme.canvas_bg if canvas.theme else Qt.black)
+            self.m_scene_rect = self.m_scene.sceneRect()
+            self.updateMapping()
+            self.renderScene(self.m_scene_rect)
+
+        painter = QPainter(self)
+
+        # still waiting for the full render
+        if self.m_image.isNull():
+            painter.fillRect(self.rect(), canvas.theme.canvas_bg if canvas.theme else Qt.black)
+            return
+
+        ratio = self.devicePixelRatioF()
+        painter.drawImage(QRectF(0, 0, self.m_image.width() / ratio, self.m_image.height() / ratio), self.m_image)
+
+        viewRect = self.m_view.mapToScene(self.m_view.viewport().rect()).boundingRect()
+        viewRect = self.mapFromScene(viewRect)
+        viewRect = QRectF(viewRect.x() / ratio, viewRect.y() / ratio, viewRect.width() / ratio, viewRect.height() / ratio)
+
+        if canvas.theme:
+            painter.setPen(canvas.theme.rubberband_pen)
+            painter.setBrush(canvas.theme.rubberband_brush)
+
+        painter.drawRect(viewRect)
+
+# ------------------------------------------------------------------------------------------------------------
@@ -19,8 +19,10 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-from PyQt5.QtCore import pyqtSlot, qCritical, qFatal, qWarning, QObject
-from PyQt5.QtCore import QPointF, QRectF, QTimer
+import os
+
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, qCritical, qFatal, qWarning, QObject
+from PyQt5.QtCore import QPointF, QRectF
 from PyQt5.QtWidgets import QGraphicsObject
 
 # ------------------------------------------------------------------------------------------------------------
@@ -40,13 +42,16 @@ from . import (
     port_type2str,
     CanvasIconType,
     CanvasRubberbandType,
+    ACTION_PORTS_CONNECT,
     ACTION_PORTS_DISCONNECT,
     EYECANDY_FULL,
     ICON_APPLICATION,
     ICON_HARDWARE,
     ICON_LADISH_ROOM,
+    PORT_MODE_NULL,
     PORT_MODE_INPUT,
     PORT_MODE_OUTPUT,
+    PORT_TYPE_NULL,
     SPLIT_YES,
     SPLIT_NO,
     SPLIT_UNDEF,
@@ -55,9 +60,20 @@ from . import (
 
 from .canvasbox import CanvasBox
 from .canvasbezierline import CanvasBezierLine
+from .canvasfadeanimation import CanvasFadeAnimation
 from .canvasline import CanvasLine
+from .connectionmatrix import CanvasMatrixModel
+from .layoutstore import LayoutStore, getLayoutSignature, iLayoutSplit, iLayoutX1, iLayoutY1, iLayoutX2, iLayoutY2
+from .minimap import CanvasMinimap
 from .theme import Theme, getDefaultTheme, getThemeName
-from .utils import CanvasCallback, CanvasGetNewGroupPos, CanvasItemFX, CanvasRemoveItemFX
+from .utils import (
+    CanvasCallback,
+    CanvasGetNewGroupPos,
+    CanvasGetPortConnectionList,
+    CanvasItemFX,
+    CanvasRaiseBox,
+    CanvasRemoveItemFX,
+)
 
 # FIXME
 from . import *
@@ -68,40 +84,30 @@ from shared import QSafeSettings
 # ------------------------------------------------------------------------------------------------------------
 
 class CanvasObject(QObject):
+    # emitted after the canvas maps have been updated, for views of the same data (like the connection matrix)
+    portAdded = pyqtSignal(int, int)
+    portRemoved = pyqtSignal(int, int)
+    portRenamed = pyqtSignal(int, int)
+    groupRenamed = pyqtSignal(int)
+    portsConnected = pyqtSignal(int, int, int, int)
+    portsDisconnected = pyqtSignal(int, int, int, int)
+
     def __init__(self, parent=None):
         QObject.__init__(self, parent)
 
-    @pyqtSlot()
-    def AnimationFinishedShow(self):
-        animation = self.sender()
-        if animation:
-            animation.forceStop()
-            canvas.animation_list.remove(animation)
-
-    @pyqtSlot()
-    def AnimationFinishedHide(self):
-        animation = self.sender()
-        if animation:
-            animation.forceStop()
-            canvas.animation_list.remove(animation)
-            item = animation.item()
-            if item:
-                if isinstance(item, QGraphicsObject):
-                    item.blockSignals(True)
-                    item.hide()
-                    item.blockSignals(False)
-                else:
-                    item.hide()
+    @pyqtSlot(object, bool, bool)
+    def AnimationFinished(self, item, show, destroy):
+        if show:
+            return
 
-    @pyqtSlot()
-    def AnimationFinishedDestroy(self):
-        animation = self.sender()
-        if animation:
-            animation.forceStop()
-            canvas.animation_list.remove(animation)
-            item = animation.item()
-            if item:
-                CanvasRemoveItemFX(item)
+        if destroy:
+            CanvasRemoveItemFX(item)
+        elif isinstance(item, QGraphicsObject):
+            item.blockSignals(True)
+            item.hide()
+            item.blockSignals(False)
+        else:
+            item.hide()
 
     @pyqtSlot()
     def PortContextMenuConnect(self):
@@ -176,18 +182,26 @@ class CanvasObject(QObject):
 
 # ------------------------------------------------------------------------------------------------------------
 
-def getStoredCanvasPosition(key, fallback_pos):
-    try:
-        return canvas.settings.value("CanvasPositions/" + key, fallback_pos, type=QPointF)
-    except:
-        return fallback_pos
+# stored position of one of the group boxes, or None if there is none for the given split mode
+def getStoredCanvasPosition(group_name, split, port_mode):
+    entry = canvas.layout_store.getGroup(group_name)
+
+    if entry is None or bool(entry[iLayoutSplit] == SPLIT_YES) != split:
+        return None
+
+    if split and port_mode == PORT_MODE_INPUT:
+        return QPointF(entry[iLayoutX2], entry[iLayoutY2])
+
+    return QPointF(entry[iLayoutX1], entry[iLayoutY1])
 
 def getStoredCanvasSplit(group_name, fallback_split_mode):
-    try:
-        return canvas.settings.value("CanvasPositions/%s_SPLIT" % group_name, fallback_split_mode, type=int)
-    except:
+    entry = canvas.layout_store.getGroup(group_name)
+
+    if entry is None or entry[iLayoutSplit] == SPLIT_UNDEF:
         return fallback_split_mode
 
+    return entry[iLayoutSplit]
+
 # ------------------------------------------------------------------------------------------------------------
 
 def init(appName, scene, callback, debug=False):
@@ -207,14 +221,22 @@ def init(appName, scene, callback, debug=False):
     canvas.scene = scene
 
     canvas.last_z_value = 0
+    canvas.focused_box = None
     canvas.last_connection_id = 0
     canvas.initial_pos = QPointF(0, 0)
     canvas.size_rect = QRectF()
 
     if not canvas.qobject:
         canvas.qobject = CanvasObject()
+    if not canvas.fade_animation:
+        canvas.fade_animation = CanvasFadeAnimation(canvas.qobject)
+        canvas.fade_animation.itemFinished.connect(canvas.qobject.AnimationFinished)
     if not canvas.settings:
         canvas.settings = QSafeSettings("falkTX", appName)
+    if not canvas.layout_store:
+        canvas.layout_store = LayoutStore(os.path.splitext(canvas.settings.fileName())[0] + "-layout.json",
+                                          canvas.qobject)
+        canvas.layout_store.load(canvas.settings)
 
     if canvas.theme:
         del canvas.theme
@@ -250,6 +272,9 @@ def clear():
         )
         group_list_ids.append(group.group_id)
 
+    if features.handle_group_pos and len(group_list_ids) != 0:
+        saveLayout()
+
     for port in canvas.port_list:
         port_list_ids.append((port.group_id, port.port_id))
 
@@ -265,31 +290,38 @@ def clear():
     for idx in group_list_ids:
         removeGroup(idx)
 
+    # everything removed above goes to disk in one write
+    if canvas.layout_store:
+        canvas.layout_store.sync()
+
     canvas.last_z_value = 0
+    canvas.focused_box = None
     canvas.last_connection_id = 0
 
     canvas.group_list = []
     canvas.port_list = []
     canvas.connection_list = []
+    canvas.group_map = {}
+    canvas.port_map = {}
+    canvas.group_ports = {}
+    canvas.connection_map = {}
+    canvas.port_connections = {}
     canvas.group_plugin_map = {}
     canvas.old_group_pos = group_pos
+    canvas.spatial_index.clear()
+    canvas.search_index.clear()
 
     canvas.scene.clearSelection()
-
-    animatedItems = []
-    for animation in canvas.animation_list:
-        animatedItems.append(animation.item())
+    canvas.scene.scheduleUpdate(canvas.scene.itemsBoundingRect())
 
     for item in canvas.scene.items():
-        if item.type() in (CanvasIconType, CanvasRubberbandType) or item in animatedItems:
+        if item.type() in (CanvasIconType, CanvasRubberbandType) or canvas.fade_animation.isAnimating(item):
             continue
         canvas.scene.removeItem(item)
         del item
 
     canvas.initiated = False
 
-    QTimer.singleShot(0, canvas.scene.update)
-
 # ------------------------------------------------------------------------------------------------------------
 
 def setInitialPos(x, y):
@@ -310,16 +342,35 @@ def setCanvasSize(x, y, width, height):
     canvas.scene.updateLimits()
     canvas.scene.fixScaleFactor()
 
+def beginBulkUpdate():
+    if canvas.debug:
+        print("PatchCanvas::beginBulkUpdate()")
+
+    canvas.scene.beginBulkUpdate()
+
+def endBulkUpdate():
+    if canvas.debug:
+        print("PatchCanvas::endBulkUpdate()")
+
+    canvas.scene.endBulkUpdate()
+
+def setStale(stale):
+    if canvas.debug:
+        print("PatchCanvas::setStale(%s)" % bool2str(stale))
+
+    canvas.scene.setStale(stale)
+
+# ------------------------------------------------------------------------------------------------------------
+
 def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon=ICON_APPLICATION):
     if canvas.debug:
         print("PatchCanvas::addGroup(%i, %s, %s, %s)" % (
               group_id, group_name.encode(), split2str(split), icon2str(icon)))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            qWarning("PatchCanvas::addGroup(%i, %s, %s, %s) - group already exists" % (
-                     group_id, group_name.encode(), split2str(split), icon2str(icon)))
-            return None
+    if group_id in canvas.group_map:
+        qWarning("PatchCanvas::addGroup(%i, %s, %s, %s) - group already exists" % (
+                 group_id, group_name.encode(), split2str(split), icon2str(icon)))
+        return None
 
     old_matching_group = canvas.old_group_pos.pop(group_name, None)
 
@@ -351,7 +402,8 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon=ICON_APPLICATION):
         group_box.setSplit(True, PORT_MODE_OUTPUT)
 
         if features.handle_group_pos:
-            group_box.setPos(getStoredCanvasPosition(group_name + "_OUTPUT", CanvasGetNewGroupPos(False)))
+            pos = getStoredCanvasPosition(group_name, True, PORT_MODE_OUTPUT)
+            group_box.setPos(pos if pos is not None else CanvasGetNewGroupPos(False))
         elif old_matching_group is not None:
             group_box.setPos(old_matching_group[1])
         else:
@@ -365,14 +417,14 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon=ICON_APPLICATION):
         group_dict.widgets[1] = group_sbox
 
         if features.handle_group_pos:
-            group_sbox.setPos(getStoredCanvasPosition(group_name + "_INPUT", CanvasGetNewGroupPos(True)))
+            pos = getStoredCanvasPosition(group_name, True, PORT_MODE_INPUT)
+            group_sbox.setPos(pos if pos is not None else CanvasGetNewGroupPos(True))
         elif old_matching_group is not None and old_matching_group[0]:
             group_sbox.setPos(old_matching_group[2])
         else:
             group_sbox.setPos(group_box.x() + group_box.boundingRect().width() + 300, group_box.y())
 
-        canvas.last_z_value += 1
-        group_sbox.setZValue(canvas.last_z_value)
+        CanvasRaiseBox(group_sbox)
 
         if options.eyecandy == EYECANDY_FULL and not options.auto_hide_groups:
             CanvasItemFX(group_sbox, True, False)
@@ -384,7 +436,8 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon=ICON_APPLICATION):
         group_box.setSplit(False)
 
         if features.handle_group_pos:
-            group_box.setPos(getStoredCanvasPosition(group_name, CanvasGetNewGroupPos(False)))
+            pos = getStoredCanvasPosition(group_name, False, PORT_MODE_OUTPUT)
+            group_box.setPos(pos if pos is not None else CanvasGetNewGroupPos(False))
         elif old_matching_group is not None:
             group_box.setPos(old_matching_group[1])
         else:
@@ -392,18 +445,20 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon=ICON_APPLICATION):
             horizontal = bool(icon == ICON_HARDWARE or icon == ICON_LADISH_ROOM)
             group_box.setPos(CanvasGetNewGroupPos(horizontal))
 
-    canvas.last_z_value += 1
-    group_box.setZValue(canvas.last_z_value)
+    CanvasRaiseBox(group_box)
 
     group_box.checkItemPos()
     group_box.blockSignals(False)
 
     canvas.group_list.append(group_dict)
+    canvas.group_map[group_id] = group_dict
+    canvas.group_ports[group_id] = []
+    canvas.search_index.add((group_id, -1), group_name)
 
     if options.eyecandy == EYECANDY_FULL and not options.auto_hide_groups:
         CanvasItemFX(group_box, True, False)
     else:
-        QTimer.singleShot(0, canvas.scene.update)
+        canvas.scene.scheduleUpdate(group_box.sceneBoundingRect())
 
     return group_dict
 
@@ -420,9 +475,10 @@ def removeGroup(group_id):
                 s_item = group.widgets[1]
 
                 if features.handle_group_pos:
-                    canvas.settings.setValue("CanvasPositions/%s_OUTPUT" % group_name, item.pos())
-                    canvas.settings.setValue("CanvasPositions/%s_INPUT" % group_name, s_item.pos())
-                    canvas.settings.setValue("CanvasPositions/%s_SPLIT" % group_name, SPLIT_YES)
+                    canvas.layout_store.setGroup(group_name, SPLIT_YES, item.pos(), s_item.pos())
+
+                canvas.scene.scheduleUpdate(s_item.sceneBoundingRect())
+                canvas.spatial_index.remove(s_item)
 
                 if options.eyecandy == EYECANDY_FULL:
                     CanvasItemFX(s_item, False, True)
@@ -433,8 +489,13 @@ def removeGroup(group_id):
 
             else:
                 if features.handle_group_pos:
-                    canvas.settings.setValue("CanvasPositions/%s" % group_name, item.pos())
-                    canvas.settings.setValue("CanvasPositions/%s_SPLIT" % group_name, SPLIT_NO)
+                    canvas.layout_store.setGroup(group_name, SPLIT_NO, item.pos())
+
+            canvas.scene.scheduleUpdate(item.sceneBoundingRect())
+            canvas.spatial_index.remove(item)
+
+            if canvas.focused_box in group.widgets:
+                canvas.focused_box = None
 
             if options.eyecandy == EYECANDY_FULL:
                 CanvasItemFX(item, False, True)
@@ -444,9 +505,10 @@ def removeGroup(group_id):
                 del item
 
             canvas.group_list.remove(group)
+            canvas.group_map.pop(group_id, None)
+            canvas.search_index.remove((group_id, -1))
+            canvas.group_ports.pop(group_id, None)
             canvas.group_plugin_map.pop(group.plugin_id, None)
-
-            QTimer.singleShot(0, canvas.scene.update)
             return
 
     qCritical("PatchCanvas::removeGroup(%i) - unable to find group to remove" % group_id)
@@ -463,7 +525,14 @@ def renameGroup(group_id, new_group_name):
             if group.split and group.widgets[1]:
                 group.widgets[1].setGroupName(new_group_name)
 
-            QTimer.singleShot(0, canvas.scene.update)
+            for box in group.widgets:
+                if box is not None:
+                    canvas.scene.scheduleUpdate(box.sceneBoundingRect())
+
+            canvas.search_index.rename((group_id, -1), new_group_name)
+            for port in canvas.group_ports.get(group_id, ()):
+                canvas.search_index.rename((group_id, port.port_id), new_group_name + ":" + port.port_name)
+            canvas.qobject.groupRenamed.emit(group_id)
             return
 
     qCritical("PatchCanvas::renameGroup(%i, %s) - unable to find group to rename" % (group_id, new_group_name.encode()))
@@ -513,7 +582,7 @@ def splitGroup(group_id):
             port_dict.port_type = port.port_type
             port_dict.is_alternate = port.is_alternate
             port_dict.widget = None
-            ports_data.append(port_dict)
+            ports_data.append((port_dict, canvas.search_index.getAliases((port.group_id, port.port_id))))
 
     for connection in canvas.connection_list:
         if connection.port_out_id in port_list_ids or connection.port_in_id in port_list_ids:
@@ -541,8 +610,10 @@ def splitGroup(group_id):
     if plugin_id >= 0:
         setGroupAsPlugin(group_id, plugin_id, plugin_ui, plugin_inline)
 
-    for port in ports_data:
+    for port, aliases in ports_data:
         addPort(group_id, port.port_id, port.port_name, port.port_mode, port.port_type, port.is_alternate)
+        if len(aliases) != 0:
+            canvas.search_index.setAliases((group_id, port.port_id), aliases)
 
     for conn in conns_data:
         connectPorts(conn.connection_id, conn.group_out_id, conn.port_out_id, conn.group_in_id, conn.port_in_id)
@@ -553,8 +624,6 @@ def splitGroup(group_id):
         valueStr = "%i:%i:%i:%i" % (pos1.x(), pos1.y(), pos2.x(), pos2.y())
         CanvasCallback(ACTION_GROUP_POSITION, group_id, 0, valueStr)
 
-    QTimer.singleShot(0, canvas.scene.update)
-
 def joinGroup(group_id):
     if canvas.debug:
         print("PatchCanvas::joinGroup(%i)" % group_id)
@@ -608,7 +677,7 @@ def joinGroup(group_id):
             port_dict.port_type = port.port_type
             port_dict.is_alternate = port.is_alternate
             port_dict.widget = None
-            ports_data.append(port_dict)
+            ports_data.append((port_dict, canvas.search_index.getAliases((port.group_id, port.port_id))))
 
     for connection in canvas.connection_list:
         if connection.port_out_id in port_list_ids or connection.port_in_id in port_list_ids:
@@ -636,8 +705,10 @@ def joinGroup(group_id):
     if plugin_id >= 0:
         setGroupAsPlugin(group_id, plugin_id, plugin_ui, plugin_inline)
 
-    for port in ports_data:
+    for port, aliases in ports_data:
         addPort(group_id, port.port_id, port.port_name, port.port_mode, port.port_type, port.is_alternate)
+        if len(aliases) != 0:
+            canvas.search_index.setAliases((group_id, port.port_id), aliases)
 
     for conn in conns_data:
         connectPorts(conn.connection_id, conn.group_out_id, conn.port_out_id, conn.group_in_id, conn.port_in_id)
@@ -647,8 +718,6 @@ def joinGroup(group_id):
         valueStr = "%i:%i:%i:%i" % (pos.x(), pos.y(), 0, 0)
         CanvasCallback(ACTION_GROUP_POSITION, group_id, 0, valueStr)
 
-    QTimer.singleShot(0, canvas.scene.update)
-
 # ------------------------------------------------------------------------------------------------------------
 
 def getGroupPos(group_id, port_mode=PORT_MODE_OUTPUT):
@@ -662,6 +731,18 @@ def getGroupPos(group_id, port_mode=PORT_MODE_OUTPUT):
     qCritical("PatchCanvas::getGroupPos(%i, %s) - unable to find group" % (group_id, port_mode2str(port_mode)))
     return QPointF(0, 0)
 
+def isGroupSplit(group_id):
+    if canvas.debug:
+        print("PatchCanvas::isGroupSplit(%i)" % group_id)
+
+    group = canvas.group_map.get(group_id, None)
+
+    if group is None:
+        qCritical("PatchCanvas::isGroupSplit(%i) - unable to find group" % group_id)
+        return False
+
+    return group.split
+
 def saveGroupPositions():
     if canvas.debug:
         print("PatchCanvas::getGroupPositions()")
@@ -712,6 +793,58 @@ def restoreGroupPositions(dataList):
             group.widgets[1].setPos(data['pos2x'], data['pos2y'])
             group.widgets[1].blockSignals(False)
 
+def saveLayout():
+    if canvas.debug:
+        print("PatchCanvas::saveLayout()")
+
+    groups = {}
+
+    for group in canvas.group_list:
+        groups[group.group_name] = (
+            SPLIT_YES if group.split else SPLIT_NO,
+            group.widgets[0].pos(),
+            group.widgets[1].pos() if group.split else None,
+        )
+
+    canvas.layout_store.setLayout(getLayoutSignature(groups.keys()), groups)
+
+# positions saved for exactly the current set of groups, groups in skip_group_names are left as they are
+def restoreLayout(skip_group_names=()):
+    if canvas.debug:
+        print("PatchCanvas::restoreLayout()")
+
+    layout = canvas.layout_store.getLayout(getLayoutSignature(group.group_name for group in canvas.group_list))
+
+    if layout is None:
+        return False
+
+    for group in tuple(canvas.group_list):
+        if group.group_name in skip_group_names:
+            continue
+
+        entry = layout.get(group.group_name, None)
+        if entry is None:
+            continue
+
+        split = bool(entry[iLayoutSplit] == SPLIT_YES)
+
+        if split != group.split:
+            if split:
+                splitGroup(group.group_id)
+            else:
+                joinGroup(group.group_id)
+
+        setGroupPosFull(group.group_id, entry[iLayoutX1], entry[iLayoutY1], entry[iLayoutX2], entry[iLayoutY2])
+
+        # split and join reported the position from before, and setGroupPosFull reports none
+        group = canvas.group_map[group.group_id]
+        pos1 = group.widgets[0].pos()
+        pos2 = group.widgets[1].pos() if group.split and group.widgets[1] else QPointF(0, 0)
+        valueStr = "%i:%i:%i:%i" % (pos1.x(), pos1.y(), pos2.x(), pos2.y())
+        CanvasCallback(ACTION_GROUP_POSITION, group.group_id, 0, valueStr)
+
+    return True
+
 def setGroupPos(group_id, group_pos_x, group_pos_y):
     setGroupPosFull(group_id, group_pos_x, group_pos_y, group_pos_x, group_pos_y)
 
@@ -733,7 +866,9 @@ def setGroupPosFull(group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group
                 group.widgets[1].checkItemPos()
                 group.widgets[1].blockSignals(False)
 
-            QTimer.singleShot(0, canvas.scene.update)
+            for box in group.widgets:
+                if box is not None:
+                    canvas.scene.scheduleUpdate(box.sceneBoundingRect())
             return
 
     qCritical("PatchCanvas::setGroupPos(%i, %i, %i, %i, %i) - unable to find group to reposition" % (
@@ -753,7 +888,9 @@ def setGroupIcon(group_id, icon):
             if group.split and group.widgets[1]:
                 group.widgets[1].setIcon(icon)
 
-            QTimer.singleShot(0, canvas.scene.update)
+            for box in group.widgets:
+                if box is not None:
+                    canvas.scene.scheduleUpdate(box.sceneBoundingRect())
             return
 
     qCritical("PatchCanvas::setGroupIcon(%i, %s) - unable to find group to change icon" % (group_id, icon2str(icon)))
@@ -808,6 +945,22 @@ def focusGroupUsingGroupName(group_name):
             item.setSelected(True)
             return True
 
+def focusGroup(group_id):
+    if canvas.debug:
+        print("PatchCanvas::focusGroup(%i)" % group_id)
+
+    group = canvas.group_map.get(group_id, None)
+
+    if group is None:
+        qCritical("PatchCanvas::focusGroup(%i) - unable to find group" % group_id)
+        return False
+
+    item = group.widgets[0]
+    canvas.scene.clearSelection()
+    canvas.scene.getView().centerOn(item)
+    item.setSelected(True)
+    return True
+
 # ------------------------------------------------------------------------------------------------------------
 
 def addPort(group_id, port_id, port_name, port_mode, port_type, is_alternate=False):
@@ -816,24 +969,23 @@ def addPort(group_id, port_id, port_name, port_mode, port_type, is_alternate=Fal
               group_id, port_id, port_name.encode(),
               port_mode2str(port_mode), port_type2str(port_type), bool2str(is_alternate)))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            qWarning("PatchCanvas::addPort(%i, %i, %s, %s, %s) - port already exists" % (
-                     group_id, port_id, port_name.encode(), port_mode2str(port_mode), port_type2str(port_type)))
-            return
+    if (group_id, port_id) in canvas.port_map:
+        qWarning("PatchCanvas::addPort(%i, %i, %s, %s, %s) - port already exists" % (
+                 group_id, port_id, port_name.encode(), port_mode2str(port_mode), port_type2str(port_type)))
+        return
 
     box_widget = None
     port_widget = None
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            if group.split and group.widgets[0].getSplittedMode() != port_mode and group.widgets[1]:
-                n = 1
-            else:
-                n = 0
-            box_widget = group.widgets[n]
-            port_widget = box_widget.addPortFromGroup(port_id, port_mode, port_type, port_name, is_alternate)
-            break
+    group = canvas.group_map.get(group_id, None)
+
+    if group is not None:
+        if group.split and group.widgets[0].getSplittedMode() != port_mode and group.widgets[1]:
+            n = 1
+        else:
+            n = 0
+        box_widget = group.widgets[n]
+        port_widget = box_widget.addPortFromGroup(port_id, port_mode, port_type, port_name, is_alternate)
 
     if not (box_widget and port_widget):
         qCritical("PatchCanvas::addPort(%i, %i, %s, %s, %s) - Unable to find parent group" % (
@@ -849,29 +1001,45 @@ def addPort(group_id, port_id, port_name, port_mode, port_type, is_alternate=Fal
     port_dict.is_alternate = is_alternate
     port_dict.widget = port_widget
     canvas.port_list.append(port_dict)
+    canvas.port_map[(group_id, port_id)] = port_dict
+    canvas.group_ports[group_id].append(port_dict)
+    canvas.search_index.add((group_id, port_id), group.group_name + ":" + port_name)
+    canvas.qobject.portAdded.emit(group_id, port_id)
 
     box_widget.updatePositions()
 
-    if options.eyecandy == EYECANDY_FULL:
+    if port_type in canvas.hidden_port_types:
+        return
+
+    if options.eyecandy == EYECANDY_FULL and not options.lightweight_ports:
         CanvasItemFX(port_widget, True, False)
         return
 
-    QTimer.singleShot(0, canvas.scene.update)
+    canvas.scene.scheduleUpdate(box_widget.sceneBoundingRect())
 
 def removePort(group_id, port_id):
     if canvas.debug:
         print("PatchCanvas::removePort(%i, %i)" % (group_id, port_id))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            item = port.widget
-            item.parentItem().removePortFromGroup(port_id)
+    port = canvas.port_map.pop((group_id, port_id), None)
+
+    if port is not None:
+        item = port.widget
+        box = item.parentItem()
+        rect = box.sceneBoundingRect()
+        box.removePortFromGroup(port_id)
+        if not options.lightweight_ports:
             canvas.scene.removeItem(item)
-            canvas.port_list.remove(port)
-            del item
+        canvas.port_list.remove(port)
+        if port in canvas.group_ports.get(group_id, ()):
+            canvas.group_ports[group_id].remove(port)
+        canvas.port_connections.pop((group_id, port_id), None)
+        canvas.search_index.remove((group_id, port_id))
+        canvas.qobject.portRemoved.emit(group_id, port_id)
+        del item
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+        canvas.scene.scheduleUpdate(rect)
+        return
 
     qCritical("PatchCanvas::removePort(%i, %i) - Unable to find port to remove" % (group_id, port_id))
 
@@ -879,14 +1047,20 @@ def renamePort(group_id, port_id, new_port_name):
     if canvas.debug:
         print("PatchCanvas::renamePort(%i, %i, %s)" % (group_id, port_id, new_port_name.encode()))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            port.port_name = new_port_name
-            port.widget.setPortName(new_port_name)
-            port.widget.parentItem().updatePositions()
+    port = canvas.port_map.get((group_id, port_id), None)
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    if port is not None:
+        port.port_name = new_port_name
+        port.widget.setPortName(new_port_name)
+
+        group = canvas.group_map.get(group_id, None)
+        if group is not None:
+            canvas.search_index.rename((group_id, port_id), group.group_name + ":" + new_port_name)
+        canvas.qobject.portRenamed.emit(group_id, port_id)
+        port.widget.parentItem().updatePositions()
+
+        canvas.scene.scheduleUpdate(port.widget.parentItem().sceneBoundingRect())
+        return
 
     qCritical("PatchCanvas::renamePort(%i, %i, %s) - Unable to find port to rename" % (
               group_id, port_id, new_port_name.encode()))
@@ -903,21 +1077,11 @@ def connectPorts(connection_id, group_out_id, port_out_id, group_in_id, port_in_
         print("PatchCanvas::connectPorts(%i, %i, %i, %i, %i)" % (
               connection_id, group_out_id, port_out_id, group_in_id, port_in_id))
 
-    port_out = None
-    port_in = None
-    port_out_parent = None
-    port_in_parent = None
-
-    for port in canvas.port_list:
-        if port.group_id == group_out_id and port.port_id == port_out_id:
-            port_out = port.widget
-            port_out_parent = port_out.parentItem()
-        elif port.group_id == group_in_id and port.port_id == port_in_id:
-            port_in = port.widget
-            port_in_parent = port_in.parentItem()
+    port_out = canvas.port_map.get((group_out_id, port_out_id), None)
+    port_in = canvas.port_map.get((group_in_id, port_in_id), None)
 
     # FIXME
-    if not (port_out and port_in):
+    if port_out is None or port_in is None:
         qCritical("PatchCanvas::connectPorts(%i, %i, %i, %i, %i) - unable to find ports to connect" % (
                   connection_id, group_out_id, port_out_id, group_in_id, port_in_id))
         return
@@ -929,6 +1093,11 @@ def connectPorts(connection_id, group_out_id, port_out_id, group_in_id, port_in_
     connection_dict.group_out_id = group_out_id
     connection_dict.port_out_id = port_out_id
 
+    port_out = port_out.widget
+    port_in = port_in.widget
+    port_out_parent = port_out.parentItem()
+    port_in_parent = port_in.parentItem()
+
     if options.use_bezier_lines:
         connection_dict.widget = CanvasBezierLine(port_out, port_in, None)
     else:
@@ -936,78 +1105,163 @@ def connectPorts(connection_id, group_out_id, port_out_id, group_in_id, port_in_
 
     canvas.scene.addItem(connection_dict.widget)
 
+    line_hidden = bool(port_out.getPortType() in canvas.hidden_port_types or
+                       port_in.getPortType() in canvas.hidden_port_types)
+
+    if line_hidden:
+        connection_dict.widget.setVisible(False)
+        canvas.spatial_index.remove(connection_dict.widget)
+
     port_out_parent.addLineFromGroup(connection_dict.widget, connection_id)
     port_in_parent.addLineFromGroup(connection_dict.widget, connection_id)
 
-    canvas.last_z_value += 1
-    port_out_parent.setZValue(canvas.last_z_value)
-    port_in_parent.setZValue(canvas.last_z_value)
-
-    canvas.last_z_value += 1
-    connection_dict.widget.setZValue(canvas.last_z_value)
+    connection_dict.widget.updateZValue()
 
     canvas.connection_list.append(connection_dict)
+    canvas.connection_map[connection_id] = connection_dict
+    canvas.port_connections.setdefault((group_out_id, port_out_id), []).append(connection_dict)
+    canvas.port_connections.setdefault((group_in_id, port_in_id), []).append(connection_dict)
+    canvas.qobject.portsConnected.emit(group_out_id, port_out_id, group_in_id, port_in_id)
+
+    if line_hidden:
+        return
 
     if options.eyecandy == EYECANDY_FULL:
         item = connection_dict.widget
         CanvasItemFX(item, True, False)
         return
 
-    QTimer.singleShot(0, canvas.scene.update)
+    canvas.scene.scheduleUpdate(connection_dict.widget.sceneBoundingRect())
 
 def disconnectPorts(connection_id):
     if canvas.debug:
         print("PatchCanvas::disconnectPorts(%i)" % connection_id)
 
-    line = None
-    item1 = None
-    item2 = None
-    group1id = port1id = 0
-    group2id = port2id = 0
-
-    for connection in canvas.connection_list:
-        if connection.connection_id == connection_id:
-            group1id = connection.group_out_id
-            group2id = connection.group_in_id
-            port1id = connection.port_out_id
-            port2id = connection.port_in_id
-            line = connection.widget
-            canvas.connection_list.remove(connection)
-            break
+    connection = canvas.connection_map.pop(connection_id, None)
 
-    if not line:
+    if connection is None:
         qCritical("PatchCanvas::disconnectPorts(%i) - unable to find connection ports" % connection_id)
         return
 
-    for port in canvas.port_list:
-        if port.group_id == group1id and port.port_id == port1id:
-            item1 = port.widget
-            break
+    line = connection.widget
+    canvas.connection_list.remove(connection)
 
-    if not item1:
+    for port_key in ((connection.group_out_id, connection.port_out_id),
+                     (connection.group_in_id, connection.port_in_id)):
+        port_conns = canvas.port_connections.get(port_key, None)
+        if port_conns is not None and connection in port_conns:
+            port_conns.remove(connection)
+
+    canvas.qobject.portsDisconnected.emit(connection.group_out_id, connection.port_out_id,
+                                          connection.group_in_id, connection.port_in_id)
+
+    port1 = canvas.port_map.get((connection.group_out_id, connection.port_out_id), None)
+
+    if port1 is None:
         qCritical("PatchCanvas::disconnectPorts(%i) - unable to find output port" % connection_id)
         return
 
-    for port in canvas.port_list:
-        if port.group_id == group2id and port.port_id == port2id:
-            item2 = port.widget
-            break
+    port2 = canvas.port_map.get((connection.group_in_id, connection.port_in_id), None)
 
-    if not item2:
+    if port2 is None:
         qCritical("PatchCanvas::disconnectPorts(%i) - unable to find input port" % connection_id)
         return
 
+    item1 = port1.widget
+    item2 = port2.widget
+
     item1.parentItem().removeLineFromGroup(connection_id)
     item2.parentItem().removeLineFromGroup(connection_id)
 
+    canvas.spatial_index.remove(line)
+
     if options.eyecandy == EYECANDY_FULL:
         CanvasItemFX(line, False, True)
         return
 
+    rect = line.sceneBoundingRect()
     canvas.scene.removeItem(line)
     del line
 
-    QTimer.singleShot(0, canvas.scene.update)
+    canvas.scene.scheduleUpdate(rect)
+
+# ------------------------------------------------------------------------------------------------------------
+
+def setPortSearchAliases(group_id, port_id, aliases):
+    if canvas.debug:
+        print("PatchCanvas::setPortSearchAliases(%i, %i, %s)" % (group_id, port_id, aliases))
+
+    canvas.search_index.setAliases((group_id, port_id), aliases)
+
+# Returns a list of (group_id, port_id, full_name, port_mode, port_type) best matching 'text'.
+# Groups have port_id -1 and no mode or type, they are skipped when filtering by port mode or type.
+def searchItems(text, limit=50, port_mode=PORT_MODE_NULL, port_type=PORT_TYPE_NULL):
+    if canvas.debug:
+        print("PatchCanvas::searchItems(%s, %i, %s, %s)" % (
+              text.encode(), limit, port_mode2str(port_mode), port_type2str(port_type)))
+
+    if port_mode == PORT_MODE_NULL and port_type == PORT_TYPE_NULL:
+        accept = None
+    else:
+        def accept(key):
+            port = canvas.port_map.get(key, None)
+            if port is None:
+                return False
+            if port_mode != PORT_MODE_NULL and port.port_mode != port_mode:
+                return False
+            if port_type != PORT_TYPE_NULL and port.port_type != port_type:
+                return False
+            return True
+
+    items = []
+
+    for (group_id, port_id), name in canvas.search_index.search(text, limit, accept):
+        port = canvas.port_map.get((group_id, port_id), None)
+        if port is not None:
+            items.append((group_id, port_id, name, port.port_mode, port.port_type))
+        else:
+            items.append((group_id, port_id, name, PORT_MODE_NULL, PORT_TYPE_NULL))
+
+    return items
+
+def focusPort(group_id, port_id):
+    if canvas.debug:
+        print("PatchCanvas::focusPort(%i, %i)" % (group_id, port_id))
+
+    port = canvas.port_map.get((group_id, port_id), None)
+
+    if port is None:
+        qCritical("PatchCanvas::focusPort(%i, %i) - unable to find port" % (group_id, port_id))
+        return False
+
+    canvas.scene.clearSelection()
+    canvas.scene.getView().centerOn(port.widget.sceneBoundingRect().center())
+    port.widget.setSelected(True)
+    return True
+
+def triggerConnectPorts(group_out_id, port_out_id, group_in_id, port_in_id):
+    if canvas.debug:
+        print("PatchCanvas::triggerConnectPorts(%i, %i, %i, %i)" % (group_out_id, port_out_id, group_in_id, port_in_id))
+
+    CanvasCallback(ACTION_PORTS_CONNECT, 0, 0, "%i:%i:%i:%i" % (group_out_id, port_out_id, group_in_id, port_in_id))
+
+# Disconnects everything from a port, or from all ports of the group if port_id is -1
+def triggerDisconnectAll(group_id, port_id=-1):
+    if canvas.debug:
+        print("PatchCanvas::triggerDisconnectAll(%i, %i)" % (group_id, port_id))
+
+    if port_id >= 0:
+        port_ids = (port_id,)
+    else:
+        port_ids = [port.port_id for port in canvas.group_ports.get(group_id, ())]
+
+    conn_ids = set()
+
+    for port_id in port_ids:
+        for conn_id, _, _ in CanvasGetPortConnectionList(group_id, port_id):
+            if conn_id not in conn_ids:
+                conn_ids.add(conn_id)
+                CanvasCallback(ACTION_PORTS_DISCONNECT, conn_id, 0, "")
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -1021,11 +1275,61 @@ def updateZValues():
     if canvas.debug:
         print("PatchCanvas::updateZValues()")
 
+    for connection in canvas.connection_list:
+        connection.widget.updateZValue()
+
+# ------------------------------------------------------------------------------------------------------------
+
+def isPortTypeVisible(port_type):
+    return port_type not in canvas.hidden_port_types
+
+def setPortTypeVisible(port_type, yesno):
+    if canvas.debug:
+        print("PatchCanvas::setPortTypeVisible(%s, %s)" % (port_type2str(port_type), bool2str(yesno)))
+
+    if yesno == (port_type not in canvas.hidden_port_types):
+        return
+
+    if yesno:
+        canvas.hidden_port_types.discard(port_type)
+    else:
+        canvas.hidden_port_types.add(port_type)
+
+    # lines first, so the relayout below only re-indexes the visible ones
+    for connection in canvas.connection_list:
+        line = connection.widget
+        port_type1 = line.item1.getPortType()
+        port_type2 = line.item2.getPortType()
+
+        if port_type not in (port_type1, port_type2):
+            continue
+
+        visible = bool(port_type1 not in canvas.hidden_port_types and port_type2 not in canvas.hidden_port_types)
+        line.setVisible(visible)
+
+        if not visible:
+            canvas.spatial_index.remove(line)
+
+    # then relayout each affected box once
+    canvas.scene.beginBulkUpdate()
+
     for group in canvas.group_list:
-        group.widgets[0].resetLinesZValue()
+        changed = False
+        for port in canvas.group_ports.get(group.group_id, ()):
+            if port.port_type == port_type:
+                port.widget.setVisible(yesno)
+                changed = True
 
-        if group.split and group.widgets[1]:
-            group.widgets[1].resetLinesZValue()
+        if not changed:
+            continue
+
+        for box in group.widgets:
+            if box is not None:
+                canvas.scene.scheduleUpdate(box.sceneBoundingRect())
+                box.updatePositions()
+                canvas.scene.scheduleUpdate(box.sceneBoundingRect())
+
+    canvas.scene.endBulkUpdate()
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -19,17 +19,18 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-from math import floor
+from math import floor, log
 
-from PyQt5.QtCore import QT_VERSION, pyqtSignal, pyqtSlot, qFatal, Qt, QPointF, QRectF
-from PyQt5.QtGui import QCursor, QPixmap, QPolygonF
-from PyQt5.QtWidgets import QGraphicsRectItem, QGraphicsScene
+from PyQt5.QtCore import QT_VERSION, pyqtSignal, pyqtSlot, qFatal, Qt, QElapsedTimer, QEvent, QPointF, QRectF, QTimer
+from PyQt5.QtGui import QColor, QCursor, QGuiApplication, QPainter, QPainterPath, QPixmap, QPolygonF, QTransform
+from PyQt5.QtWidgets import QGraphicsRectItem, QGraphicsScene, QWidget
 
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Custom)
 
 from . import (
     canvas,
+    options,
     CanvasBoxType,
     CanvasIconType,
     CanvasPortType,
@@ -38,8 +39,12 @@ from . import (
     CanvasRubberbandType,
     ACTION_BG_RIGHT_CLICK,
     MAX_PLUGIN_ID_ALLOWED,
+    QUALITY_FULL,
+    QUALITY_STRAIGHT_LINES,
 )
 
+from .spatialindex import INDEX_BOX, INDEX_LINE, INDEX_PORT
+
 # ------------------------------------------------------------------------------------------------------------
 
 class RubberbandRect(QGraphicsRectItem):
@@ -56,9 +61,61 @@ class RubberbandRect(QGraphicsRectItem):
 
 # ------------------------------------------------------------------------------------------------------------
 
+# Snapshot of the viewport shown on top of it during a managed pan or zoom, so every frame is a single pixmap draw
+class SnapshotOverlay(QWidget):
+    def __init__(self, parent):
+        QWidget.__init__(self, parent)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setFocusPolicy(Qt.NoFocus)
+        self.hide()
+
+        self.m_pixmap = QPixmap()
+        self.m_background = QColor(Qt.black)
+        self.m_transform = QTransform()
+
+        self.m_paint_clock = QElapsedTimer()
+        self.m_paint_count = 0
+        self.m_paint_time = 0.0
+
+    def setSnapshot(self, pixmap, background):
+        self.m_pixmap = pixmap
+        self.m_background = background
+        self.m_transform = QTransform()
+        self.m_paint_count = 0
+        self.m_paint_time = 0.0
+
+    def setSnapshotTransform(self, transform):
+        self.m_transform = transform
+        self.update()
+
+    def getPaintStats(self):
+        return (self.m_paint_count, self.m_paint_time)
+
+    def paintEvent(self, event):
+        self.m_paint_clock.start()
+
+        painter = QPainter(self)
+        painter.fillRect(event.rect(), self.m_background)
+        painter.setTransform(self.m_transform)
+        painter.drawPixmap(0, 0, self.m_pixmap)
+        painter.end()
+
+        self.m_paint_count += 1
+        self.m_paint_time += float(self.m_paint_clock.nsecsElapsed()) / 1000000
+
+# ------------------------------------------------------------------------------------------------------------
+
 class PatchScene(QGraphicsScene):
     scaleChanged = pyqtSignal(float)
     pluginSelected = pyqtSignal(list)
+    interactionFinished = pyqtSignal()
+
+    # Empty space kept around the boxes, the scene rect grows in steps of this size
+    SCENE_MARGIN = 500.0
+
+    # A managed pan/zoom gesture is over once no wheel step arrives for this long
+    SNAPSHOT_SETTLE_TIME = 150
 
     def __init__(self, parent, view):
         QGraphicsScene.__init__(self, parent)
@@ -83,7 +140,66 @@ class PatchScene(QGraphicsScene):
         self.curCut = None
         self.curZoomArea = None
 
+        # Render quality governor
+        self.m_quality_tier = QUALITY_FULL
+        self.m_quality_frames = 0
+        self.m_interacting = False
+        self.m_paint_clock = QElapsedTimer()
+        self.m_paint_time = 0.0
+        self.m_frame_time = 0.0
+        self.m_last_frame_start = -1
+        self.m_filtered_viewport = None
+
+        self.m_settle_timer = QTimer(self)
+        self.m_settle_timer.setInterval(250)
+        self.m_settle_timer.setSingleShot(True)
+        self.m_settle_timer.timeout.connect(self.slot_interactionSettled)
+
+        # Update scheduler, flushes dirty regions at most once per screen refresh
+        screen = QGuiApplication.primaryScreen()
+        refresh_rate = screen.refreshRate() if screen is not None else 0.0
+
+        self.m_update_rect = QRectF()
+        self.m_update_full = False
+        self.m_update_full_count = 0
+        self.m_update_partial_count = 0
+        self.m_update_interval = int(1000.0 / refresh_rate) if refresh_rate >= 1.0 else 16
+        self.m_update_clock = QElapsedTimer()
+
+        self.m_update_timer = QTimer(self)
+        self.m_update_timer.setSingleShot(True)
+        self.m_update_timer.timeout.connect(self.slot_flushUpdates)
+
+        # Managed scene bounds and item indexing
+        self.m_bounds_rect = QRectF()
+        self.m_scene_rect = QRectF()
+        self.m_bulk_update = 0
+
+        # Managed pan/zoom, the view itself is only moved once the gesture is over
+        self.m_pan_active = False
+        self.m_pan_last_pos = QPointF(0, 0)
+        self.m_snapshot_active = False
+        self.m_snapshot_overlay = None
+        self.m_snapshot_viewport = None
+        self.m_snapshot_view_center = QPointF(0, 0)
+        self.m_snapshot_center = QPointF(0, 0)
+        self.m_snapshot_scale = 1.0
+        self.m_snapshot_target_center = QPointF(0, 0)
+        self.m_snapshot_target_scale = 1.0
+        self.m_snapshot_refined = False
+
+        self.m_snapshot_timer = QTimer(self)
+        self.m_snapshot_timer.setInterval(self.SNAPSHOT_SETTLE_TIME)
+        self.m_snapshot_timer.setSingleShot(True)
+        self.m_snapshot_timer.timeout.connect(self.slot_applySnapshot)
+
+        # Contents not confirmed by the host yet, drawn faded out until they are
+        self.m_stale = False
+
         self.selectionChanged.connect(self.slot_selectionChanged)
+        self.m_view.horizontalScrollBar().valueChanged.connect(self.startInteraction)
+        self.m_view.verticalScrollBar().valueChanged.connect(self.startInteraction)
+        self.installViewportFilter()
 
     def getDevicePixelRatioF(self):
         if QT_VERSION < 0x50600:
@@ -97,6 +213,338 @@ class PatchScene(QGraphicsScene):
     def getView(self):
         return self.m_view
 
+    def getQualityTier(self):
+        return self.m_quality_tier
+
+    def getPaintTime(self):
+        return self.m_paint_time
+
+    def getFrameTime(self):
+        return self.m_frame_time
+
+    def getRepaintCounters(self):
+        return (self.m_update_full_count, self.m_update_partial_count)
+
+    def scheduleUpdate(self, rect):
+        if self.m_update_full or rect.isEmpty():
+            return
+
+        self.m_update_rect = self.m_update_rect.united(rect)
+        self.startUpdateTimer()
+
+    def scheduleFullUpdate(self):
+        self.m_update_full = True
+        self.m_update_rect = QRectF()
+        self.startUpdateTimer()
+
+    def startUpdateTimer(self):
+        if self.m_update_timer.isActive():
+            return
+
+        if self.m_update_clock.isValid():
+            self.m_update_timer.start(max(0, self.m_update_interval - self.m_update_clock.elapsed()))
+        else:
+            self.m_update_timer.start(0)
+
+    @pyqtSlot()
+    def slot_flushUpdates(self):
+        if self.m_update_full:
+            self.m_update_full_count += 1
+            self.update()
+        elif not self.m_update_rect.isEmpty():
+            self.m_update_partial_count += 1
+            self.update(self.m_update_rect)
+
+        self.m_update_full = False
+        self.m_update_rect = QRectF()
+        self.m_update_clock.start()
+
+    def beginBulkUpdate(self):
+        self.m_bulk_update += 1
+
+        if self.m_bulk_update == 1:
+            if canvas.debug:
+                print("PatchCanvas::PatchScene::beginBulkUpdate() - disabling item index")
+            self.setItemIndexMethod(QGraphicsScene.NoIndex)
+
+    def endBulkUpdate(self):
+        if self.m_bulk_update == 0:
+            return
+
+        self.m_bulk_update -= 1
+
+        if self.m_bulk_update > 0:
+            return
+
+        # one leaf for every ~16 items, the automatic depth keeps rebuilding the tree while the scene grows
+        count = len(self.items())
+        depth = min(10, max(3, int(log(max(1, count // 16), 4)) + 1))
+
+        if canvas.debug:
+            print("PatchCanvas::PatchScene::endBulkUpdate() - %i items, index depth %i" % (count, depth))
+
+        self.setItemIndexMethod(QGraphicsScene.BspTreeIndex)
+        self.setBspTreeDepth(depth)
+
+        # the new index only gets built once the scene rect changes, so set it again from scratch
+        self.m_scene_rect = QRectF()
+        self.setSceneRect(QRectF())
+        self.updateSceneRect()
+
+    def isBulkUpdating(self):
+        return self.m_bulk_update > 0
+
+    def isStale(self):
+        return self.m_stale
+
+    def setStale(self, stale):
+        if self.m_stale == stale:
+            return
+
+        self.m_stale = stale
+        self.scheduleFullUpdate()
+
+    def updateBoxBounds(self, rect):
+        if self.m_bounds_rect.contains(rect):
+            return
+
+        self.m_bounds_rect = self.m_bounds_rect.united(rect)
+
+        if self.m_bulk_update == 0:
+            self.updateSceneRect()
+
+    def updateSceneRect(self):
+        # an explicit canvas size set by the host takes precedence
+        if not canvas.size_rect.isNull() or self.m_bounds_rect.isNull():
+            return
+
+        margin = self.SCENE_MARGIN
+
+        if self.m_scene_rect.contains(self.m_bounds_rect.adjusted(-margin, -margin, margin, margin)):
+            return
+
+        margin *= 2
+        self.m_scene_rect = self.m_scene_rect.united(self.m_bounds_rect.adjusted(-margin, -margin, margin, margin))
+        self.setSceneRect(self.m_scene_rect)
+
+    @pyqtSlot()
+    def startInteraction(self):
+        if not self.m_interacting:
+            self.m_interacting = True
+            self.m_last_frame_start = -1
+        self.m_settle_timer.start()
+
+    @pyqtSlot()
+    def slot_interactionSettled(self):
+        self.m_interacting = False
+        self.m_quality_frames = 0
+        self.interactionFinished.emit()
+
+        if self.m_quality_tier == QUALITY_FULL:
+            return
+
+        if canvas.debug:
+            print("PatchCanvas::PatchScene - view settled, restoring full render quality")
+
+        self.m_quality_tier = QUALITY_FULL
+        self.scheduleFullUpdate()
+
+    def installViewportFilter(self):
+        # frames are timed from the viewport paint event, with a cached background drawBackground is not always called
+        viewport = self.m_view.viewport()
+        viewport.installEventFilter(self)
+        self.m_filtered_viewport = viewport
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint and obj is self.m_filtered_viewport:
+            if not self.m_paint_clock.isValid():
+                self.m_paint_clock.start()
+
+            now = self.m_paint_clock.nsecsElapsed()
+
+            if self.m_interacting and self.m_last_frame_start >= 0:
+                self.m_frame_time = float(now - self.m_last_frame_start) / 1000000
+
+            self.m_last_frame_start = now
+
+        return QGraphicsScene.eventFilter(self, obj, event)
+
+    def drawForeground(self, painter, rect):
+        QGraphicsScene.drawForeground(self, painter, rect)
+
+        # a single overlay instead of restyling every item, so nothing needs to be undone afterwards
+        if self.m_stale:
+            color = QColor(canvas.theme.canvas_bg)
+            color.setAlpha(160)
+            painter.fillRect(rect, color)
+
+        viewport = self.m_view.viewport()
+
+        # the host may replace the viewport after the scene got created, e.g. for OpenGL
+        if viewport is not self.m_filtered_viewport:
+            self.installViewportFilter()
+            self.m_last_frame_start = -1
+            return
+
+        if self.m_last_frame_start < 0 or painter.device() != viewport:
+            return
+
+        paint_time = float(self.m_paint_clock.nsecsElapsed() - self.m_last_frame_start) / 1000000
+        self.m_paint_time = self.m_paint_time * 0.5 + paint_time * 0.5
+
+        if self.m_snapshot_refined:
+            self.m_snapshot_refined = False
+
+            if canvas.debug:
+                print("PatchCanvas::PatchScene - refined view after pan/zoom in %.2f ms" % paint_time)
+
+        if not (options.adaptive_quality and self.m_interacting):
+            return
+
+        # wait for at least 2 frames at the current tier before going down again
+        self.m_quality_frames += 1
+        if self.m_quality_frames < 2:
+            return
+
+        if self.m_paint_time > options.frame_budget and self.m_quality_tier < QUALITY_STRAIGHT_LINES:
+            self.m_quality_tier += 1
+            self.m_quality_frames = 0
+
+            if canvas.debug:
+                print("PatchCanvas::PatchScene - paint took %.1f ms (budget %i ms, frame %.1f ms), "
+                      "lowering render quality to tier %i" % (self.m_paint_time, options.frame_budget,
+                                                              self.m_frame_time, self.m_quality_tier))
+
+            self.scheduleFullUpdate()
+
+    def isSnapshotAvailable(self):
+        if not options.managed_pan_zoom:
+            return False
+
+        # QOpenGLWidget, as Catia uses for OpenGL, renders into a framebuffer composed with its child widgets,
+        # so the overlay is used there too. Only a legacy QGLWidget is a native window the overlay can not cover.
+        return not self.m_view.viewport().inherits("QGLWidget")
+
+    def startSnapshot(self):
+        if self.m_snapshot_active:
+            return True
+
+        if not self.isSnapshotAvailable():
+            return False
+
+        view = self.m_view
+        viewport = view.viewport()
+
+        if self.m_snapshot_overlay is None or self.m_snapshot_viewport is not viewport:
+            self.m_snapshot_overlay = SnapshotOverlay(viewport)
+            self.m_snapshot_viewport = viewport
+
+        center = viewport.rect().center()
+
+        self.m_snapshot_active = True
+        self.m_snapshot_view_center = QPointF(center)
+        self.m_snapshot_center = view.mapToScene(center)
+        self.m_snapshot_scale = view.transform().m11()
+        self.m_snapshot_target_center = QPointF(self.m_snapshot_center)
+        self.m_snapshot_target_scale = self.m_snapshot_scale
+
+        overlay = self.m_snapshot_overlay
+        overlay.setSnapshot(viewport.grab(), self.backgroundBrush().color())
+        overlay.setGeometry(viewport.rect())
+        overlay.show()
+        overlay.raise_()
+        return True
+
+    def updateSnapshot(self):
+        scale = self.m_snapshot_target_scale
+        view_center = self.m_snapshot_view_center
+
+        # keep the view inside the scene rect, like the scrollbars will once the view gets moved
+        rect = self.sceneRect()
+        half_width = self.m_view.viewport().width() / (2 * scale)
+        half_height = self.m_view.viewport().height() / (2 * scale)
+        center = self.m_snapshot_target_center
+
+        if rect.width() > half_width * 2:
+            center.setX(min(max(center.x(), rect.left() + half_width), rect.right() - half_width))
+        else:
+            center.setX(rect.center().x())
+
+        if rect.height() > half_height * 2:
+            center.setY(min(max(center.y(), rect.top() + half_height), rect.bottom() - half_height))
+        else:
+            center.setY(rect.center().y())
+
+        offset = (self.m_snapshot_center - center) * scale
+        factor = scale / self.m_snapshot_scale
+
+        transform = QTransform()
+        transform.translate(view_center.x() + offset.x(), view_center.y() + offset.y())
+        transform.scale(factor, factor)
+        transform.translate(-view_center.x(), -view_center.y())
+
+        self.m_snapshot_overlay.setSnapshotTransform(transform)
+
+    @pyqtSlot()
+    def slot_applySnapshot(self):
+        if not self.m_snapshot_active or self.m_pan_active:
+            return
+
+        self.m_snapshot_active = False
+        self.m_snapshot_timer.stop()
+
+        view = self.m_view
+        scale = self.m_snapshot_target_scale
+
+        # hide first, so moving the view below does not get painted on its own
+        self.m_snapshot_overlay.hide()
+        self.m_snapshot_refined = True
+
+        if scale != self.m_snapshot_scale:
+            transform = view.transform()
+            transform.reset()
+            transform.scale(scale, scale)
+            view.setTransform(transform)
+
+        view.centerOn(self.m_snapshot_target_center)
+
+        if canvas.debug:
+            count, paint_time = self.m_snapshot_overlay.getPaintStats()
+            print("PatchCanvas::PatchScene - pan/zoom done, %i snapshot frames, %.2f ms average" % (
+                  count, paint_time / count if count else 0.0))
+
+        if scale != self.m_snapshot_scale:
+            self.scaleChanged.emit(scale)
+
+    def startPan(self, pos):
+        self.m_pan_active = True
+        self.m_pan_last_pos = QPointF(pos)
+        self.m_view.viewport().setCursor(Qt.ClosedHandCursor)
+        self.startSnapshot()
+
+    def movePan(self, pos):
+        delta = QPointF(pos) - self.m_pan_last_pos
+        self.m_pan_last_pos = QPointF(pos)
+
+        if self.m_snapshot_active:
+            self.m_snapshot_target_center -= delta / self.m_snapshot_target_scale
+            self.updateSnapshot()
+            return
+
+        self.startInteraction()
+        hbar = self.m_view.horizontalScrollBar()
+        vbar = self.m_view.verticalScrollBar()
+        hbar.setValue(hbar.value() - round(delta.x()))
+        vbar.setValue(vbar.value() - round(delta.y()))
+
+    def stopPan(self):
+        self.m_pan_active = False
+        self.m_view.viewport().unsetCursor()
+
+        # a wheel zoom still going on gets applied by its own timer
+        if not self.m_snapshot_timer.isActive():
+            self.slot_applySnapshot()
+
     def fixScaleFactor(self, transform=None):
         fix, set_view = False, False
         if not transform:
@@ -137,36 +585,17 @@ class PatchScene(QGraphicsScene):
         self.curCut = QCursor(QPixmap(":/cursors/cut_"+cur_color+".png"), 1, 1)
         self.curZoomArea = QCursor(QPixmap(":/cursors/zoom-area_"+cur_color+".png"), 8, 7)
 
+        self.scheduleFullUpdate()
+
     def zoom_fit(self):
-        min_x = min_y = max_x = max_y = None
-        first_value = True
+        rect = canvas.spatial_index.boundingRect(INDEX_BOX)
 
-        items_list = self.items()
-
-        if len(items_list) > 0:
-            for item in items_list:
-                if item and item.isVisible() and item.type() == CanvasBoxType:
-                    pos = item.scenePos()
-                    rect = item.boundingRect()
-
-                    x = pos.x()
-                    y = pos.y()
-                    if first_value:
-                        first_value = False
-                        min_x, min_y = x, y
-                        max_x = x + rect.width()
-                        max_y = y + rect.height()
-                    else:
-                        min_x = min(min_x, x)
-                        min_y = min(min_y, y)
-                        max_x = max(max_x, x + rect.width())
-                        max_y = max(max_y, y + rect.height())
-
-            if not first_value:
-                self.m_view.fitInView(min_x, min_y, abs(max_x - min_x), abs(max_y - min_y), Qt.KeepAspectRatio)
-                self.fixScaleFactor()
+        if not rect.isNull():
+            self.m_view.fitInView(rect.x(), rect.y(), rect.width(), rect.height(), Qt.KeepAspectRatio)
+            self.fixScaleFactor()
 
     def zoom_in(self):
+        self.startInteraction()
         view = self.m_view
         transform = view.transform()
         if transform.m11() < self.m_scale_max:
@@ -178,6 +607,7 @@ class PatchScene(QGraphicsScene):
         self.scaleChanged.emit(transform.m11())
 
     def zoom_out(self):
+        self.startInteraction()
         view = self.m_view
         transform = view.transform()
         if transform.m11() > self.m_scale_min:
@@ -274,12 +704,26 @@ class PatchScene(QGraphicsScene):
         if self.curCut:
             self.m_view.viewport().setCursor(self.curCut)
 
+    def getLinesIntersecting(self, path):
+        lines = []
+
+        for item in canvas.spatial_index.query(INDEX_LINE, path.boundingRect()):
+            if item.isVisible() and item.collidesWithPath(item.mapFromScene(path)):
+                lines.append(item)
+
+        return lines
+
     def mousePressEvent(self, event):
         self.m_mouse_down_init = (
             (event.button() == Qt.LeftButton) or ((event.button() == Qt.RightButton) and self.m_ctrl_down)
         )
         self.m_mouse_rubberband = False
 
+        if event.button() == Qt.MidButton and not self.m_ctrl_down:
+            event.accept()
+            self.startPan(event.screenPos())
+            return
+
         if event.button() == Qt.MidButton and self.m_ctrl_down:
             self.m_mid_button_down = True
             self.startConnectionCut()
@@ -287,14 +731,27 @@ class PatchScene(QGraphicsScene):
             pos = event.scenePos()
             self.m_pointer_border.moveTo(floor(pos.x()), floor(pos.y()))
 
-            items = self.items(self.m_pointer_border)
+            path = QPainterPath()
+            path.addRect(self.m_pointer_border)
+
+            items = self.getLinesIntersecting(path)
+            items += [item for item in canvas.spatial_index.query(INDEX_PORT, self.m_pointer_border)
+                      if item.isVisible()]
+
             for item in items:
-                if item and item.type() in (CanvasLineType, CanvasBezierLineType, CanvasPortType):
-                    item.triggerDisconnect()
+                item.triggerDisconnect()
 
         QGraphicsScene.mousePressEvent(self, event)
 
     def mouseMoveEvent(self, event):
+        if self.m_pan_active:
+            event.accept()
+            self.movePan(event.screenPos())
+            return
+
+        if event.buttons() != Qt.NoButton:
+            self.startInteraction()
+
         if self.m_mouse_down_init:
             self.m_mouse_down_init = False
             topmost = self.itemAt(event.scenePos(), self.m_view.transform())
@@ -324,15 +781,20 @@ class PatchScene(QGraphicsScene):
             return
 
         if self.m_mid_button_down and self.m_ctrl_down:
-            trail = QPolygonF([event.scenePos(), event.lastScenePos(), event.scenePos()])
-            items = self.items(trail)
-            for item in items:
-                if item and item.type() in (CanvasLineType, CanvasBezierLineType):
-                    item.triggerDisconnect()
+            path = QPainterPath()
+            path.addPolygon(QPolygonF([event.scenePos(), event.lastScenePos(), event.scenePos()]))
+
+            for item in self.getLinesIntersecting(path):
+                item.triggerDisconnect()
 
         QGraphicsScene.mouseMoveEvent(self, event)
 
     def mouseReleaseEvent(self, event):
+        if self.m_pan_active and event.button() == Qt.MidButton:
+            event.accept()
+            self.stopPan()
+            return
+
         if self.m_scale_area and not self.m_rubberband_selection:
             self.m_scale_area = False
             self.m_view.viewport().unsetCursor()
@@ -347,16 +809,20 @@ class PatchScene(QGraphicsScene):
                 self.fixScaleFactor()
 
             else:
-                items_list = self.items()
-                for item in items_list:
-                    if item and item.isVisible() and item.type() == CanvasBoxType:
-                        item_rect = item.sceneBoundingRect()
-                        item_top_left = QPointF(item_rect.x(), item_rect.y())
-                        item_bottom_right = QPointF(item_rect.x() + item_rect.width(),
-                                                    item_rect.y() + item_rect.height())
+                rect = self.m_rubberband.rect()
+                items_list = []
 
-                        if self.m_rubberband.contains(item_top_left) and self.m_rubberband.contains(item_bottom_right):
-                            item.setSelected(True)
+                for item in canvas.spatial_index.query(INDEX_BOX, rect):
+                    if item.isVisible() and not item.isSelected() and rect.contains(item.sceneBoundingRect()):
+                        items_list.append(item)
+
+                # select everything at once, and let listeners know about it only once
+                if len(items_list) > 0:
+                    self.blockSignals(True)
+                    for item in items_list:
+                        item.setSelected(True)
+                    self.blockSignals(False)
+                    self.selectionChanged.emit()
 
             self.m_rubberband.hide()
             self.m_rubberband.setRect(0, 0, 0, 0)
@@ -369,7 +835,11 @@ class PatchScene(QGraphicsScene):
                     item.checkItemPos()
 
             if len(items_list) > 1:
-                canvas.scene.update()
+                for item in items_list:
+                    if item and item.isVisible() and item.type() == CanvasBoxType:
+                        self.scheduleUpdate(item.sceneBoundingRect())
+                        for connection in item.m_connection_lines:
+                            self.scheduleUpdate(connection.line.sceneBoundingRect())
 
         self.m_mouse_down_init = False
         self.m_mouse_rubberband = False
@@ -384,6 +854,15 @@ class PatchScene(QGraphicsScene):
         QGraphicsScene.mouseReleaseEvent(self, event)
 
     def zoom_wheel(self, delta):
+        if self.startSnapshot():
+            factor = 1.41 ** (delta / 240.0)
+            self.m_snapshot_target_scale = min(max(self.m_snapshot_target_scale * factor, self.m_scale_min),
+                                               self.m_scale_max)
+            self.updateSnapshot()
+            self.m_snapshot_timer.start()
+            return
+
+        self.startInteraction()
         transform = self.m_view.transform()
         scale = transform.m11()
 
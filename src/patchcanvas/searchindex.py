@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+from heapq import nsmallest
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Characters after which a match counts as the start of a word
+WORD_SEPARATORS = " :_-./"
+
+# ------------------------------------------------------------------------------------------------------------
+
+def getTrigrams(text):
+    return set(text[i:i+3] for i in range(len(text) - 2))
+
+# 1 and 2 character prefixes of every word, marked so they never clash with a trigram
+def getWordPrefixes(text):
+    prefixes = set()
+
+    for i in range(len(text)):
+        if i == 0 or text[i-1] in WORD_SEPARATORS:
+            prefixes.add("\0" + text[i])
+            if i + 1 < len(text):
+                prefixes.add("\0" + text[i:i+2])
+
+    return prefixes
+
+# Trigram index of names (and aliases) by key, used for the find-as-you-type search.
+# Every query token narrows the candidates down to the keys sharing all of its trigrams (or, for tokens shorter
+# than 3 characters, having a word starting with it), only those candidates are then checked and ranked.
+class SearchIndex(object):
+    def __init__(self):
+        self.m_grams = {}
+        self.m_entries = {}
+
+    def clear(self):
+        self.m_grams = {}
+        self.m_entries = {}
+
+    def count(self):
+        return len(self.m_entries)
+
+    def add(self, key, name, aliases=()):
+        self.remove(key)
+
+        texts = tuple(text.lower() for text in (name,) + tuple(aliases) if text)
+        grams = set()
+
+        for text in texts:
+            grams |= getTrigrams(text)
+            grams |= getWordPrefixes(text)
+
+        for gram in grams:
+            keys = self.m_grams.get(gram, None)
+            if keys is None:
+                self.m_grams[gram] = keys = set()
+            keys.add(key)
+
+        self.m_entries[key] = (name, tuple(aliases), texts, grams)
+
+    def rename(self, key, name):
+        entry = self.m_entries.get(key, None)
+        self.add(key, name, entry[1] if entry is not None else ())
+
+    def getAliases(self, key):
+        entry = self.m_entries.get(key, None)
+        return entry[1] if entry is not None else ()
+
+    def setAliases(self, key, aliases):
+        entry = self.m_entries.get(key, None)
+        if entry is not None:
+            self.add(key, entry[0], aliases)
+
+    def remove(self, key):
+        entry = self.m_entries.pop(key, None)
+
+        if entry is None:
+            return
+
+        for gram in entry[3]:
+            keys = self.m_grams.get(gram, None)
+            if keys is None:
+                continue
+            keys.discard(key)
+            if len(keys) == 0:
+                del self.m_grams[gram]
+
+    def search(self, query, limit=50, accept=None):
+        tokens = query.lower().split()
+
+        if len(tokens) == 0:
+            return []
+
+        candidates = None
+
+        for token in tokens:
+            if len(token) < 3:
+                token_grams = ("\0" + token,)
+            else:
+                token_grams = getTrigrams(token)
+
+            token_keys = sorted((self.m_grams.get(gram, ()) for gram in token_grams), key=len)
+            token_candidates = set(token_keys[0])
+
+            for keys in token_keys[1:]:
+                if len(token_candidates) == 0:
+                    break
+                token_candidates &= keys
+
+            candidates = token_candidates if candidates is None else candidates & token_candidates
+
+            if len(candidates) == 0:
+                break
+
+        results = []
+        entries = self.m_entries
+
+        # rank by: number of tokens not matching at a word start, position of the first match, text length
+        for key in candidates:
+            entry = entries[key]
+            best = None
+
+            for text in entry[2]:
+                not_word_start = 0
+                first = -1
+
+                for token in tokens:
+                    pos = text.find(token)
+                    if pos < 0:
+                        break
+                    if pos != 0 and text[pos-1] not in WORD_SEPARATORS:
+                        not_word_start += 1
+                    if first < 0:
+                        first = pos
+                else:
+                    score = (not_word_start, first, len(text))
+                    if best is None or score < best:
+                        best = score
+
+            if best is None:
+                continue
+            if accept is not None and not accept(key):
+                continue
+
+            results.append((best, entry[0], key))
+
+        if len(results) == 0:
+            results = self._searchFuzzy(tokens, accept)
+
+        return [(key, name) for score, name, key in nsmallest(limit, results)]
+
+    def _searchFuzzy(self, tokens, accept):
+        # no exact matches (typos and such), rank by the number of shared trigrams instead
+        grams = set()
+        for token in tokens:
+            grams |= getTrigrams(token)
+
+        if len(grams) == 0:
+            return []
+
+        counts = {}
+        for gram in grams:
+            for key in self.m_grams.get(gram, ()):
+                counts[key] = counts.get(key, 0) + 1
+
+        needed = max(1, len(grams) // 2)
+        results = []
+
+        for key, count in counts.items():
+            if count < needed:
+                continue
+            if accept is not None and not accept(key):
+                continue
+
+            entry = self.m_entries[key]
+            results.append(((len(grams) - count, 0, len(entry[2][0])), entry[0], key))
+
+        return results
+
+# ------------------------------------------------------------------------------------------------------------
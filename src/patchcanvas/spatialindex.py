@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# PatchBay Canvas engine using QGraphicsView/Scene
+# Copyright (C) 2010-2019 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation; either version 2 of
+# the License, or any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the doc/GPL.txt file.
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+from math import floor
+
+from PyQt5.QtCore import QRectF
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Index kinds
+INDEX_BOX  = 0
+INDEX_PORT = 1
+INDEX_LINE = 2
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Uniform grid of scene rects, used for interactive hit testing.
+# Each item is stored in every cell its rect touches, so point and rect queries only look at a few cells
+# instead of asking QGraphicsScene to walk (and sort) everything under the cursor.
+class SpatialIndex(object):
+    CELL_SIZE = 256.0
+
+    def __init__(self):
+        self.m_cells = ({}, {}, {})
+        self.m_items = {}
+
+    def clear(self):
+        self.m_cells = ({}, {}, {})
+        self.m_items = {}
+
+    def _cellRange(self, x1, y1, x2, y2):
+        size = self.CELL_SIZE
+        return (int(floor(x1 / size)), int(floor(y1 / size)), int(floor(x2 / size)), int(floor(y2 / size)))
+
+    def update(self, kind, item, rect):
+        x1, y1 = rect.left(), rect.top()
+        x2, y2 = rect.right(), rect.bottom()
+        cell_range = self._cellRange(x1, y1, x2, y2)
+
+        old = self.m_items.get(item, None)
+
+        if old is not None:
+            if old[0] == kind and old[2] == cell_range:
+                self.m_items[item] = (kind, (x1, y1, x2, y2), cell_range)
+                return
+            self.remove(item)
+
+        cells = self.m_cells[kind]
+        cx1, cy1, cx2, cy2 = cell_range
+
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                cell = cells.get((cx, cy), None)
+                if cell is None:
+                    cells[(cx, cy)] = cell = set()
+                cell.add(item)
+
+        self.m_items[item] = (kind, (x1, y1, x2, y2), cell_range)
+
+    def remove(self, item):
+        old = self.m_items.pop(item, None)
+
+        if old is None:
+            return
+
+        kind, _, (cx1, cy1, cx2, cy2) = old
+        cells = self.m_cells[kind]
+
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                cell = cells.get((cx, cy), None)
+                if cell is None:
+                    continue
+                cell.discard(item)
+                if not cell:
+                    del cells[(cx, cy)]
+
+    def contains(self, item):
+        return item in self.m_items
+
+    def query(self, kind, rect):
+        x1, y1 = rect.left(), rect.top()
+        x2, y2 = rect.right(), rect.bottom()
+        cx1, cy1, cx2, cy2 = self._cellRange(x1, y1, x2, y2)
+
+        cells = self.m_cells[kind]
+        found = set()
+        ret = []
+
+        for cx in range(cx1, cx2 + 1):
+            for cy in range(cy1, cy2 + 1):
+                cell = cells.get((cx, cy), None)
+                if cell is None:
+                    continue
+                for item in cell:
+                    if item in found:
+                        continue
+                    found.add(item)
+                    ix1, iy1, ix2, iy2 = self.m_items[item][1]
+                    if ix1 <= x2 and ix2 >= x1 and iy1 <= y2 and iy2 >= y1:
+                        ret.append(item)
+
+        return ret
+
+    def queryPoint(self, kind, point):
+        x, y = point.x(), point.y()
+        size = self.CELL_SIZE
+        cell = self.m_cells[kind].get((int(floor(x / size)), int(floor(y / size))), None)
+
+        if cell is None:
+            return []
+
+        ret = []
+        for item in cell:
+            ix1, iy1, ix2, iy2 = self.m_items[item][1]
+            if ix1 <= x <= ix2 and iy1 <= y <= iy2:
+                ret.append(item)
+
+        return ret
+
+    def items(self, kind):
+        return [item for item, data in self.m_items.items() if data[0] == kind]
+
+    def boundingRect(self, kind, visible_only=True):
+        first = True
+        min_x = min_y = max_x = max_y = 0.0
+
+        for item, data in self.m_items.items():
+            if data[0] != kind:
+                continue
+            if visible_only and not item.isVisible():
+                continue
+
+            x1, y1, x2, y2 = data[1]
+            if first:
+                first = False
+                min_x, min_y, max_x, max_y = x1, y1, x2, y2
+            else:
+                min_x = min(min_x, x1)
+                min_y = min(min_y, y1)
+                max_x = max(max_x, x2)
+                max_y = max(max_y, y2)
+
+        if first:
+            return QRectF()
+
+        return QRectF(min_x, min_y, max_x - min_x, max_y - min_y)
+
+# ------------------------------------------------------------------------------------------------------------
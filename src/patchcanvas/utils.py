@@ -19,13 +19,13 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-from PyQt5.QtCore import qCritical, QPointF, QTimer
+from PyQt5.QtCore import qCritical, QPointF, QRectF
 
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Custom)
 
-from . import bool2str, canvas, CanvasBoxType
-from .canvasfadeanimation import CanvasFadeAnimation
+from . import bool2str, canvas, CanvasBoxType, Z_VALUE_BOXES, Z_VALUE_BOX_STEPS
+from .spatialindex import INDEX_BOX
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -34,43 +34,65 @@ def CanvasGetNewGroupPos(horizontal):
         print("PatchCanvas::CanvasGetNewGroupPos(%s)" % bool2str(horizontal))
 
     new_pos = QPointF(canvas.initial_pos)
-    items = canvas.scene.items()
 
-    #break_loop = False
     while True:
-        break_for = False
-        for i, item in enumerate(items):
-            if item and item.type() == CanvasBoxType:
-                if item.sceneBoundingRect().adjusted(-5, -5, 5, 5).contains(new_pos):
-                    itemRect = item.boundingRect()
-                    if horizontal:
-                        new_pos += QPointF(itemRect.width() + 50, 0)
-                    else:
-                        itemHeight = itemRect.height()
-                        if itemHeight < 30:
-                            new_pos += QPointF(0, itemHeight + 50)
-                        else:
-                            new_pos.setY(item.scenePos().y() + itemHeight + 20)
-                    break_for = True
-                    break
+        item = None
+        for itemx in canvas.spatial_index.query(INDEX_BOX, QRectF(new_pos.x() - 5, new_pos.y() - 5, 10, 10)):
+            if item is None or itemx.zValue() > item.zValue():
+                item = itemx
+
+        if item is None:
+            break
+
+        itemRect = item.boundingRect()
+        if horizontal:
+            new_pos += QPointF(itemRect.width() + 50, 0)
         else:
-            if not break_for:
-                break
-            #break_loop = True
+            itemHeight = itemRect.height()
+            if itemHeight < 30:
+                new_pos += QPointF(0, itemHeight + 50)
+            else:
+                new_pos.setY(item.scenePos().y() + itemHeight + 20)
 
     return new_pos
 
+def CanvasRaiseBox(box):
+    top_z_value = Z_VALUE_BOXES + float(canvas.last_z_value) / Z_VALUE_BOX_STEPS
+
+    if canvas.last_z_value > 0 and box.zValue() == top_z_value:
+        return
+
+    if canvas.last_z_value + 1 >= Z_VALUE_BOX_STEPS:
+        # out of steps, compact the current stacking order back to the start of the band
+        boxes = []
+        for group in canvas.group_list:
+            for widget in group.widgets:
+                if widget is not None and widget is not box:
+                    boxes.append(widget)
+
+        boxes.sort(key=lambda b: b.zValue())
+
+        for i, widget in enumerate(boxes):
+            widget.setZValue(Z_VALUE_BOXES + float(i + 1) / Z_VALUE_BOX_STEPS)
+
+        canvas.last_z_value = len(boxes)
+
+        if canvas.debug:
+            print("PatchCanvas::CanvasRaiseBox(%s) - compacted %i boxes" % (box, len(boxes)))
+
+    canvas.last_z_value += 1
+    box.setZValue(Z_VALUE_BOXES + float(canvas.last_z_value) / Z_VALUE_BOX_STEPS)
+
 def CanvasGetFullPortName(group_id, port_id):
     if canvas.debug:
         print("PatchCanvas::CanvasGetFullPortName(%i, %i)" % (group_id, port_id))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            group_id = port.group_id
-            for group in canvas.group_list:
-                if group.group_id == group_id:
-                    return group.group_name + ":" + port.port_name
-            break
+    port = canvas.port_map.get((group_id, port_id), None)
+
+    if port is not None:
+        group = canvas.group_map.get(group_id, None)
+        if group is not None:
+            return group.group_name + ":" + port.port_name
 
     qCritical("PatchCanvas::CanvasGetFullPortName(%i, %i) - unable to find port" % (group_id, port_id))
     return ""
@@ -81,10 +103,10 @@ def CanvasGetPortConnectionList(group_id, port_id):
 
     conn_list = []
 
-    for connection in canvas.connection_list:
+    for connection in canvas.port_connections.get((group_id, port_id), ()):
         if connection.group_out_id == group_id and connection.port_out_id == port_id:
             conn_list.append((connection.connection_id, connection.group_in_id, connection.port_in_id))
-        elif connection.group_in_id == group_id and connection.port_in_id == port_id:
+        else:
             conn_list.append((connection.connection_id, connection.group_out_id, connection.port_out_id))
 
     return conn_list
@@ -99,28 +121,7 @@ def CanvasItemFX(item, show, destroy):
     if canvas.debug:
         print("PatchCanvas::CanvasItemFX(%s, %s, %s)" % (item, bool2str(show), bool2str(destroy)))
 
-    # Check if the item already has an animation
-    for animation in canvas.animation_list:
-        if animation.item() == item:
-            animation.forceStop()
-            canvas.animation_list.remove(animation)
-            del animation
-            break
-
-    animation = CanvasFadeAnimation(item, show)
-    animation.setDuration(750 if show else 500)
-
-    if show:
-        animation.finished.connect(canvas.qobject.AnimationFinishedShow)
-    else:
-        if destroy:
-            animation.finished.connect(canvas.qobject.AnimationFinishedDestroy)
-        else:
-            animation.finished.connect(canvas.qobject.AnimationFinishedHide)
-
-    canvas.animation_list.append(animation)
-
-    animation.start()
+    canvas.fade_animation.start(item, show, destroy, 750 if show else 500)
 
 def CanvasRemoveItemFX(item):
     if canvas.debug:
@@ -129,9 +130,12 @@ def CanvasRemoveItemFX(item):
     if item.type() == CanvasBoxType:
         item.removeIconFromScene()
 
+    rect = item.sceneBoundingRect()
+
+    canvas.spatial_index.remove(item)
     canvas.scene.removeItem(item)
     del item
 
-    QTimer.singleShot(0, canvas.scene.update)
+    canvas.scene.scheduleUpdate(rect)
 
 # ------------------------------------------------------------------------------------------------------------
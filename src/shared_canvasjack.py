@@ -19,7 +19,7 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 
-from PyQt5.QtCore import pyqtSlot, QTimer
+from PyQt5.QtCore import pyqtSlot, QRectF, QTimer
 from PyQt5.QtGui import QCursor, QFontMetrics, QImage, QPainter
 from PyQt5.QtWidgets import QMainWindow, QMenu
 
@@ -29,6 +29,7 @@ from PyQt5.QtWidgets import QMainWindow, QMenu
 from shared import *
 from jacklib import jacklib
 from jacklib.jacklib_helpers import c_char_p_p_to_list, voidptr2str
+from shared_jackworker import *
 
 from patchcanvas import patchcanvas
 
@@ -65,11 +66,13 @@ class AbstractCanvasJackClass(QMainWindow):
     XRunCallback = pyqtSignal()
     BufferSizeCallback = pyqtSignal(int)
     SampleRateCallback = pyqtSignal(int)
+    ClientRegistrationCallback = pyqtSignal(str, bool)
     ClientRenameCallback = pyqtSignal(str, str)
     PortRegistrationCallback = pyqtSignal(int, bool)
     PortConnectCallback = pyqtSignal(int, int, bool)
     PortRenameCallback = pyqtSignal(int, str, str)
     PropertyChangeCallback = pyqtSignal(jacklib.jack_uuid_t, str, int)
+    LatencyCallback = pyqtSignal(int)
     ShutdownCallback = pyqtSignal()
 
     SIGTERM = pyqtSignal()
@@ -96,6 +99,15 @@ class AbstractCanvasJackClass(QMainWindow):
         self.fLogsW = None
         self.scene  = None
 
+        # server round trips requested from the GUI, run from their own thread
+        self.fJackWorker = JackWorker(self)
+        self.fJackWorker.commandFinished.connect(self.slot_jackCommandFinished)
+        self.fJackWorker.commandFailed.connect(self.slot_jackCommandFailed)
+        self.fJackWorker.start()
+
+        # also stopped when the window goes away without being closed, a failed constructor for example
+        self.destroyed.connect(self.fJackWorker.stop)
+
     # -----------------------------------------------------------------
     # Abstract calls
 
@@ -112,9 +124,21 @@ class AbstractCanvasJackClass(QMainWindow):
         if self.fBufferSize == bufferSize or not gJack.client:
             return
 
-        if jacklib.set_buffer_size(gJack.client, bufferSize) != 0:
-            print("Failed to change buffer-size as %i, reset to %i" % (bufferSize, self.fBufferSize))
+        self.fJackWorker.addCommand(JACK_COMMAND_SET_BUFFER_SIZE, bufferSize)
+
+    @pyqtSlot(int, object, object)
+    def slot_jackCommandFinished(self, command, args, result):
+        if command in (JACK_COMMAND_TRANSPORT_START, JACK_COMMAND_TRANSPORT_STOP, JACK_COMMAND_TRANSPORT_LOCATE):
+            if gJack.client:
+                self.refreshTransport()
+
+    @pyqtSlot(int, object, int)
+    def slot_jackCommandFailed(self, command, args, error):
+        if command == JACK_COMMAND_SET_BUFFER_SIZE:
+            print("Failed to change buffer-size as %i, reset to %i" % (args[0], self.fBufferSize))
             self.ui_setBufferSize(self.fBufferSize, True)
+        elif DEBUG:
+            print("JACK command %i%s failed with error %i" % (command, args, error))
 
     @pyqtSlot(bool)
     def slot_jackBufferSize_Menu(self, clicked):
@@ -163,21 +187,17 @@ class AbstractCanvasJackClass(QMainWindow):
             return
 
         if play:
-            jacklib.transport_start(gJack.client)
+            self.fJackWorker.addCommand(JACK_COMMAND_TRANSPORT_START)
         else:
-            jacklib.transport_stop(gJack.client)
-
-        self.refreshTransport()
+            self.fJackWorker.addCommand(JACK_COMMAND_TRANSPORT_STOP)
 
     @pyqtSlot()
     def slot_transportStop(self):
         if not gJack.client:
             return
 
-        jacklib.transport_stop(gJack.client)
-        jacklib.transport_locate(gJack.client, 0)
-
-        self.refreshTransport()
+        self.fJackWorker.addCommand(JACK_COMMAND_TRANSPORT_STOP)
+        self.fJackWorker.addCommand(JACK_COMMAND_TRANSPORT_LOCATE, 0)
 
     @pyqtSlot()
     def slot_transportBackwards(self):
@@ -194,7 +214,7 @@ class AbstractCanvasJackClass(QMainWindow):
         if newFrame < 0:
             newFrame = 0
 
-        jacklib.transport_locate(gJack.client, newFrame)
+        self.fJackWorker.addCommand(JACK_COMMAND_TRANSPORT_LOCATE, newFrame)
 
     @pyqtSlot()
     def slot_transportForwards(self):
@@ -202,7 +222,7 @@ class AbstractCanvasJackClass(QMainWindow):
             return
 
         newFrame = jacklib.get_current_transport_frame(gJack.client) + int(self.fSampleRate*2.5)
-        jacklib.transport_locate(gJack.client, newFrame)
+        self.fJackWorker.addCommand(JACK_COMMAND_TRANSPORT_LOCATE, newFrame)
 
     @pyqtSlot()
     def slot_transportViewMenu(self):
@@ -409,11 +429,14 @@ class AbstractCanvasJackClass(QMainWindow):
             imgFormat = "PNG"
             newPath  += ".png"
 
-        self.fExportImage = QImage(self.scene.sceneRect().width(), self.scene.sceneRect().height(), QImage.Format_RGB32)
+        # the scene rect keeps some empty space around the boxes, only export the boxes themselves
+        sourceRect = self.scene.itemsBoundingRect()
+
+        self.fExportImage = QImage(int(sourceRect.width()), int(sourceRect.height()), QImage.Format_RGB32)
         painter = QPainter(self.fExportImage)
         painter.save()
         painter.setRenderHint(QPainter.Antialiasing, True)
         painter.setRenderHint(QPainter.TextAntialiasing, True)
-        self.scene.render(painter)
+        self.scene.render(painter, QRectF(), sourceRect)
         self.fExportImage.save(newPath, imgFormat, 100)
         painter.restore()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Common/Shared code related to JACK, blocking server operations run outside the GUI thread
+# Copyright (C) 2010-2020 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+from collections import OrderedDict
+
+from PyQt5.QtCore import pyqtSignal, pyqtSlot, QMutex, QThread, QWaitCondition
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom Stuff)
+
+from jacklib import jacklib
+
+# ------------------------------------------------------------------------------------------------------------
+# Static Variables
+
+JACK_COMMAND_CONNECT          = 0
+JACK_COMMAND_DISCONNECT       = 1
+JACK_COMMAND_SET_PROPERTY     = 2
+JACK_COMMAND_SET_BUFFER_SIZE  = 3
+JACK_COMMAND_TRANSPORT_START  = 4
+JACK_COMMAND_TRANSPORT_STOP   = 5
+JACK_COMMAND_TRANSPORT_LOCATE = 6
+JACK_COMMAND_PORT_ALIAS       = 7
+
+# Commands still queued on stop are given this long to run, a hanging server must not keep the app from quitting
+JACK_WORKER_STOP_TIMEOUT = 2000
+
+# ------------------------------------------------------------------------------------------------------------
+# Global variables
+
+# Workers still running after stop, a QThread destroyed while running aborts the app so these are never let go
+gDetachedWorkers = []
+
+# ------------------------------------------------------------------------------------------------------------
+
+# Queue key of a command, a new command replaces the queued one with the same key.
+# Only the last request counts, so a connect followed by a disconnect of the same ports only disconnects them.
+def getCommandKey(command, args):
+    if command in (JACK_COMMAND_CONNECT, JACK_COMMAND_DISCONNECT):
+        return ("connection", args[0], args[1])
+    if command == JACK_COMMAND_SET_PROPERTY:
+        return ("property", args[0], args[1])
+    if command == JACK_COMMAND_SET_BUFFER_SIZE:
+        return ("buffer-size",)
+    if command in (JACK_COMMAND_TRANSPORT_START, JACK_COMMAND_TRANSPORT_STOP):
+        return ("transport",)
+    if command == JACK_COMMAND_TRANSPORT_LOCATE:
+        return ("locate",)
+    if command == JACK_COMMAND_PORT_ALIAS:
+        return ("alias", args[0])
+    return None
+
+# ------------------------------------------------------------------------------------------------------------
+# JACK command worker
+
+# Runs the JACK calls that need a server round trip, one at a time and in order, from its own thread.
+# Each command ends with commandFinished(command, args, result) or commandFailed(command, args, error), both
+# delivered in the GUI thread.
+class JackWorker(QThread):
+    commandFinished = pyqtSignal(int, object, object)
+    commandFailed   = pyqtSignal(int, object, int)
+
+    def __init__(self, parent=None):
+        QThread.__init__(self, parent)
+
+        self.fClient   = None
+        self.fCommands = OrderedDict() # key -> (command, args)
+        self.fStopping = False
+
+        self.fMutex     = QMutex()
+        self.fCondition = QWaitCondition()
+
+        self.fMergedCount = 0
+
+    def getMergedCount(self):
+        return self.fMergedCount
+
+    # commands queued for the previous client are dropped
+    def setClient(self, client):
+        self.fMutex.lock()
+        self.fClient = client
+        self.fCommands.clear()
+        self.fMutex.unlock()
+
+    def addCommand(self, command, *args):
+        key = getCommandKey(command, args)
+
+        self.fMutex.lock()
+
+        try:
+            if not self.fClient or self.fStopping:
+                return False
+
+            if key is None:
+                key = object()
+            elif key in self.fCommands:
+                self.fMergedCount += 1
+
+            # keeps the queue position of the command it replaces
+            self.fCommands[key] = (command, args)
+            self.fCondition.wakeOne()
+
+        finally:
+            self.fMutex.unlock()
+
+        return True
+
+    # runs what is still queued and waits for the thread to end.
+    # returns False if a command is still running, the worker is then detached from its parent and left behind
+    @pyqtSlot(result=bool)
+    def stop(self):
+        if not self.isRunning():
+            return True
+
+        if self in gDetachedWorkers:
+            return False
+
+        self.fMutex.lock()
+        self.fStopping = True
+        self.fCondition.wakeOne()
+        self.fMutex.unlock()
+
+        if self.wait(JACK_WORKER_STOP_TIMEOUT):
+            return True
+
+        print("JackWorker - JACK commands still running after %i ms, leaving them behind" % JACK_WORKER_STOP_TIMEOUT)
+
+        self.setParent(None)
+        gDetachedWorkers.append(self)
+        return False
+
+    # --------------------------------------------------------------------------------------------------------
+
+    def run(self):
+        while True:
+            self.fMutex.lock()
+
+            while len(self.fCommands) == 0 and not self.fStopping:
+                self.fCondition.wait(self.fMutex)
+
+            if len(self.fCommands) == 0:
+                self.fMutex.unlock()
+                break
+
+            command, args = self.fCommands.popitem(last=False)[1]
+            client = self.fClient
+
+            self.fMutex.unlock()
+
+            error, result = self.runCommand(client, command, args)
+
+            if error == 0:
+                self.commandFinished.emit(command, args, result)
+            else:
+                self.commandFailed.emit(command, args, error)
+
+    def runCommand(self, client, command, args):
+        if command == JACK_COMMAND_CONNECT:
+            return jacklib.connect(client, args[0], args[1]), None
+
+        if command == JACK_COMMAND_DISCONNECT:
+            return jacklib.disconnect(client, args[0], args[1]), None
+
+        if command == JACK_COMMAND_SET_PROPERTY:
+            return jacklib.set_property(client, *args), None
+
+        if command == JACK_COMMAND_SET_BUFFER_SIZE:
+            return jacklib.set_buffer_size(client, args[0]), None
+
+        if command == JACK_COMMAND_TRANSPORT_START:
+            jacklib.transport_start(client)
+            return 0, None
+
+        if command == JACK_COMMAND_TRANSPORT_STOP:
+            jacklib.transport_stop(client)
+            return 0, None
+
+        if command == JACK_COMMAND_TRANSPORT_LOCATE:
+            return jacklib.transport_locate(client, args[0]), None
+
+        if command == JACK_COMMAND_PORT_ALIAS:
+            return self.setPortAlias(client, *args)
+
+        return -1, None
+
+    # sets a new alias on a port, making room for it according to the alias shown (1 or 2)
+    # the result is the list of aliases the port ends up with
+    def setPortAlias(self, client, portNameR, alias, aliasN):
+        portPtr = jacklib.port_by_name(client, portNameR)
+
+        if not portPtr:
+            return -1, None
+
+        aliases = jacklib.port_get_aliases(portPtr)
+        aliases = list(aliases[1:aliases[0]+1])
+
+        if len(aliases) == 2:
+            # JACK only allows 2 aliases, remove 2nd
+            jacklib.port_unset_alias(portPtr, aliases.pop(1))
+
+            # If we're going for 1st alias, unset it too
+            if aliasN == 1:
+                jacklib.port_unset_alias(portPtr, aliases.pop(0))
+
+        elif len(aliases) == 1 and aliasN == 1:
+            jacklib.port_unset_alias(portPtr, aliases.pop(0))
+
+        elif len(aliases) == 0 and aliasN == 2:
+            # If 2nd alias is enabled and port had no previous aliases, set the 1st alias now
+            if jacklib.port_set_alias(portPtr, alias) == 0:
+                aliases.append(alias)
+
+        error = jacklib.port_set_alias(portPtr, alias)
+
+        if error == 0:
+            aliases.append(alias)
+
+        return error, tuple(aliases)
+
+# ------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Common/Shared code related to the Canvas connection matrix
+# Copyright (C) 2010-2020 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+from PyQt5.QtCore import pyqtSlot, Qt, QEvent, QRect
+from PyQt5.QtWidgets import QAbstractItemView, QComboBox, QDialog, QHBoxLayout, QHeaderView, QLabel
+from PyQt5.QtWidgets import QStyle, QStyleOptionHeader, QTableView, QVBoxLayout
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom Stuff)
+
+from patchcanvas import patchcanvas
+
+# ------------------------------------------------------------------------------------------------------------
+# Static Variables
+
+MATRIX_CELL_SIZE     = 20
+MATRIX_HEADER_HEIGHT = 160
+
+# ------------------------------------------------------------------------------------------------------------
+# Column header with vertical text, so columns can be as narrow as rows
+
+class MatrixHeaderView(QHeaderView):
+    def __init__(self, parent):
+        QHeaderView.__init__(self, Qt.Horizontal, parent)
+        self.setSectionsClickable(False)
+        self.setMinimumSectionSize(MATRIX_CELL_SIZE)
+        self.setDefaultSectionSize(MATRIX_CELL_SIZE)
+        self.setSectionResizeMode(QHeaderView.Fixed)
+
+    def sizeHint(self):
+        size = QHeaderView.sizeHint(self)
+        size.setHeight(MATRIX_HEADER_HEIGHT)
+        return size
+
+    def paintSection(self, painter, rect, logicalIndex):
+        if not rect.isValid():
+            return
+
+        option = QStyleOptionHeader()
+        self.initStyleOption(option)
+        option.rect = rect
+        option.section = logicalIndex
+        self.style().drawControl(QStyle.CE_HeaderSection, option, painter, self)
+
+        text = self.model().headerData(logicalIndex, Qt.Horizontal, Qt.DisplayRole)
+
+        if not text:
+            return
+
+        textRect = QRect(4, 0, rect.height() - 8, rect.width())
+        text = self.fontMetrics().elidedText(text, Qt.ElideLeft, textRect.width())
+
+        painter.translate(rect.left(), rect.bottom())
+        painter.rotate(-90)
+        painter.drawText(textRect, Qt.AlignLeft | Qt.AlignVCenter, text)
+
+# ------------------------------------------------------------------------------------------------------------
+# Connection Matrix Dialog
+
+# Outputs (rows) x inputs (columns) of one port type, click or press space on a cell to connect or disconnect.
+class ConnectionMatrixW(QDialog):
+    def __init__(self, parent):
+        QDialog.__init__(self, parent)
+        self.setWindowTitle(self.tr("Connection Matrix"))
+        self.resize(720, 560)
+
+        # -------------------------------------------------------------
+        # Set-up GUI
+
+        self.label_type = QLabel(self.tr("Port type:"), self)
+
+        self.cb_type = QComboBox(self)
+        self.cb_type.addItem(self.tr("Audio"), patchcanvas.PORT_TYPE_AUDIO_JACK)
+        self.cb_type.addItem(self.tr("MIDI"), patchcanvas.PORT_TYPE_MIDI_JACK)
+
+        self.fModel = patchcanvas.CanvasMatrixModel(patchcanvas.PORT_TYPE_AUDIO_JACK, self)
+
+        self.tableView = QTableView(self)
+        self.tableView.setHorizontalHeader(MatrixHeaderView(self.tableView))
+        self.tableView.setModel(self.fModel)
+        self.tableView.setSelectionMode(QAbstractItemView.SingleSelection)
+        self.tableView.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.tableView.setHorizontalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.tableView.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.tableView.installEventFilter(self)
+
+        cellSize = max(MATRIX_CELL_SIZE, self.fontMetrics().height() + 6)
+
+        verticalHeader = self.tableView.verticalHeader()
+        verticalHeader.setSectionsClickable(False)
+        verticalHeader.setMinimumSectionSize(cellSize)
+        verticalHeader.setDefaultSectionSize(cellSize)
+        verticalHeader.setSectionResizeMode(QHeaderView.Fixed)
+
+        horizontalHeader = self.tableView.horizontalHeader()
+        horizontalHeader.setMinimumSectionSize(cellSize)
+        horizontalHeader.setDefaultSectionSize(cellSize)
+
+        layoutType = QHBoxLayout()
+        layoutType.addWidget(self.label_type)
+        layoutType.addWidget(self.cb_type)
+        layoutType.addStretch()
+
+        layout = QVBoxLayout(self)
+        layout.addLayout(layoutType)
+        layout.addWidget(self.tableView)
+
+        # -------------------------------------------------------------
+        # Set-up connections
+
+        self.cb_type.currentIndexChanged.connect(self.slot_setPortType)
+        self.tableView.clicked.connect(self.fModel.toggleConnection)
+
+    def eventFilter(self, obj, event):
+        if obj == self.tableView and event.type() == QEvent.KeyPress:
+            if event.key() in (Qt.Key_Space, Qt.Key_Return, Qt.Key_Enter):
+                self.fModel.toggleConnection(self.tableView.currentIndex())
+                return True
+
+        return QDialog.eventFilter(self, obj, event)
+
+    @pyqtSlot(int)
+    def slot_setPortType(self, index):
+        self.fModel.setPortType(self.cb_type.itemData(index))
+
+# ------------------------------------------------------------------------------------------------------------
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+# Common/Shared code related to the Canvas command palette
+# Copyright (C) 2010-2020 Filipe Coelho <falktx@falktx.com>
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# For a full copy of the GNU General Public License see the COPYING file
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Global)
+
+from PyQt5.QtCore import pyqtSlot, Qt, QEvent
+from PyQt5.QtWidgets import QApplication, QDialog, QHBoxLayout, QLabel, QLineEdit, QListWidget, QListWidgetItem
+from PyQt5.QtWidgets import QPushButton, QVBoxLayout
+
+# ------------------------------------------------------------------------------------------------------------
+# Imports (Custom Stuff)
+
+from patchcanvas import patchcanvas
+
+# ------------------------------------------------------------------------------------------------------------
+# Static Variables
+
+PALETTE_MAX_RESULTS = 50
+
+# ------------------------------------------------------------------------------------------------------------
+# Command Palette Dialog
+
+# Find groups and ports by name, then focus them, connect them or disconnect them, all from the keyboard.
+#  - Return:      focus (or, after "Connect to...", connect to the selected port)
+#  - Ctrl+Return: connect the selected port to...
+#  - Ctrl+D:      disconnect all
+class CommandPaletteW(QDialog):
+    def __init__(self, parent):
+        QDialog.__init__(self, parent)
+        self.setWindowTitle(self.tr("Find"))
+        self.resize(520, 360)
+
+        # -------------------------------------------------------------
+        # Internal stuff
+
+        # port being connected, as (group_id, port_id, name, port_mode, port_type)
+        self.fConnectSource = None
+
+        # -------------------------------------------------------------
+        # Set-up GUI
+
+        self.le_search = QLineEdit(self)
+        self.le_search.setPlaceholderText(self.tr("Type a group or port name..."))
+        self.le_search.installEventFilter(self)
+
+        self.label_mode = QLabel(self)
+        self.label_mode.setVisible(False)
+
+        self.lw_results = QListWidget(self)
+
+        self.b_focus = QPushButton(self.tr("Focus"), self)
+        self.b_connect = QPushButton(self.tr("Connect to..."), self)
+        self.b_disconnect = QPushButton(self.tr("Disconnect All"), self)
+
+        layoutButtons = QHBoxLayout()
+        layoutButtons.addWidget(self.b_focus)
+        layoutButtons.addWidget(self.b_connect)
+        layoutButtons.addWidget(self.b_disconnect)
+
+        layout = QVBoxLayout(self)
+        layout.addWidget(self.label_mode)
+        layout.addWidget(self.le_search)
+        layout.addWidget(self.lw_results)
+        layout.addLayout(layoutButtons)
+
+        # -------------------------------------------------------------
+        # Set-up connections
+
+        self.le_search.textChanged.connect(self.slot_updateResults)
+        self.lw_results.currentRowChanged.connect(self.slot_updateButtons)
+        self.lw_results.itemActivated.connect(self.slot_activate)
+        self.b_focus.clicked.connect(self.slot_focus)
+        self.b_connect.clicked.connect(self.slot_connectTo)
+        self.b_disconnect.clicked.connect(self.slot_disconnectAll)
+
+        # -------------------------------------------------------------
+        # Ready
+
+        self.slot_updateButtons()
+        self.le_search.setFocus()
+
+    def getCurrentEntry(self):
+        item = self.lw_results.currentItem()
+
+        if item is None:
+            return None
+
+        return item.data(Qt.UserRole)
+
+    def eventFilter(self, obj, event):
+        if obj == self.le_search and event.type() == QEvent.KeyPress:
+            key = event.key()
+
+            if key in (Qt.Key_Up, Qt.Key_Down, Qt.Key_PageUp, Qt.Key_PageDown):
+                QApplication.sendEvent(self.lw_results, event)
+                return True
+
+            if key in (Qt.Key_Return, Qt.Key_Enter):
+                if event.modifiers() & Qt.ControlModifier:
+                    self.slot_connectTo()
+                else:
+                    self.slot_activate()
+                return True
+
+            if key == Qt.Key_D and event.modifiers() & Qt.ControlModifier:
+                self.slot_disconnectAll()
+                return True
+
+        return QDialog.eventFilter(self, obj, event)
+
+    @pyqtSlot()
+    def slot_updateResults(self):
+        text = self.le_search.text()
+
+        if self.fConnectSource is not None:
+            source_mode, source_type = self.fConnectSource[3:5]
+            if source_mode == patchcanvas.PORT_MODE_OUTPUT:
+                target_mode = patchcanvas.PORT_MODE_INPUT
+            else:
+                target_mode = patchcanvas.PORT_MODE_OUTPUT
+            entries = patchcanvas.searchItems(text, PALETTE_MAX_RESULTS, target_mode, source_type)
+        else:
+            entries = patchcanvas.searchItems(text, PALETTE_MAX_RESULTS)
+
+        self.lw_results.clear()
+
+        for entry in entries:
+            group_id, port_id, name, port_mode, port_type = entry
+
+            if port_id < 0:
+                title = self.tr("%s (client)") % name
+            elif port_mode == patchcanvas.PORT_MODE_INPUT:
+                title = self.tr("%s (input)") % name
+            else:
+                title = self.tr("%s (output)") % name
+
+            item = QListWidgetItem(title, self.lw_results)
+            item.setData(Qt.UserRole, entry)
+
+        if self.lw_results.count() > 0:
+            self.lw_results.setCurrentRow(0)
+
+        self.slot_updateButtons()
+
+    @pyqtSlot()
+    def slot_updateButtons(self):
+        entry = self.getCurrentEntry()
+        isPort = bool(entry is not None and entry[1] >= 0)
+        connecting = bool(self.fConnectSource is not None)
+
+        self.b_focus.setEnabled(entry is not None and not connecting)
+        self.b_connect.setEnabled(isPort or connecting)
+        self.b_disconnect.setEnabled(entry is not None and not connecting)
+
+    @pyqtSlot()
+    def slot_activate(self):
+        if self.fConnectSource is not None:
+            self.slot_connectTo()
+        else:
+            self.slot_focus()
+
+    @pyqtSlot()
+    def slot_focus(self):
+        entry = self.getCurrentEntry()
+
+        if entry is None:
+            return
+
+        group_id, port_id = entry[0:2]
+
+        if port_id < 0:
+            patchcanvas.focusGroup(group_id)
+        else:
+            patchcanvas.focusPort(group_id, port_id)
+
+        self.accept()
+
+    @pyqtSlot()
+    def slot_connectTo(self):
+        entry = self.getCurrentEntry()
+
+        # 2nd step, connect source and selected target
+        if self.fConnectSource is not None:
+            if entry is None:
+                return
+
+            if self.fConnectSource[3] == patchcanvas.PORT_MODE_OUTPUT:
+                port_out, port_in = self.fConnectSource, entry
+            else:
+                port_out, port_in = entry, self.fConnectSource
+
+            patchcanvas.triggerConnectPorts(port_out[0], port_out[1], port_in[0], port_in[1])
+            self.accept()
+            return
+
+        # 1st step, remember the source port and list its possible targets
+        if entry is None or entry[1] < 0:
+            return
+
+        self.fConnectSource = entry
+        self.label_mode.setText(self.tr("Connect \"%s\" to:") % entry[2])
+        self.label_mode.setVisible(True)
+
+        self.le_search.blockSignals(True)
+        self.le_search.clear()
+        self.le_search.blockSignals(False)
+
+        self.slot_updateResults()
+
+    @pyqtSlot()
+    def slot_disconnectAll(self):
+        entry = self.getCurrentEntry()
+
+        if entry is None or self.fConnectSource is not None:
+            return
+
+        patchcanvas.triggerDisconnectAll(entry[0], entry[1])
+        self.accept()
+
+    def done(self, r):
+        QDialog.done(self, r)
+        self.close()
+
+# ------------------------------------------------------------------------------------------------------------
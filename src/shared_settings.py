@@ -41,6 +41,9 @@ TAB_INDEX_NONE   = 2
 CANVAS_ANTIALIASING_SMALL = 1
 CANVAS_EYECANDY_SMALL     = 1
 
+# OpenGL multisample counts, in the same order as the combo box
+GL_SAMPLES = (0, 2, 4, 8, 16)
+
 # ------------------------------------------------------------------------------------------------------------
 # Settings Dialog
 
@@ -79,12 +82,16 @@ class SettingsW(QDialog):
 
         self.ui.lw_page.setCurrentCell(TAB_INDEX_MAIN, 0)
 
+    def getSamplesIndex(self, samples):
+        return GL_SAMPLES.index(samples) if samples in GL_SAMPLES else 0
+
     def loadSettings(self):
         settings = QSettings()
 
         if not self.ui.lw_page.isRowHidden(TAB_INDEX_MAIN):
             self.ui.sb_gui_refresh.setValue(settings.value("Main/RefreshInterval", self.fRefreshInterval, type=int))
             self.ui.cb_jack_port_alias.setCurrentIndex(settings.value("Main/JackPortAlias", 2, type=int))
+            self.ui.te_client_filters.setPlainText(settings.value("Main/ClientFilters", "", type=str))
 
         # ---------------------------------------
 
@@ -93,8 +100,15 @@ class SettingsW(QDialog):
             self.ui.cb_canvas_bezier_lines.setChecked(settings.value("Canvas/UseBezierLines", True, type=bool))
             self.ui.cb_canvas_eyecandy.setCheckState(settings.value("Canvas/EyeCandy", CANVAS_EYECANDY_SMALL, type=int))
             self.ui.cb_canvas_use_opengl.setChecked(settings.value("Canvas/UseOpenGL", False, type=bool))
+            self.ui.cb_canvas_gl_samples.setCurrentIndex(self.getSamplesIndex(settings.value("Canvas/OpenGLSamples", 4, type=int)))
+            self.ui.cb_canvas_gl_samples.setEnabled(self.ui.cb_canvas_use_opengl.isChecked())
+            self.ui.cb_canvas_lightweight_ports.setChecked(settings.value("Canvas/LightweightPorts", False, type=bool))
             self.ui.cb_canvas_render_aa.setCheckState(settings.value("Canvas/Antialiasing", CANVAS_ANTIALIASING_SMALL, type=int))
             self.ui.cb_canvas_render_hq_aa.setChecked(settings.value("Canvas/HighQualityAntialiasing", False, type=bool))
+            self.ui.cb_canvas_adaptive_quality.setChecked(settings.value("Canvas/AdaptiveQuality", True, type=bool))
+            self.ui.sb_canvas_frame_budget.setValue(settings.value("Canvas/FrameBudget", 20, type=int))
+            self.ui.sb_canvas_frame_budget.setEnabled(self.ui.cb_canvas_adaptive_quality.isChecked())
+            self.ui.cb_canvas_managed_pan_zoom.setChecked(settings.value("Canvas/ManagedPanZoom", True, type=bool))
 
             themeName = settings.value("Canvas/Theme", getDefaultThemeName(), type=str)
 
@@ -114,6 +128,8 @@ class SettingsW(QDialog):
             if self.ui.cb_jack_port_alias.isEnabled():
                 settings.setValue("Main/JackPortAlias", self.ui.cb_jack_port_alias.currentIndex())
 
+            settings.setValue("Main/ClientFilters", self.ui.te_client_filters.toPlainText().strip())
+
         # ---------------------------------------
 
         if not self.ui.lw_page.isRowHidden(TAB_INDEX_CANVAS):
@@ -121,7 +137,12 @@ class SettingsW(QDialog):
             settings.setValue("Canvas/AutoHideGroups", self.ui.cb_canvas_hide_groups.isChecked())
             settings.setValue("Canvas/UseBezierLines", self.ui.cb_canvas_bezier_lines.isChecked())
             settings.setValue("Canvas/UseOpenGL", self.ui.cb_canvas_use_opengl.isChecked())
+            settings.setValue("Canvas/OpenGLSamples", GL_SAMPLES[self.ui.cb_canvas_gl_samples.currentIndex()])
+            settings.setValue("Canvas/LightweightPorts", self.ui.cb_canvas_lightweight_ports.isChecked())
             settings.setValue("Canvas/HighQualityAntialiasing", self.ui.cb_canvas_render_hq_aa.isChecked())
+            settings.setValue("Canvas/AdaptiveQuality", self.ui.cb_canvas_adaptive_quality.isChecked())
+            settings.setValue("Canvas/FrameBudget", self.ui.sb_canvas_frame_budget.value())
+            settings.setValue("Canvas/ManagedPanZoom", self.ui.cb_canvas_managed_pan_zoom.isChecked())
 
             # 0, 1, 2 match their enum variants
             settings.setValue("Canvas/EyeCandy", self.ui.cb_canvas_eyecandy.checkState())
@@ -132,6 +153,7 @@ class SettingsW(QDialog):
         if self.ui.lw_page.currentRow() == TAB_INDEX_MAIN:
             self.ui.sb_gui_refresh.setValue(self.fRefreshInterval)
             self.ui.cb_jack_port_alias.setCurrentIndex(2)
+            self.ui.te_client_filters.clear()
 
         elif self.ui.lw_page.currentRow() == TAB_INDEX_CANVAS:
             self.ui.cb_canvas_theme.setCurrentIndex(0)
@@ -139,8 +161,13 @@ class SettingsW(QDialog):
             self.ui.cb_canvas_bezier_lines.setChecked(True)
             self.ui.cb_canvas_eyecandy.setCheckState(Qt.PartiallyChecked)
             self.ui.cb_canvas_use_opengl.setChecked(False)
+            self.ui.cb_canvas_gl_samples.setCurrentIndex(self.getSamplesIndex(4))
+            self.ui.cb_canvas_lightweight_ports.setChecked(False)
             self.ui.cb_canvas_render_aa.setCheckState(Qt.PartiallyChecked)
             self.ui.cb_canvas_render_hq_aa.setChecked(False)
+            self.ui.cb_canvas_adaptive_quality.setChecked(True)
+            self.ui.sb_canvas_frame_budget.setValue(20)
+            self.ui.cb_canvas_managed_pan_zoom.setChecked(True)
 
     def done(self, r):
         QDialog.done(self, r)